@@ -18,6 +18,7 @@ from app.schemas.user import User
 from app.schemas.homework import HomeworkTask
 from app.schemas.submission import Submission
 from app.schemas.feedback import Feedback
+from app.schemas.bot_state import bot_state
 
 # this is the Alembic Config object
 config = context.config
@@ -0,0 +1,35 @@
+"""bot_state
+
+Revision ID: 0d6b2f8e4c19
+Revises: f3c91d7a2b05
+Create Date: 2026-10-19 23:30:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0d6b2f8e4c19'
+down_revision: Union[str, None] = 'f3c91d7a2b05'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Bots before this revision created the table themselves on startup
+    op.create_table(
+        'bot_state',
+        sa.Column('kind', sa.String(), nullable=False),
+        sa.Column('key', sa.String(), nullable=False),
+        sa.Column('payload', sa.LargeBinary(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('kind', 'key'),
+        if_not_exists=True
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('bot_state')
@@ -0,0 +1,36 @@
+"""telegram_id_bigint
+
+Revision ID: 3b7e1c9a4f20
+Revises: df194054ed21
+Create Date: 2026-10-19 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3b7e1c9a4f20'
+down_revision: Union[str, None] = 'df194054ed21'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Telegram user ids are integers; the unique index is rebuilt with the column
+    op.alter_column('user', 'telegram_id',
+               existing_type=sqlmodel.sql.sqltypes.AutoString(),
+               type_=sa.BigInteger(),
+               existing_nullable=False,
+               postgresql_using='telegram_id::bigint')
+
+
+def downgrade() -> None:
+    op.alter_column('user', 'telegram_id',
+               existing_type=sa.BigInteger(),
+               type_=sqlmodel.sql.sqltypes.AutoString(),
+               existing_nullable=False,
+               postgresql_using='telegram_id::text')
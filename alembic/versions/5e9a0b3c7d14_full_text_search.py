@@ -0,0 +1,56 @@
+"""full_text_search
+
+Revision ID: 5e9a0b3c7d14
+Revises: 8c2d5f61a7e3
+Create Date: 2026-10-19 16:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5e9a0b3c7d14'
+down_revision: Union[str, None] = '8c2d5f61a7e3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Must match the documents given to `add_search_column` in app/schemas
+SEARCH_DOCUMENTS = {
+    'homeworktask': (
+        "setweight(to_tsvector('english', coalesce(content ->> 'title', '')), 'A') || "
+        "setweight(to_tsvector('english', coalesce(content ->> 'description', '')), 'B')"
+    ),
+    'submission': "to_tsvector('english', coalesce(content ->> 'text', ''))",
+    'feedback': "to_tsvector('english', coalesce(content ->> 'text', ''))",
+}
+
+# Search and list queries are always scoped to one teacher or student
+SCOPE_COLUMNS = [
+    ('homeworktask', 'teacher_id'),
+    ('submission', 'student_id'),
+    ('submission', 'teacher_id'),
+    ('feedback', 'student_id'),
+    ('feedback', 'teacher_id'),
+]
+
+
+def upgrade() -> None:
+    for table, document in SEARCH_DOCUMENTS.items():
+        op.add_column(table, sa.Column(
+            'search', postgresql.TSVECTOR(), sa.Computed(document, persisted=True)
+        ))
+        op.create_index(f'ix_{table}_search', table, ['search'], postgresql_using='gin')
+    for table, column in SCOPE_COLUMNS:
+        op.create_index(op.f(f'ix_{table}_{column}'), table, [column])
+
+
+def downgrade() -> None:
+    for table, column in SCOPE_COLUMNS:
+        op.drop_index(op.f(f'ix_{table}_{column}'), table_name=table)
+    for table in SEARCH_DOCUMENTS:
+        op.drop_index(f'ix_{table}_search', table_name=table)
+        op.drop_column(table, 'search')
@@ -0,0 +1,48 @@
+"""jsonb_content
+
+Revision ID: 8c2d5f61a7e3
+Revises: 3b7e1c9a4f20
+Create Date: 2026-10-19 14:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8c2d5f61a7e3'
+down_revision: Union[str, None] = '3b7e1c9a4f20'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+JSON_COLUMNS = [
+    ('user', 'meta'),
+    ('homeworktask', 'content'),
+    ('submission', 'content'),
+    ('feedback', 'content'),
+]
+
+
+def upgrade() -> None:
+    for table, column in JSON_COLUMNS:
+        op.alter_column(table, column,
+                   existing_type=sa.JSON(),
+                   type_=postgresql.JSONB(),
+                   existing_nullable=False,
+                   postgresql_using=f'{column}::jsonb')
+    op.create_index('ix_homeworktask_title', 'homeworktask', [sa.text("(content ->> 'title')")])
+    op.create_index('ix_homeworktask_student_ids', 'homeworktask', ['student_ids'], postgresql_using='gin')
+
+
+def downgrade() -> None:
+    op.drop_index('ix_homeworktask_student_ids', table_name='homeworktask')
+    op.drop_index('ix_homeworktask_title', table_name='homeworktask')
+    for table, column in JSON_COLUMNS:
+        op.alter_column(table, column,
+                   existing_type=postgresql.JSONB(),
+                   type_=sa.JSON(),
+                   existing_nullable=False,
+                   postgresql_using=f'{column}::json')
@@ -0,0 +1,31 @@
+"""user_handle_trigram_index
+
+Revision ID: a41f6d2e8b57
+Revises: 5e9a0b3c7d14
+Create Date: 2026-10-19 18:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a41f6d2e8b57'
+down_revision: Union[str, None] = '5e9a0b3c7d14'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    op.create_index(
+        'ix_user_tg_handle_trgm', 'user', ['tg_handle'],
+        postgresql_using='gin',
+        postgresql_ops={'tg_handle': 'gin_trgm_ops'}
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_user_tg_handle_trgm', table_name='user')
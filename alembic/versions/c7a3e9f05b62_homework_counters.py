@@ -0,0 +1,48 @@
+"""homework_counters
+
+Revision ID: c7a3e9f05b62
+Revises: a41f6d2e8b57
+Create Date: 2026-10-19 20:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c7a3e9f05b62'
+down_revision: Union[str, None] = 'a41f6d2e8b57'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+COUNTERS = ['assigned_count', 'submitted_count', 'completed_count']
+
+
+def upgrade() -> None:
+    # Counting a homework's submissions, here and in the repair job
+    op.create_index(op.f('ix_submission_homework_task_id'), 'submission', ['homework_task_id'])
+    for column in COUNTERS:
+        op.add_column('homeworktask', sa.Column(column, sa.Integer(), server_default='0', nullable=False))
+
+    # Same counts as `app.db.counters.repair_homework_counters`
+    op.execute("""
+        UPDATE homeworktask h SET
+            assigned_count = (SELECT count(DISTINCT s) FROM unnest(h.student_ids) AS s),
+            submitted_count = (
+                SELECT count(DISTINCT student_id) FROM submission
+                WHERE homework_task_id = h.id AND student_id = ANY(h.student_ids)
+            ),
+            completed_count = (
+                SELECT count(DISTINCT student_id) FROM submission
+                WHERE homework_task_id = h.id AND student_id = ANY(h.student_ids)
+                    AND status = 'COMPLETED'
+            )
+    """)
+
+
+def downgrade() -> None:
+    for column in reversed(COUNTERS):
+        op.drop_column('homeworktask', column)
+    op.drop_index(op.f('ix_submission_homework_task_id'), table_name='submission')
@@ -0,0 +1,29 @@
+"""pending_review_index
+
+Revision ID: e2b84d1f6a39
+Revises: c7a3e9f05b62
+Create Date: 2026-10-19 21:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e2b84d1f6a39'
+down_revision: Union[str, None] = 'c7a3e9f05b62'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        'ix_submission_pending_review', 'submission', ['teacher_id', 'created_at'],
+        postgresql_where=sa.text("status = 'PENDING'")
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_submission_pending_review', table_name='submission')
@@ -0,0 +1,32 @@
+"""feedback_history_indexes
+
+Revision ID: f3c91d7a2b05
+Revises: e2b84d1f6a39
+Create Date: 2026-10-19 23:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f3c91d7a2b05'
+down_revision: Union[str, None] = 'e2b84d1f6a39'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        'ix_feedback_student_history', 'feedback', ['student_id', 'created_at', 'id']
+    )
+    op.create_index(
+        'ix_feedback_teacher_history', 'feedback', ['teacher_id', 'created_at', 'id']
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_feedback_teacher_history', table_name='feedback')
+    op.drop_index('ix_feedback_student_history', table_name='feedback')
@@ -1,5 +1,5 @@
 from fastapi import APIRouter
-from .endpoints import user, homework, submission, feedback
+from .endpoints import user, homework, submission, feedback, search, teacher, debug
 
 api_router = APIRouter()
 
@@ -7,3 +7,6 @@ api_router.include_router(user.router, prefix="/users", tags=["users"])
 api_router.include_router(homework.router, prefix="/homework", tags=["homework"])
 api_router.include_router(submission.router, prefix="/submissions", tags=["submissions"])
 api_router.include_router(feedback.router, prefix="/feedback", tags=["feedback"])
+api_router.include_router(teacher.router, prefix="/teachers", tags=["teachers"])
+api_router.include_router(search.router, prefix="/search", tags=["search"])
+api_router.include_router(debug.router, prefix="/debug", tags=["debug"])
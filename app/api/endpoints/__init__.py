@@ -1,3 +1,3 @@
-from . import user, homework, submission, feedback
+from . import user, homework, submission, feedback, search, teacher, debug
 
-__all__ = ["user", "homework", "submission", "feedback"]
+__all__ = ["user", "homework", "submission", "feedback", "search", "teacher", "debug"]
@@ -0,0 +1,24 @@
+"""
+1. `GET /debug/slow-queries` - Slow statements captured by the engine instrumentation, with EXPLAIN plans
+
+Only available when `DEBUG_ENDPOINTS_ENABLED` is set.
+"""
+
+from fastapi import APIRouter, HTTPException, status
+from typing import Dict, List
+from ...core.config import settings
+from ...db.instrumentation import get_slow_queries
+
+router = APIRouter()
+
+def ensure_debug_enabled():
+    if not settings.DEBUG_ENDPOINTS_ENABLED:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Not Found"
+        )
+
+@router.get("/slow-queries", response_model=List[Dict])
+def list_slow_queries(limit: int = 50):
+    ensure_debug_enabled()
+    return get_slow_queries()[:limit]
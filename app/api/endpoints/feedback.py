@@ -2,25 +2,34 @@
 1. `GET /feedback/{feedback_id}` - Get specific feedback
 2. `POST /feedback/` - Create new feedback
 3. `GET /feedback/submission/{submission_id}` - Get all feedback for a submission
+4. `GET /feedback/student/{student_id}` - Feedback a student received, oldest first
+5. `GET /feedback/teacher/{teacher_id}` - Feedback a teacher gave, oldest first
+
+The student and teacher histories are paged with `after`, the id of the last
+feedback of the previous page, rather than an offset, and carry the homework
+title and student handle so clients don't look them up per item.
 """
 
 from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy import tuple_
 from sqlmodel import Session, select
 from typing import List, Optional
-from ...db.base import get_db
+from ...db.base import get_db, get_read_db, insert_row
+from ...db.counters import record_completion
+from ..json_rows import json_list_response
 from ...schemas.base import Status
-from ...schemas.feedback import Feedback
+from ...schemas.feedback import Feedback, FeedbackCreate, FeedbackHistoryItem, FeedbackRead
 from ...schemas.submission import Submission
-from ...schemas.homework import HomeworkTask
+from ...schemas.homework import HomeworkTask, homework_title
 from ...schemas.user import User, UserRole
 from ...queue.notifications import notify_feedback_provided
 
 router = APIRouter()
 
-@router.get("/{feedback_id}", response_model=Feedback)
+@router.get("/{feedback_id}", response_model=FeedbackRead)
 def get_feedback_by_id(
     feedback_id: str,
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     feedback = db.get(Feedback, feedback_id)
     if not feedback:
@@ -30,9 +39,9 @@ def get_feedback_by_id(
         )
     return feedback
 
-@router.post("/", response_model=Feedback)
+@router.post("/", response_model=FeedbackRead)
 def create_feedback(
-    feedback: Feedback,
+    feedback: FeedbackCreate,
     db: Session = Depends(get_db)
 ):
     # Verify teacher exists and is actually a teacher
@@ -67,31 +76,17 @@ def create_feedback(
 
     try:
         # Add feedback
-        db.add(feedback)
+        feedback = insert_row(db, Feedback, FeedbackRead, feedback)
 
-        # Update submission status
+        # Update submission status, counting the student as completed
+        # if this is their first reviewed submission
         submission = db.get(Submission, feedback.submission_id)
+        counts = record_completion(db, submission)
         submission.status = Status.COMPLETED
 
-        # Update homework status
+        # Update homework status once every assigned student has completed
         homework = db.get(HomeworkTask, submission.homework_task_id)
-
-        # Check if all students have completed submissions with feedback
-        all_completed = True
-        for student_id in homework.student_ids:
-            student_submission = db.exec(
-                select(Submission)
-                .where(
-                    Submission.homework_task_id == homework.id,
-                    Submission.student_id == student_id
-                )
-            ).first()
-
-            if not student_submission or student_submission.status != Status.COMPLETED:
-                all_completed = False
-                break
-
-        if all_completed:
+        if counts and counts[0] >= counts[1]:
             homework.status = Status.COMPLETED
 
         db.commit()
@@ -122,13 +117,13 @@ def create_feedback(
             detail=str(e)
         )
 
-@router.get("/submission/{submission_id}", response_model=List[Feedback])
+@router.get("/submission/{submission_id}", response_model=List[FeedbackRead])
 def get_submission_feedback(
     submission_id: str,
     submission_status: Optional[str] = None,
     offset: int = 0,
     limit: int = 100,
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     # Verify submission exists
     submission = db.get(Submission, submission_id)
@@ -145,8 +140,67 @@ def get_submission_feedback(
     if submission_status:
         query = query.where(Feedback.status == submission_status)
 
-    feedback_list = db.exec(
-        query.offset(offset).limit(limit)
-    ).all()
+    query = query.order_by(Feedback.created_at, Feedback.id)
+    return json_list_response(db, query.offset(offset).limit(limit))
+
+def feedback_history(db: Session, condition, after: Optional[str], limit: int):
+    """Feedback matching `condition` in (created_at, id) order, from after the feedback `after`"""
+    query = (
+        select(
+            Feedback,
+            homework_title.label("homework_title"),
+            User.tg_handle.label("student_handle")
+        )
+        .join(Submission, Submission.id == Feedback.submission_id)
+        .join(HomeworkTask, HomeworkTask.id == Submission.homework_task_id)
+        .join(User, User.id == Feedback.student_id)
+        .where(condition)
+    )
+
+    if after:
+        cursor = db.exec(
+            select(Feedback.created_at, Feedback.id).where(Feedback.id == after)
+        ).first()
+        if not cursor:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Unknown feedback cursor"
+            )
+        query = query.where(tuple_(Feedback.created_at, Feedback.id) > tuple_(*cursor))
+
+    query = query.order_by(Feedback.created_at, Feedback.id)
+    return json_list_response(db, query.limit(limit))
+
+@router.get("/student/{student_id}", response_model=List[FeedbackHistoryItem])
+def get_student_feedback(
+    student_id: str,
+    after: Optional[str] = None,
+    limit: int = 100,
+    db: Session = Depends(get_read_db)
+):
+    # Verify student exists and is actually a student
+    student = db.get(User, student_id)
+    if not student or student.role != UserRole.STUDENT:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Student not found"
+        )
+
+    return feedback_history(db, Feedback.student_id == student_id, after, limit)
+
+@router.get("/teacher/{teacher_id}", response_model=List[FeedbackHistoryItem])
+def get_teacher_feedback(
+    teacher_id: str,
+    after: Optional[str] = None,
+    limit: int = 100,
+    db: Session = Depends(get_read_db)
+):
+    # Verify teacher exists and is actually a teacher
+    teacher = db.get(User, teacher_id)
+    if not teacher or teacher.role != UserRole.TEACHER:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Teacher not found"
+        )
 
-    return feedback_list
+    return feedback_history(db, Feedback.teacher_id == teacher_id, after, limit)
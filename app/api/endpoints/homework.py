@@ -3,23 +3,47 @@
 2. `POST /homework/assign/` - Assign new homework
 3. `GET /homework/student/{student_id}` - Get all homework for a student
 4. `GET /homework/teacher/{teacher_id}` - Get all homework from a teacher
+
+Both list endpoints take `title` (exact match) and `sort` (`title`,
+`created_at`, or either prefixed with `-` for descending), applied in SQL.
+Without `sort` they are in `created_at` order, so offset pages stay stable
+while the counters rewrite rows.
 """
 
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlmodel import Session, select
-from typing import List, Optional
-from ...db.base import get_db
+from typing import List, Literal, Optional
+from ...db.base import get_db, get_read_db, insert_row
+from ..json_rows import json_list_response
 from ...schemas.base import Status
-from ...schemas.homework import HomeworkTask
+from ...schemas.homework import HomeworkTask, HomeworkTaskCreate, HomeworkTaskRead, homework_title
 from ...schemas.user import User, UserRole
 from ...queue.notifications import notify_homework_assigned
 
 router = APIRouter()
 
-@router.get("/{homework_id}", response_model=HomeworkTask)
+HomeworkSort = Literal["title", "-title", "created_at", "-created_at"]
+
+SORT_COLUMNS = {
+    "title": homework_title,
+    "created_at": HomeworkTask.created_at
+}
+
+def filter_and_sort(query, title: Optional[str], sort: Optional[HomeworkSort]):
+    if title is not None:
+        query = query.where(homework_title == title)
+    sort = sort or "created_at"
+    column = SORT_COLUMNS[sort.lstrip("-")]
+    # `id` breaks ties so pages don't overlap
+    return query.order_by(
+        column.desc() if sort.startswith("-") else column.asc(),
+        HomeworkTask.id
+    )
+
+@router.get("/{homework_id}", response_model=HomeworkTaskRead)
 def get_homework_by_id(
     homework_id: str,
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     homework = db.get(HomeworkTask, homework_id)
     if not homework:
@@ -29,9 +53,9 @@ def get_homework_by_id(
         )
     return homework
 
-@router.post("/assign/", response_model=HomeworkTask)
+@router.post("/assign/", response_model=HomeworkTaskRead)
 def assign_homework(
-    homework: HomeworkTask,
+    homework: HomeworkTaskCreate,
     db: Session = Depends(get_db)
 ):
     # Verify teacher exists and is actually a teacher
@@ -56,9 +80,8 @@ def assign_homework(
             detail="One or more student IDs are invalid"
         )
 
-    db.add(homework)
+    homework = insert_row(db, HomeworkTask, HomeworkTaskRead, homework)
     db.commit()
-    db.refresh(homework)
 
     # Notify each student about new homework
     for student in students:
@@ -72,13 +95,15 @@ def assign_homework(
 
     return homework
 
-@router.get("/student/{student_id}", response_model=List[HomeworkTask])
+@router.get("/student/{student_id}", response_model=List[HomeworkTaskRead])
 def get_student_homework(
     student_id: str,
     homework_status: Optional[str] = None,
+    title: Optional[str] = None,
+    sort: Optional[HomeworkSort] = None,
     offset: int = 0,
     limit: int = 100,
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     # Verify student exists and is actually a student
     student = db.get(User, student_id)
@@ -95,19 +120,18 @@ def get_student_homework(
     if homework_status:
         query = query.where(HomeworkTask.status == homework_status)
 
-    homework = db.exec(
-        query.offset(offset).limit(limit)
-    ).all()
+    query = filter_and_sort(query, title, sort)
+    return json_list_response(db, query.offset(offset).limit(limit))
 
-    return homework
-
-@router.get("/teacher/{teacher_id}", response_model=List[HomeworkTask])
+@router.get("/teacher/{teacher_id}", response_model=List[HomeworkTaskRead])
 def get_teacher_homework(
     teacher_id: str,
     homework_status: Optional[str] = None,
+    title: Optional[str] = None,
+    sort: Optional[HomeworkSort] = None,
     offset: int = 0,
     limit: int = 100,
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     # Verify teacher exists and is actually a teacher
     teacher = db.get(User, teacher_id)
@@ -124,11 +148,8 @@ def get_teacher_homework(
     if homework_status:
         query = query.where(HomeworkTask.status == homework_status)
 
-    homework = db.exec(
-        query.offset(offset).limit(limit)
-    ).all()
-
-    return homework
+    query = filter_and_sort(query, title, sort)
+    return json_list_response(db, query.offset(offset).limit(limit))
 
 @router.patch("/{homework_id}/status")
 def update_homework_status(
@@ -0,0 +1,115 @@
+"""
+1. `GET /search` - Full-text search over homework, submissions and feedback
+
+Scoped to one teacher (`teacher_id`) or one student (`student_id`). Matches
+come from the generated `search` tsvector columns and their GIN indexes,
+ranked with `ts_rank_cd`; headlines are only built for the returned page.
+"""
+
+from datetime import datetime
+from typing import Callable, Dict, List, NamedTuple, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy import Column, func, literal, union_all
+from sqlmodel import Session, select
+from ...db.base import get_read_db
+from ..json_rows import json_list_response
+from ...schemas.base import SEARCH_CONFIG
+from ...schemas.feedback import Feedback, feedback_search
+from ...schemas.homework import HomeworkTask, homework_search
+from ...schemas.search import SearchKind, SearchResult
+from ...schemas.submission import Submission, submission_search
+from ...schemas.user import User, UserRole
+
+router = APIRouter()
+
+HEADLINE_OPTIONS = "StartSel=**, StopSel=**, MaxWords=20, MinWords=8, MaxFragments=2"
+
+class SearchSource(NamedTuple):
+    model: type
+    vector: Column
+    text: Callable  # model -> text the headline is cut from
+    by_teacher: Callable  # (model, teacher_id) -> WHERE clause
+    by_student: Callable  # (model, student_id) -> WHERE clause
+
+SOURCES: Dict[SearchKind, SearchSource] = {
+    SearchKind.HOMEWORK: SearchSource(
+        HomeworkTask,
+        homework_search,
+        lambda m: func.concat_ws(": ", m.content["title"].astext, m.content["description"].astext),
+        lambda m, teacher_id: m.teacher_id == teacher_id,
+        lambda m, student_id: m.student_ids.contains([student_id])
+    ),
+    SearchKind.SUBMISSION: SearchSource(
+        Submission,
+        submission_search,
+        lambda m: m.content["text"].astext,
+        lambda m, teacher_id: m.teacher_id == teacher_id,
+        lambda m, student_id: m.student_id == student_id
+    ),
+    SearchKind.FEEDBACK: SearchSource(
+        Feedback,
+        feedback_search,
+        lambda m: m.content["text"].astext,
+        lambda m, teacher_id: m.teacher_id == teacher_id,
+        lambda m, student_id: m.student_id == student_id
+    ),
+}
+
+@router.get("/", response_model=List[SearchResult])
+def search(
+    q: str = Query(..., min_length=1, max_length=200),
+    teacher_id: Optional[str] = None,
+    student_id: Optional[str] = None,
+    kinds: List[SearchKind] = Query(default=list(SearchKind)),
+    created_after: Optional[datetime] = None,
+    created_before: Optional[datetime] = None,
+    limit: int = Query(20, ge=1, le=100),
+    db: Session = Depends(get_read_db)
+):
+    if (teacher_id is None) == (student_id is None):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Pass exactly one of teacher_id or student_id"
+        )
+
+    role = UserRole.TEACHER if teacher_id else UserRole.STUDENT
+    user = db.get(User, teacher_id or student_id)
+    if not user or user.role != role:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"{role.value.capitalize()} not found"
+        )
+
+    query = func.websearch_to_tsquery(SEARCH_CONFIG, q)
+    matches = []
+    for kind in dict.fromkeys(kinds):
+        source = SOURCES[kind]
+        model = source.model
+        rank = func.ts_rank_cd(source.vector, query)
+        match = select(
+            literal(kind.value).label("kind"),
+            model.id,
+            model.created_at,
+            rank.label("rank"),
+            source.text(model).label("text")
+        ).where(
+            source.vector.op("@@")(query),
+            source.by_teacher(model, teacher_id) if teacher_id else source.by_student(model, student_id)
+        )
+        if created_after:
+            match = match.where(model.created_at >= created_after)
+        if created_before:
+            match = match.where(model.created_at < created_before)
+        # Each source only contributes its own best `limit` rows
+        matches.append(match.order_by(rank.desc()).limit(limit))
+
+    ranked = union_all(*matches).subquery("matches")
+    top = select(ranked).order_by(ranked.c.rank.desc(), ranked.c.id).limit(limit).subquery("top")
+    statement = select(
+        top.c.kind,
+        top.c.id,
+        top.c.created_at,
+        top.c.rank,
+        func.coalesce(func.ts_headline(SEARCH_CONFIG, top.c.text, query, HEADLINE_OPTIONS), "").label("headline")
+    ).order_by(top.c.rank.desc(), top.c.id)
+    return json_list_response(db, statement)
@@ -8,19 +8,21 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlmodel import Session, select
 from typing import List, Optional
-from ...db.base import get_db
+from ...db.base import get_db, get_read_db, insert_row
+from ...db.counters import record_submission
+from ..json_rows import json_list_response
 from ...schemas.base import Status
-from ...schemas.submission import Submission
+from ...schemas.submission import Submission, SubmissionCreate, SubmissionRead
 from ...schemas.homework import HomeworkTask
 from ...schemas.user import User, UserRole
 from ...queue.notifications import notify_submission_received
 
 router = APIRouter()
 
-@router.get("/{submission_id}", response_model=Submission)
+@router.get("/{submission_id}", response_model=SubmissionRead)
 def get_submission_by_id(
     submission_id: str,
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     submission = db.get(Submission, submission_id)
     if not submission:
@@ -30,9 +32,9 @@ def get_submission_by_id(
         )
     return submission
 
-@router.post("/", response_model=Submission)
+@router.post("/", response_model=SubmissionRead)
 def create_submission(
-    submission: Submission,
+    submission: SubmissionCreate,
     db: Session = Depends(get_db)
 ):
     # Verify student exists and is actually a student
@@ -71,9 +73,9 @@ def create_submission(
             detail="Teacher ID doesn't match homework's teacher"
         )
 
-    db.add(submission)
+    submission = insert_row(db, Submission, SubmissionRead, submission)
+    record_submission(db, submission.id, homework.id, submission.student_id)
     db.commit()
-    db.refresh(submission)
 
     # Get teacher info and notify about new submission
     teacher = db.get(User, submission.teacher_id)
@@ -91,13 +93,13 @@ def create_submission(
 
     return submission
 
-@router.get("/student/{student_id}", response_model=List[Submission])
+@router.get("/student/{student_id}", response_model=List[SubmissionRead])
 def get_student_submissions(
     student_id: str,
     submission_status: Optional[str] = None,
     offset: int = 0,
     limit: int = 100,
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     # Verify student exists and is actually a student
     student = db.get(User, student_id)
@@ -114,19 +116,16 @@ def get_student_submissions(
     if submission_status:
         query = query.where(Submission.status == submission_status)
 
-    submissions = db.exec(
-        query.offset(offset).limit(limit)
-    ).all()
-
-    return submissions
+    query = query.order_by(Submission.created_at, Submission.id)
+    return json_list_response(db, query.offset(offset).limit(limit))
 
-@router.get("/teacher/{teacher_id}", response_model=List[Submission])
+@router.get("/teacher/{teacher_id}", response_model=List[SubmissionRead])
 def get_teacher_submissions(
     teacher_id: str,
     submission_status: Optional[str] = None,
     offset: int = 0,
     limit: int = 100,
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     # Verify teacher exists and is actually a teacher
     teacher = db.get(User, teacher_id)
@@ -143,8 +142,5 @@ def get_teacher_submissions(
     if submission_status:
         query = query.where(Submission.status == submission_status)
 
-    submissions = db.exec(
-        query.offset(offset).limit(limit)
-    ).all()
-
-    return submissions
+    query = query.order_by(Submission.created_at, Submission.id)
+    return json_list_response(db, query.offset(offset).limit(limit))
@@ -0,0 +1,218 @@
+"""
+1. `GET /teachers/{teacher_id}/stats` - Review queue, homework progress and overdue students
+2. `GET /teachers/{teacher_id}/progress-matrix` - Students × homework statuses with per-student statistics
+
+Each figure is one aggregate query over indexed rows: the pending-review
+partial index, the denormalized homework counters, feedback within `days`,
+and only the pending homework past the deadline that still lacks submissions.
+None of them grows with the length of a teacher's history.
+
+The progress matrix is built and summarized with NumPy, see `..progress_matrix`.
+"""
+
+from datetime import datetime, timedelta
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy import distinct, exists, func
+from sqlmodel import Session, select
+from ...db.base import get_read_db
+from .. import progress_matrix
+from ...schemas.base import Status
+from ...schemas.feedback import Feedback
+from ...schemas.homework import HomeworkTask, homework_title
+from ...schemas.stats import (
+    HomeworkProgress,
+    MatrixEncoding,
+    MatrixHomework,
+    MatrixStudent,
+    OverdueStudent,
+    ProgressMatrix,
+    TeacherStats
+)
+from ...schemas.submission import Submission
+from ...schemas.user import User, UserRole
+
+router = APIRouter()
+
+def get_teacher(db: Session, teacher_id: str) -> User:
+    teacher = db.get(User, teacher_id)
+    if not teacher or teacher.role != UserRole.TEACHER:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Teacher not found"
+        )
+    return teacher
+
+def ratio(part: int, whole: int) -> float:
+    return part / whole if whole else 0.0
+
+@router.get("/{teacher_id}/stats", response_model=TeacherStats)
+def get_teacher_stats(
+    teacher_id: str,
+    days: int = Query(90, ge=1, le=3650, description="Window for the review latency"),
+    overdue_after_days: int = Query(7, ge=0, description="Homework without a submission after this is overdue"),
+    homework_limit: int = Query(10, ge=0, le=100),
+    overdue_limit: int = Query(10, ge=0, le=100),
+    db: Session = Depends(get_read_db)
+):
+    get_teacher(db, teacher_id)
+    now = datetime.utcnow()
+
+    # Review queue, from the partial index on pending submissions
+    pending_review, oldest_pending_at = db.exec(
+        select(func.count(), func.min(Submission.created_at)).where(
+            Submission.teacher_id == teacher_id,
+            Submission.status == Status.PENDING
+        )
+    ).one()
+
+    # Progress, summed from the homework counters rather than the submissions
+    active = (HomeworkTask.teacher_id == teacher_id, HomeworkTask.status != Status.CANCELLED)
+    homework_count, assigned, submitted, completed = db.exec(
+        select(
+            func.count(),
+            func.coalesce(func.sum(HomeworkTask.assigned_count), 0),
+            func.coalesce(func.sum(HomeworkTask.submitted_count), 0),
+            func.coalesce(func.sum(HomeworkTask.completed_count), 0)
+        ).where(*active)
+    ).one()
+    recent = db.exec(
+        select(
+            HomeworkTask.id,
+            homework_title.label("title"),
+            HomeworkTask.status,
+            HomeworkTask.created_at,
+            HomeworkTask.assigned_count,
+            HomeworkTask.submitted_count,
+            HomeworkTask.completed_count
+        )
+        .where(*active)
+        .order_by(HomeworkTask.created_at.desc(), HomeworkTask.id.desc())
+        .limit(homework_limit)
+    ).all()
+
+    # Time from submission to its first feedback, for reviews within the window
+    first_feedback = (
+        select(Feedback.submission_id, func.min(Feedback.created_at).label("reviewed_at"))
+        .where(Feedback.teacher_id == teacher_id, Feedback.created_at >= now - timedelta(days=days))
+        .group_by(Feedback.submission_id)
+        .subquery("first_feedback")
+    )
+    latency = func.extract("epoch", first_feedback.c.reviewed_at - Submission.created_at)
+    reviewed, median_review_seconds = db.exec(
+        select(func.count(), func.percentile_cont(0.5).within_group(latency))
+        .select_from(first_feedback)
+        .join(Submission, Submission.id == first_feedback.c.submission_id)
+    ).one()
+
+    # Assigned students without a submission, only on pending homework past
+    # the deadline whose counters say someone hasn't submitted yet
+    assignments = (
+        select(
+            HomeworkTask.id,
+            HomeworkTask.created_at,
+            func.unnest(HomeworkTask.student_ids).label("student_id")
+        )
+        .where(
+            HomeworkTask.teacher_id == teacher_id,
+            HomeworkTask.status == Status.PENDING,
+            HomeworkTask.created_at < now - timedelta(days=overdue_after_days),
+            HomeworkTask.submitted_count < HomeworkTask.assigned_count
+        )
+        .subquery("assignments")
+    )
+    missing = (
+        select(
+            assignments.c.student_id,
+            func.count(distinct(assignments.c.id)).label("overdue_count"),
+            func.min(assignments.c.created_at).label("oldest_assigned_at")
+        )
+        .where(~exists(
+            select(Submission.id).where(
+                Submission.homework_task_id == assignments.c.id,
+                Submission.student_id == assignments.c.student_id
+            )
+        ))
+        .group_by(assignments.c.student_id)
+        .subquery("missing")
+    )
+    overdue = db.exec(
+        select(
+            missing.c.student_id,
+            User.tg_handle,
+            missing.c.overdue_count,
+            missing.c.oldest_assigned_at,
+            func.count().over().label("total")
+        )
+        .join(User, User.id == missing.c.student_id)
+        .order_by(missing.c.overdue_count.desc(), missing.c.oldest_assigned_at, missing.c.student_id)
+        # At least one row, which carries the total
+        .limit(max(overdue_limit, 1))
+    ).all()
+
+    return TeacherStats(
+        teacher_id=teacher_id,
+        pending_review=pending_review,
+        oldest_pending_at=oldest_pending_at,
+        homework_count=homework_count,
+        submission_rate=ratio(submitted, assigned),
+        completion_rate=ratio(completed, assigned),
+        reviewed=reviewed,
+        median_review_seconds=median_review_seconds,
+        homework=[
+            HomeworkProgress(
+                **row._mapping,
+                submission_rate=ratio(row.submitted_count, row.assigned_count),
+                completion_rate=ratio(row.completed_count, row.assigned_count)
+            )
+            for row in recent
+        ],
+        overdue_students_total=overdue[0].total if overdue else 0,
+        overdue_students=[
+            OverdueStudent(
+                student_id=row.student_id,
+                tg_handle=row.tg_handle,
+                overdue_count=row.overdue_count,
+                oldest_assigned_at=row.oldest_assigned_at
+            )
+            for row in overdue[:overdue_limit]
+        ]
+    )
+
+@router.get("/{teacher_id}/progress-matrix", response_model=ProgressMatrix)
+def get_progress_matrix(
+    teacher_id: str,
+    homework_limit: int = Query(200, ge=1, le=1000, description="Most recent homework to include"),
+    encoding: MatrixEncoding = MatrixEncoding.TEXT,
+    db: Session = Depends(get_read_db)
+):
+    get_teacher(db, teacher_id)
+
+    # Newest first for the LIMIT, then columns in chronological order
+    homework = db.exec(progress_matrix.homework_statement(teacher_id, homework_limit)).all()[::-1]
+    student_ids, matrix = progress_matrix.build_matrix(homework)
+
+    handles = dict(db.exec(select(User.id, User.tg_handle).where(User.id.in_(student_ids))).all()) if student_ids else {}
+    order = sorted(range(len(student_ids)), key=lambda n: (handles.get(student_ids[n]) or "", student_ids[n]))
+    student_ids = [student_ids[n] for n in order]
+    matrix = matrix[order]
+
+    stats = progress_matrix.student_statistics(matrix)
+    columns = {name: values.tolist() for name, values in stats.items()}
+    return ProgressMatrix(
+        teacher_id=teacher_id,
+        homework=[
+            MatrixHomework(id=row.id, title=row.title, created_at=row.created_at, completion_rate=rate)
+            for row, rate in zip(homework, progress_matrix.homework_completion(matrix).tolist())
+        ],
+        students=[
+            MatrixStudent(
+                id=student_id,
+                tg_handle=handles.get(student_id),
+                **{name: values[n] for name, values in columns.items()}
+            )
+            for n, student_id in enumerate(student_ids)
+        ],
+        rows=progress_matrix.text_rows(matrix) if encoding == MatrixEncoding.TEXT else None,
+        packed=progress_matrix.packed_cells(matrix) if encoding == MatrixEncoding.PACKED else None,
+        completion_percentiles=progress_matrix.completion_percentiles(stats["completion_rate"])
+    )
@@ -1,21 +1,31 @@
 """
 1. `/users/me` - Get current user by telegram handle
-2. `/users/{user_id}` - Get user by ID
-3. `/users/by_handle/{tg_handle}` - Get user by telegram handle
-4. `/users/` - Get all users (with optional role filter)
-5. `/users/students/` - Get all students
-6. `/users/teachers/` - Get all teachers
-7. `/users/` (POST) - Create new user
+2. `/users/search` - Find users by handle, ranked by trigram similarity
+3. `/users/{user_id}` - Get user by ID
+4. `/users/by_handle/{tg_handle}` - Get user by telegram handle
+5. `/users/` - Get all users (with optional role filter)
+6. `/users/students/` - Get all students
+7. `/users/teachers/` - Get all teachers
+8. `/users/` (POST) - Create new user
 """
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy import desc, func, literal, union
 from sqlmodel import Session, select, or_
 from typing import List, Optional
-from ...db.base import get_db
-from ...schemas.user import User, UserRole
+from ...db.base import get_db, get_read_db, insert_row
+from ..json_rows import json_list_response
+from ...schemas.user import User, UserCreate, UserRead, UserRole
 
 router = APIRouter()
 
+# Matches ranked per search. Vague queries ("stu") can match most of the
+# school; ranking is cut off at this many candidates to keep them fast
+SEARCH_CANDIDATES = 200
+
+def escape_like(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
 # @router.get("/me", response_model=User)
 # def get_current_user(
 #     tg_handle: str,  # This would come from auth/security in real app
@@ -32,14 +42,17 @@ router = APIRouter()
 #         )
 #     return user
 
-@router.get("/by_telegram_id/{telegram_id}", response_model=User)
+@router.get("/by_telegram_id/{telegram_id}", response_model=UserRead)
 def get_user_by_telegram_id(
     telegram_id: str,
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
-    user = db.exec(
-        select(User).where(User.telegram_id == telegram_id)
-    ).first()
+    # Telegram user ids are positive integers; anything else can't match
+    user = None
+    if telegram_id.isdigit():
+        user = db.exec(
+            select(User).where(User.telegram_id == int(telegram_id))
+        ).first()
 
     if not user:
         raise HTTPException(
@@ -48,10 +61,10 @@ def get_user_by_telegram_id(
         )
     return user
 
-@router.get("/by_telegram_handle/{tg_handle}", response_model=User)
+@router.get("/by_telegram_handle/{tg_handle}", response_model=UserRead)
 def get_user_by_telegram_handle(
     tg_handle: str,  # This would come from auth/security in real app
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     user = db.exec(
         select(User).where(User.tg_handle == tg_handle)
@@ -64,10 +77,54 @@ def get_user_by_telegram_handle(
         )
     return user
 
-@router.get("/{user_id}", response_model=User)
+@router.get("/search", response_model=List[UserRead])
+def search_users(
+    q: str = Query(..., min_length=1, max_length=64),
+    role: Optional[UserRole] = None,
+    limit: int = Query(10, ge=1, le=50),
+    db: Session = Depends(get_read_db)
+):
+    """
+    Handles containing `q` first (prefix matches on top), then, only if
+    there are fewer than `limit` of those, handles similar to `q` so typos
+    still match. Both use the trigram index on `tg_handle`.
+    """
+    q = q.strip().lstrip("@")
+    scope = [User.role == role] if role else []
+
+    contains = (
+        select(User.id)
+        .where(*scope, User.tg_handle.ilike(f"%{escape_like(q)}%", escape="\\"))
+        .limit(SEARCH_CANDIDATES)
+        .cte("contains")
+    )
+    # Postgres evaluates the count once and skips this scan when `contains` has enough
+    similar = (
+        select(User.id)
+        .where(
+            *scope,
+            literal(q).op("<%")(User.tg_handle),
+            select(func.count()).select_from(contains).scalar_subquery() < limit
+        )
+        .limit(SEARCH_CANDIDATES)
+    )
+
+    query = (
+        select(User)
+        .where(User.id.in_(union(select(contains.c.id), similar)))
+        .order_by(
+            desc(User.tg_handle.ilike(f"{escape_like(q)}%", escape="\\")),
+            desc(func.word_similarity(q, User.tg_handle)),
+            User.tg_handle
+        )
+        .limit(limit)
+    )
+    return json_list_response(db, query)
+
+@router.get("/{user_id}", response_model=UserRead)
 def get_user_by_id(
     user_id: str,
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     user = db.get(User, user_id)
     if not user:
@@ -93,53 +150,53 @@ def get_user_by_id(
 #         )
 #     return user
 
-@router.get("/", response_model=List[User])
+@router.get("/", response_model=List[UserRead])
 async def get_users(
     role: Optional[UserRole] = None,
     offset: int = 0,
     limit: int = 100,
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     query = select(User)
     if role:
         query = query.where(User.role == role)
 
-    users = db.exec(
-        query.offset(offset).limit(limit)
-    ).all()
-    return users
+    # A total order, so pages neither skip nor repeat users
+    return json_list_response(db, query.order_by(User.tg_handle, User.id).offset(offset).limit(limit))
 
-@router.get("/students/", response_model=List[User])
+@router.get("/students/", response_model=List[UserRead])
 def get_all_students(
     offset: int = 0,
     limit: int = 100,
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
-    students = db.exec(
+    return json_list_response(
+        db,
         select(User)
         .where(User.role == UserRole.STUDENT)
+        .order_by(User.tg_handle, User.id)
         .offset(offset)
         .limit(limit)
-    ).all()
-    return students
+    )
 
-@router.get("/teachers/", response_model=List[User])
+@router.get("/teachers/", response_model=List[UserRead])
 def get_all_teachers(
     offset: int = 0,
     limit: int = 100,
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
-    teachers = db.exec(
+    return json_list_response(
+        db,
         select(User)
         .where(User.role == UserRole.TEACHER)
+        .order_by(User.tg_handle, User.id)
         .offset(offset)
         .limit(limit)
-    ).all()
-    return teachers
+    )
 
-@router.post("/", response_model=User)
+@router.post("/", response_model=UserRead)
 async def create_user(
-    user: User,
+    user: UserCreate,
     db: Session = Depends(get_db)
 ):
     if user.role not in [UserRole.STUDENT, UserRole.TEACHER]:
@@ -170,7 +227,6 @@ async def create_user(
             detail="User with this telegram handle or ID already exists"
         )
 
-    db.add(user)
+    user = insert_row(db, User, UserRead, user)
     db.commit()
-    db.refresh(user)
     return user
@@ -0,0 +1,66 @@
+"""
+List responses rendered by Postgres:
+1. The page query is wrapped in `json_agg(json_build_object(...))`, so rows
+   come back as a single JSON document instead of ORM objects
+2. The bytes are returned as-is, skipping per-row model validation and
+   Python-side encoding
+3. Rows keep the statement's ORDER BY: the page is numbered with
+   `row_number()` in that order, and `json_agg` aggregates by that number
+   (an aggregate reading a sorted subquery isn't guaranteed to keep its order)
+4. The JSON matches what `response_model` would produce for table models
+   (enum columns are mapped from their stored names to their values, and
+   timestamps are formatted the way pydantic writes them)
+"""
+
+from sqlalchemy import DateTime, Enum, String, Text, case, cast, func, literal
+from sqlalchemy.dialects.postgresql import aggregate_order_by
+from sqlalchemy.sql import Select
+from sqlmodel import Session, select
+from starlette.responses import Response
+
+def _json_value(column):
+    """Column expression rendered the way pydantic would serialize it"""
+    enum_class = getattr(column.type, "enum_class", None)
+    if isinstance(column.type, Enum) and enum_class is not None:
+        # SQLAlchemy stores enum member names, the API returns their values
+        return case(
+            {member.name: member.value for member in enum_class},
+            value=cast(column, String)
+        )
+    if isinstance(column.type, DateTime) and not column.type.timezone:
+        # Postgres trims trailing zeros from fractional seconds, pydantic
+        # always writes six digits unless the microseconds are zero
+        return func.regexp_replace(
+            func.to_char(column, 'YYYY-MM-DD"T"HH24:MI:SS.US'), r"\.000000$", ""
+        )
+    return column
+
+# Column numbering the rows in the statement's order, not part of the JSON
+_POSITION = "_json_rows_position"
+
+def json_rows(db: Session, statement: Select) -> bytes:
+    """
+    Run `statement` and return its rows as a JSON array of objects, in the
+    statement's ORDER BY order
+    """
+    order_by = statement._order_by_clauses
+    if order_by:
+        statement = statement.add_columns(func.row_number().over(order_by=order_by).label(_POSITION))
+    rows = statement.subquery("rows")
+    fields = []
+    for column in rows.columns:
+        if column.key != _POSITION:
+            fields.extend([literal(column.key), _json_value(column)])
+
+    document = func.json_build_object(*fields)
+    if order_by:
+        document = aggregate_order_by(document, rows.c[_POSITION])
+    document = db.exec(
+        select(func.coalesce(cast(func.json_agg(document), Text), "[]"))
+        .select_from(rows)
+    ).one()
+    return document.encode()
+
+def json_list_response(db: Session, statement: Select) -> Response:
+    """JSON response with the rows of `statement`, for list endpoints"""
+    return Response(content=json_rows(db, statement), media_type="application/json")
@@ -0,0 +1,144 @@
+"""
+Students × homework progress matrix:
+1. One query returns a row per homework, with its assigned, submitted and
+   completed student ids as space-separated text rather than arrays, so the
+   driver builds one string per homework instead of one per cell
+2. Ids are mapped to row numbers once, and every cell is then written with
+   a single fancy-indexed assignment per status
+3. Per-student rates, streaks and percentiles are column-wise NumPy
+   reductions over the whole matrix, with no per-student Python loops
+"""
+
+import base64
+from itertools import repeat
+from typing import Dict, List, Sequence, Tuple
+
+import numpy as np
+from sqlalchemy import func
+from sqlalchemy.sql import Select
+from sqlmodel import select
+
+from ..schemas.base import Status
+from ..schemas.homework import HomeworkTask, homework_title
+from ..schemas.stats import ProgressCell
+from ..schemas.submission import Submission
+
+PERCENTILES = (10, 25, 50, 75, 90)
+
+def homework_statement(teacher_id: str, limit: int) -> Select:
+    """The teacher's `limit` most recent homework, each with its student ids by status"""
+    def student_ids(*conditions):
+        return (
+            select(func.string_agg(Submission.student_id, " "))
+            .where(Submission.homework_task_id == HomeworkTask.id, *conditions)
+            .scalar_subquery()
+        )
+
+    return (
+        select(
+            HomeworkTask.id,
+            homework_title.label("title"),
+            HomeworkTask.created_at,
+            func.array_to_string(HomeworkTask.student_ids, " ").label("assigned"),
+            student_ids(Submission.status != Status.COMPLETED).label("submitted"),
+            student_ids(Submission.status == Status.COMPLETED).label("completed")
+        )
+        .where(HomeworkTask.teacher_id == teacher_id, HomeworkTask.status != Status.CANCELLED)
+        .order_by(HomeworkTask.created_at.desc(), HomeworkTask.id.desc())
+        .limit(limit)
+    )
+
+def _cells(rows: Sequence, field: str) -> Tuple[List[str], np.ndarray]:
+    """Student ids of `field` in every row, and the column each belongs to"""
+    ids: List[str] = []
+    counts = np.zeros(len(rows), np.intp)
+    for column, row in enumerate(rows):
+        text = getattr(row, field)
+        if text:
+            part = text.split(" ")
+            ids += part
+            counts[column] = len(part)
+    return ids, np.repeat(np.arange(len(rows)), counts)
+
+def build_matrix(rows: Sequence) -> Tuple[List[str], np.ndarray]:
+    """
+    Student ids in order of first assignment, and the students × `rows`
+    matrix of `ProgressCell` codes. Submissions from students no longer
+    assigned to the homework are ignored
+    """
+    assigned, columns = _cells(rows, "assigned")
+    index = {student_id: n for n, student_id in enumerate(dict.fromkeys(assigned))}
+    matrix = np.zeros((len(index), len(rows)), np.uint8)
+    matrix[np.fromiter(map(index.__getitem__, assigned), np.intp, len(assigned)), columns] = ProgressCell.ASSIGNED
+
+    # Completed last, so it wins over a pending resubmission
+    for field, code in (("submitted", ProgressCell.SUBMITTED), ("completed", ProgressCell.COMPLETED)):
+        ids, columns = _cells(rows, field)
+        students = np.fromiter(map(index.get, ids, repeat(-1)), np.intp, len(ids))
+        keep = students >= 0
+        students, columns = students[keep], columns[keep]
+        keep = matrix[students, columns] != ProgressCell.NOT_ASSIGNED
+        matrix[students[keep], columns[keep]] = code
+    return list(index), matrix
+
+def _rate(part: np.ndarray, whole: np.ndarray) -> np.ndarray:
+    return np.divide(part, whole, out=np.zeros(part.shape), where=whole > 0).round(4)
+
+def student_statistics(matrix: np.ndarray) -> Dict[str, np.ndarray]:
+    """
+    Per-row statistics of a matrix whose columns are in chronological
+    order. A streak is consecutive assigned homework that was submitted;
+    homework the student wasn't assigned neither extends nor breaks it
+    """
+    assigned = matrix != ProgressCell.NOT_ASSIGNED
+    done = matrix >= ProgressCell.SUBMITTED
+    missed = assigned & ~done
+    assigned_count = assigned.sum(axis=1)
+    completion_rate = _rate((matrix == ProgressCell.COMPLETED).sum(axis=1), assigned_count)
+
+    # Running count of submitted homework, and its value at the latest miss:
+    # their difference is the length of the streak ending at each cell
+    submitted_so_far = np.cumsum(done, axis=1, dtype=np.int32)
+    at_last_miss = np.maximum.accumulate(np.where(missed, submitted_so_far, 0), axis=1)
+    streaks = submitted_so_far - at_last_miss
+    longest_streak = streaks.max(axis=1, initial=0)
+    current_streak = streaks[:, -1] if matrix.shape[1] else np.zeros(len(matrix), np.int32)
+
+    # Percentile rank: share of the class below, counting ties as half
+    ranked = np.sort(completion_rate)
+    below = np.searchsorted(ranked, completion_rate, side="left")
+    not_above = np.searchsorted(ranked, completion_rate, side="right")
+    percentile = ((below + not_above) / 2 / max(len(ranked), 1) * 100).round(1)
+
+    return {
+        "assigned": assigned_count,
+        "submission_rate": _rate(done.sum(axis=1), assigned_count),
+        "completion_rate": completion_rate,
+        "current_streak": current_streak,
+        "longest_streak": longest_streak,
+        "percentile": percentile
+    }
+
+def homework_completion(matrix: np.ndarray) -> np.ndarray:
+    """Per-column share of assigned students with a reviewed submission"""
+    assigned = (matrix != ProgressCell.NOT_ASSIGNED).sum(axis=0)
+    return _rate((matrix == ProgressCell.COMPLETED).sum(axis=0), assigned)
+
+def completion_percentiles(completion_rate: np.ndarray) -> Dict[str, float]:
+    if not len(completion_rate):
+        return {}
+    values = np.percentile(completion_rate, PERCENTILES).round(4)
+    return {f"p{p}": float(value) for p, value in zip(PERCENTILES, values)}
+
+def text_rows(matrix: np.ndarray) -> List[str]:
+    """One string of cell digits per row"""
+    if not matrix.shape[1]:
+        return [""] * len(matrix)
+    digits = np.ascontiguousarray(matrix + ord("0"))
+    return [row.decode("ascii") for row in digits.view(f"S{matrix.shape[1]}").ravel()]
+
+def packed_cells(matrix: np.ndarray) -> str:
+    """base64 of the cells at 2 bits each, row-major, first cell in the high bits"""
+    cells = np.append(matrix.ravel(), np.zeros(-matrix.size % 4, np.uint8)).reshape(-1, 4)
+    packed = (cells[:, 0] << 6) | (cells[:, 1] << 4) | (cells[:, 2] << 2) | cells[:, 3]
+    return base64.b64encode(packed.astype(np.uint8).tobytes()).decode("ascii")
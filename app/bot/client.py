@@ -1,5 +1,5 @@
 import httpx
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, AsyncIterator, Tuple
 from .retrying_httpx_client import RetryingClient
 
 import os
@@ -11,10 +11,15 @@ import logging
 logger = logging.getLogger(__name__)
 
 class APIClient:
-    def __init__(self, base_url: Optional[str] = None):
+    def __init__(
+        self,
+        base_url: Optional[str] = None,
+        transport: Optional[httpx.AsyncBaseTransport] = None
+    ):
         self.base_url = base_url or os.getenv('API_BASE_URL', 'http://localhost:8000')
         self.client = RetryingClient(
             base_url=self.base_url,
+            transport=transport,
             timeout=30.0,
             max_retries=5,
             initial_retry_delay=1.0,
@@ -62,6 +67,56 @@ class APIClient:
         )
         return response.json()
 
+    async def iter_items(
+        self, path: str, offset: int = 0, page_size: Optional[int] = None
+    ) -> AsyncIterator[Tuple[int, Dict]]:
+        """
+        Lazily page through a list endpoint, yielding (offset, item) pairs.
+
+        The next page is only requested once the caller has consumed the
+        current one, so callers that stop early never fetch the rest.
+        """
+        limit = page_size or self.default_pagination["limit"]
+        while True:
+            response = await self.client.get(
+                path,
+                params={"offset": offset, "limit": limit}
+            )
+            page = response.json()
+            for item in page:
+                yield offset, item
+                offset += 1
+            if len(page) < limit:
+                return
+
+    async def iter_feedback_history(
+        self, user: Dict, after: Optional[str] = None, page_size: Optional[int] = None
+    ) -> AsyncIterator[Tuple[Optional[str], Dict]]:
+        """
+        Lazily page through the feedback a student received or a teacher gave,
+        oldest first, yielding (cursor, feedback) pairs.
+
+        The cursor is the id of the feedback before this one (`after` for the
+        first), so passing it back as `after` resumes at this feedback.
+        """
+        limit = page_size or self.default_pagination["limit"]
+        path = f"/feedback/{user['role']}/{user['id']}"
+        while True:
+            params = {"limit": limit}
+            if after:
+                params["after"] = after
+            response = await self.client.get(path, params=params)
+            page = response.json()
+            for feedback in page:
+                yield after, feedback
+                after = feedback["id"]
+            if len(page) < limit:
+                return
+
+    async def get_user_by_id(self, user_id: str) -> Dict:
+        response = await self.client.get(f"/users/{user_id}")
+        return response.json()
+
     async def get_all_students(self) -> List[Dict]:
         response = await self.client.get(
             "/users/students/",
@@ -69,6 +124,37 @@ class APIClient:
         )
         return response.json()
 
+    async def get_student_roster(self, page_size: int = 500) -> List[Dict]:
+        """Fetch every student, page by page, sorted by handle"""
+        roster = []
+        offset = 0
+        while True:
+            response = await self.client.get(
+                "/users/students/",
+                params={"offset": offset, "limit": page_size}
+            )
+            page = response.json()
+            roster.extend(
+                {"id": student["id"], "tg_handle": student["tg_handle"]}
+                for student in page
+            )
+            if len(page) < page_size:
+                break
+            offset += page_size
+
+        roster.sort(key=lambda student: student["tg_handle"].lower())
+        return roster
+
+    async def search_users(
+        self, query: str, role: Optional[str] = None, limit: int = 10
+    ) -> List[Dict]:
+        """Users whose handle contains or resembles `query`, best matches first"""
+        params = {"q": query, "limit": limit}
+        if role:
+            params["role"] = role
+        response = await self.client.get("/users/search", params=params)
+        return response.json()
+
     async def get_all_teachers(self) -> List[Dict]:
         response = await self.client.get(
             "/users/teachers/",
@@ -201,6 +287,19 @@ class APIClient:
 
         return enriched_submissions
 
+    async def search(self, query: str, user: Dict, limit: int = 10) -> List[Dict]:
+        """Full-text search over the homework, submissions and feedback of `user`"""
+        scope = "teacher_id" if user['role'] == 'teacher' else "student_id"
+        response = await self.client.get(
+            "/search/",
+            params={"q": query, scope: user['id'], "limit": limit}
+        )
+        return response.json()
+
+    async def get_teacher_stats(self, teacher_id: str) -> Dict:
+        response = await self.client.get(f"/teachers/{teacher_id}/stats")
+        return response.json()
+
     async def provide_feedback(self, data: Dict[str, Any]) -> Dict:
         response = await self.client.post("/feedback/", json=data)
         return response.json()
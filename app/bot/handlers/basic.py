@@ -10,6 +10,9 @@ logger = logging.getLogger(__name__)
 class BasicHandler(BaseHandler):
     async def start(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Handler for /start command - initial bot interaction"""
+        # The role may be about to change
+        context.user_data.pop('is_teacher', None)
+        context.user_data.pop('is_teacher_checked_at', None)
         try:
             # Check if user already exists
             user = await self.api_client.get_user_by_telegram_id(
@@ -48,6 +51,8 @@ class BasicHandler(BaseHandler):
         query = update.callback_query
         await query.answer()
         role = query.data.split('_')[1]  # 'role_student' -> 'student'
+        context.user_data.pop('is_teacher', None)
+        context.user_data.pop('is_teacher_checked_at', None)
 
         try:
             await self.api_client.get_or_create_user(
@@ -75,14 +80,16 @@ class BasicHandler(BaseHandler):
             "/start - Register or change role\n"
             "/help - Show this help message\n"
             "/homework - View your homework\n"
-            "/feedback - View your feedback\n\n"
+            "/feedback - View your feedback\n"
+            "/search <words> - Search your homework, submissions and feedback\n\n"
 
             "Student Commands:\n"
             "/submit <homework_id> - Submit your homework\n\n"
 
             "Teacher Commands:\n"
             "/assign - Create new homework assignment\n"
-            "/pending_feedback - View submissions needing feedback\n\n"
+            "/pending_feedback - View submissions needing feedback\n"
+            "/stats - Review queue, class progress and overdue students\n\n"
 
             "Tips:\n"
             "• Use homework IDs when submitting or providing feedback\n"
@@ -1,7 +1,8 @@
+from typing import Optional
 from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup
 from telegram.ext import ContextTypes, ConversationHandler
 from .base import BaseHandler
-from .utils import create_selection_menu
+from .utils import create_selection_menu, reply_in_chunks
 
 import logging
 logger = logging.getLogger(__name__)
@@ -9,76 +10,61 @@ logger = logging.getLogger(__name__)
 AWAITING_SUBMISSION_SELECTION = 1
 AWAITING_FEEDBACK = 2
 
+MORE_FEEDBACK_PREFIX = "more_feedback_"
+
 class FeedbackHandler(BaseHandler):
     async def list_feedback(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Show feedback list based on user role"""
-        user = await self.api_client.get_user_by_telegram_id(
-            str(update.effective_user.id)
-        )
+        await self._send_feedback(update.message, str(update.effective_user.id), after=None)
+
+    async def handle_more_feedback(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+        """Continue the feedback list from where the previous reply stopped"""
+        query = update.callback_query
+        await query.answer()
+        after = query.data[len(MORE_FEEDBACK_PREFIX):] or None
+        await self._send_feedback(query.message, str(query.from_user.id), after=after)
+
+    async def _send_feedback(self, message, telegram_id: str, after: Optional[str]):
+        user = await self.api_client.get_user_by_telegram_id(telegram_id)
 
         if user['role'] == 'student':
-            # Get student's submissions
-            submissions = await self.api_client.get_student_submissions(user['id'])
-            message = "📝 Your feedback:\n\n"
-
-            for submission in submissions:
-                feedback_list = await self.api_client.get_submission_feedback(submission['id'])
-                if feedback_list:
-                    for feedback in feedback_list:
-                        homework_title = (
-                            feedback.get('homework_task', {})
-                            .get('content', {})
-                            .get('title', 'Untitled')
-                        )
-                        feedback_text = (
-                            feedback.get('content', {})
-                            .get('text', 'No feedback provided')
-                        )
-                        created_at = feedback.get('created_at', 'Unknown date')
-
-                        message += (
-                            f"📚 Homework: {homework_title}\n"
-                            f"✍️ Feedback: {feedback_text[:100]}...\n"
-                            f"🕒 Date: {created_at}\n"
-                            f"-------------------\n\n"
-                        )
+            header = "📝 Your feedback:\n\n"
         else:
-            # Get teacher's given feedback
-            submissions = await self.api_client.get_teacher_submissions(user['id'])
-            message = "📝 Feedback you've given:\n\n"
-
-            for submission in submissions:
-                feedback_list = await self.api_client.get_submission_feedback(submission['id'])
-                if feedback_list:
-                    for feedback in feedback_list:
-                        homework_title = (
-                            feedback.get('homework_task', {})
-                            .get('content', {})
-                            .get('title', 'Untitled')
-                        )
-                        student_handle = (
-                            feedback.get('submission', {})
-                            .get('student_handle', 'Unknown student')
-                        )
-                        feedback_text = (
-                            feedback.get('content', {})
-                            .get('text', 'No feedback provided')
-                        )
-                        created_at = feedback.get('created_at', 'Unknown date')
-
-                        message += (
-                            f"👤 Student: @{student_handle}\n"
-                            f"📚 Homework: {homework_title}\n"
-                            f"✍️ Feedback: {feedback_text[:100]}...\n"
-                            f"🕒 Date: {created_at}\n"
-                            f"-------------------\n\n"
-                        )
-
-        await update.message.reply_text(
-            message or "No feedback found!",
-            reply_markup=create_selection_menu([], done_button=False)  # Just home button
+            header = "📝 Feedback you've given:\n\n"
+
+        await reply_in_chunks(
+            message,
+            header,
+            self._feedback_entries(user, after),
+            empty_text="No feedback found!",
+            more_callback=MORE_FEEDBACK_PREFIX
         )
 
+    async def _feedback_entries(self, user, after: Optional[str]):
+        """
+        Yield (cursor, text) for each feedback after the feedback `after`.
+
+        The cursor is the id of the last feedback shown before the entry, so
+        "More" resumes right at the feedback that did not fit.
+        """
+        async for cursor, feedback in self.api_client.iter_feedback_history(user, after=after):
+            feedback_text = (
+                feedback.get('content', {})
+                .get('text', 'No feedback provided')
+            )
+            created_at = feedback.get('created_at', 'Unknown date')
+
+            text = ""
+            if user['role'] != 'student':
+                text += f"👤 Student: @{feedback['student_handle']}\n"
+            text += (
+                f"📚 Homework: {feedback['homework_title'] or 'Untitled'}\n"
+                f"✍️ Feedback: {feedback_text[:100]}...\n"
+                f"🕒 Date: {created_at}\n"
+                f"-------------------\n\n"
+            )
+            yield cursor or "", text
+
     async def list_pending_feedback(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Show list of submissions pending feedback"""
         if not await self.check_user_role(str(update.effective_user.id), 'teacher'):
@@ -103,11 +89,6 @@ class FeedbackHandler(BaseHandler):
             )
             return ConversationHandler.END
 
-        # Store submissions in context for later use
-        context.user_data['submissions'] = {
-            sub['id']: sub for sub in submissions
-        }
-
         # Create options with just the submission ID as callback data
         options = [
             (
@@ -125,6 +106,9 @@ class FeedbackHandler(BaseHandler):
             )
             return ConversationHandler.END
 
+        # Only the ids are kept (user_data is persisted), the chosen one is fetched
+        context.user_data['pending_submission_ids'] = [submission_id for submission_id, _ in options]
+
         markup = create_selection_menu(options, done_button=False)
         await update.message.reply_text(
             "Select submission to review:",
@@ -138,16 +122,24 @@ class FeedbackHandler(BaseHandler):
         await query.answer()
 
         submission_id = query.data
-        # Get submission data from stored context
-        submission = context.user_data['submissions'][submission_id]
-        context.user_data['selected_submission'] = submission
+        if submission_id not in context.user_data.get('pending_submission_ids', []):
+            await query.edit_message_text("Something went wrong. Please start over with /pending_feedback")
+            return ConversationHandler.END
+
+        submission = await self.api_client.get_submission_by_id(submission_id)
+        student = await self.api_client.get_user_by_id(submission['student_id'])
+        homework = await self.api_client.get_homework_by_id(submission['homework_task_id'])
+        context.user_data['selected_submission'] = {
+            'id': submission['id'],
+            'student_id': submission['student_id']
+        }
 
         # Use create_selection_menu with just the home button
         markup = create_selection_menu([], done_button=False)
 
         await query.edit_message_text(
-            f"Selected submission from student @{submission['student_handle']}\n"
-            f"For homework: {submission['homework_title']}\n\n"
+            f"Selected submission from student @{student['tg_handle']}\n"
+            f"For homework: {homework['content'].get('title', 'Untitled')}\n\n"
             f"Content: {submission['content']['text']}\n\n"
             "Please write your feedback:",
             reply_markup=create_selection_menu([], done_button=False)  # Just home button
@@ -183,5 +175,5 @@ class FeedbackHandler(BaseHandler):
 
         # Clear the stored data
         context.user_data.pop('selected_submission', None)
-        context.user_data.pop('submissions', None)
+        context.user_data.pop('pending_submission_ids', None)
         return ConversationHandler.END
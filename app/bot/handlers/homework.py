@@ -1,37 +1,106 @@
 """
 This handler provides:
-1. Listing homework (different views for students and teachers)
+1. Listing homework (different views for students and teachers), streamed
+   in message-sized chunks with a "More" button for long histories
 2. Starting homework assignment process (teachers only)
 3. Handling homework content input
-4. Student selection with toggle functionality
+4. Student selection with toggle functionality, paging and handle search
+   over a roster cached in memory for all teachers, plus an inline query
+   ("Find student") that searches every student through the API
 5. Proper cleanup of temporary data
 6. Error handling at each step
 """
 
+import time
+from typing import Dict, List, Optional
 from .base import BaseHandler
-from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup
+from telegram import (
+    Update,
+    InlineKeyboardButton,
+    InlineKeyboardMarkup,
+    InlineQueryResultArticle,
+    InputTextMessageContent
+)
+from telegram.error import BadRequest
 from telegram.ext import ContextTypes, ConversationHandler
-from .utils import create_selection_menu
+from .utils import (
+    create_selection_menu,
+    filter_by_prefix,
+    page_count,
+    reply_in_chunks,
+    PAGE_CALLBACK_PREFIX
+)
 from .submission import SubmissionHandler
 
+import logging
+logger = logging.getLogger(__name__)
+
 AWAITING_CONTENT = 1
 AWAITING_STUDENTS = 2
 
+STUDENTS_PER_PAGE = 10
+ROSTER_TTL = 300  # Seconds a fetched student roster is reused for
+ROLE_CHECK_TTL = 300  # Seconds an inline query trusts the last teacher check
+
+MORE_HOMEWORK_PREFIX = "more_homework_"
+
+# Inline query results send "➕ <student id> @<handle>" into the /assign chat
+PICK_STUDENT_PREFIX = "➕ "
+PICK_STUDENT_PATTERN = rf"^{PICK_STUDENT_PREFIX}(usr_\S+)"
+INLINE_RESULTS = 20
+
 class HomeworkHandler(BaseHandler):
     def __init__(self, api_client):
         super().__init__(api_client)
         self.submission_handler = SubmissionHandler(api_client)  # Add this
+        # Every student, shared by all conversations. Kept out of user_data
+        # so the persisted state stays small
+        self._roster: Optional[List[Dict]] = None
+        self._roster_fetched_at = 0.0
+
+    async def _student_roster(self) -> List[Dict]:
+        """Every student sorted by handle, fetched again once it's ROSTER_TTL old"""
+        if self._roster is None or time.monotonic() - self._roster_fetched_at > ROSTER_TTL:
+            self._roster = await self.api_client.get_student_roster()
+            self._roster_fetched_at = time.monotonic()
+        return self._roster
 
     async def list_homework(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Show homework list based on user role"""
-        user = await self.api_client.get_user_by_telegram_id(
-            str(update.effective_user.id)
+        await self._send_homework(update.message, str(update.effective_user.id), offset=0)
+
+    async def handle_more_homework(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+        """Continue the homework list from where the previous reply stopped"""
+        query = update.callback_query
+        await query.answer()
+        offset = int(query.data[len(MORE_HOMEWORK_PREFIX):])
+        await self._send_homework(query.message, str(query.from_user.id), offset=offset)
+
+    async def _send_homework(self, message, telegram_id: str, offset: int):
+        user = await self.api_client.get_user_by_telegram_id(telegram_id)
+
+        if user['role'] == 'student':
+            header = "📚 Your homework:\n\n"
+        else:
+            header = "📚 Homework you've assigned:\n\n"
+
+        await reply_in_chunks(
+            message,
+            header,
+            self._homework_entries(user, offset),
+            empty_text="No homework found!",
+            more_callback=MORE_HOMEWORK_PREFIX
         )
 
+    async def _homework_entries(self, user, offset: int):
+        """Yield (offset, text) for each homework, fetching pages lazily"""
         if user['role'] == 'student':
-            homework_list = await self.api_client.get_homework_for_student(user['id'])
-            message = "📚 Your homework:\n\n"
-            for hw in homework_list:
+            path = f"/homework/student/{user['id']}"
+        else:
+            path = f"/homework/teacher/{user['id']}"
+
+        async for cursor, hw in self.api_client.iter_items(path, offset=offset):
+            if user['role'] == 'student':
                 status_emoji = {
                     'pending': '⏳',
                     'completed': '✅',
@@ -39,31 +108,18 @@ class HomeworkHandler(BaseHandler):
                     'feedback_received': '📝',
                 }.get(hw['status'], '❓')
 
-                message += (
+                yield cursor, (
                     f"{status_emoji} {hw['content'].get('title', 'Untitled')}\n"
                     f"ID: {hw['id']}\n"
                     f"Status: {hw['status']}\n\n"
                 )
-        else:
-            homework_list = await self.api_client.get_homework_for_teacher(user['id'])
-            message = "📚 Homework you've assigned:\n\n"
-            for hw in homework_list:
-                message += (
+            else:
+                yield cursor, (
                     f"📝 {hw['content'].get('title', 'Untitled')}\n"
                     f"ID: {hw['id']}\n"
                     f"Assigned to: {len(hw['student_ids'])} students\n\n"
                 )
 
-        # if user['role'] == 'student':
-        #     custom_buttons = [[InlineKeyboardButton("📝 Submit Homework", callback_data="submit_homework")]]
-        # else:
-        #     custom_buttons = None
-        custom_buttons = None
-        await update.message.reply_text(
-            message or "No homework found!",
-            reply_markup=create_selection_menu([], custom_buttons=custom_buttons)
-        )
-
     async def handle_submit_button(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Handle the submit homework button press"""
         query = update.callback_query
@@ -96,25 +152,17 @@ class HomeworkHandler(BaseHandler):
                 "description": description
             }
 
-            # Get list of students
-            students = await self.api_client.get_all_students()
-            if students == []:
+            roster = await self._student_roster()
+            if roster == []:
                 await update.message.reply_text("No students found!\nUse /help to see available commands")
                 return ConversationHandler.END
 
-            options = [
-                (student['id'], f"{'✅ ' if student['id'] in context.user_data.get('selected_students', []) else '❌ '}{student['tg_handle']}")
-                for student in students
-            ]
+            context.user_data['selected_students'] = []
+            context.user_data['student_page'] = 0
+            context.user_data['student_search'] = ""
 
-            await update.message.reply_text(
-                "Select students to assign homework to:",
-                reply_markup=create_selection_menu(
-                    options,
-                    done_button=True,  # We need the Done button here
-                    home_button=False
-                )
-            )
+            text, markup = self._render_student_picker(context, roster)
+            await update.message.reply_text(text, reply_markup=markup)
             return AWAITING_STUDENTS
 
         except Exception as e:
@@ -123,12 +171,49 @@ class HomeworkHandler(BaseHandler):
             )
             return AWAITING_CONTENT
 
+    def _render_student_picker(self, context: ContextTypes.DEFAULT_TYPE, roster: List[Dict]):
+        """Build the picker message and keyboard for the current page and search"""
+        search = context.user_data.get('student_search', "")
+        students = filter_by_prefix(roster, search)
+        selected = set(context.user_data['selected_students'])
+
+        total_pages = page_count(len(students), STUDENTS_PER_PAGE)
+        page = min(context.user_data.get('student_page', 0), total_pages - 1)
+        context.user_data['student_page'] = page
+
+        options = [
+            (student['id'], f"{'✅ ' if student['id'] in selected else '❌ '}{student['tg_handle']}")
+            for student in students
+        ]
+
+        text = "Select students to assign homework to:\n"
+        if search:
+            text += f"\nSearch: {search} ({len(students)} matching)"
+        text += (
+            f"\nPage {page + 1}/{total_pages}"
+            f"\nSelected students: {len(selected)}"
+            "\n\nSend a message to search by handle, or tap 🔎 Find student."
+        )
+
+        tools = [InlineKeyboardButton("🔎 Find student", switch_inline_query_current_chat="")]
+        if search:
+            tools.insert(0, InlineKeyboardButton("✖️ Clear search", callback_data="clear_search"))
+        custom_buttons = [tools]
+
+        markup = create_selection_menu(
+            options,
+            done_button=True,
+            home_button=False,
+            custom_buttons=custom_buttons,
+            page=page,
+            page_size=STUDENTS_PER_PAGE
+        )
+        return text, markup
+
     async def handle_student_selection(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         query = update.callback_query
         await query.answer()
 
-        import logging
-        logger = logging.getLogger(__name__)  # Add logger
         logger.info(f"Callback data received: {query.data}")
 
         if query.data == "done":
@@ -163,49 +248,88 @@ class HomeworkHandler(BaseHandler):
 
             return ConversationHandler.END
 
-        else:
-            student_id = query.data
-            logger.info(f"Callback data handled: {student_id}")
-            if 'selected_students' not in context.user_data:
-                context.user_data['selected_students'] = []
+        if 'homework_content' not in context.user_data:
+            await query.edit_message_text("Something went wrong. Please start over with /assign")
+            return ConversationHandler.END
 
+        if query.data.startswith(PAGE_CALLBACK_PREFIX):
+            context.user_data['student_page'] = int(query.data[len(PAGE_CALLBACK_PREFIX):])
+        elif query.data == "clear_search":
+            context.user_data['student_search'] = ""
+            context.user_data['student_page'] = 0
+        else:
             # Toggle student selection
-            if student_id in context.user_data['selected_students']:
-                context.user_data['selected_students'].remove(student_id)
+            student_id = query.data
+            selected_students = context.user_data.setdefault('selected_students', [])
+            if student_id in selected_students:
+                selected_students.remove(student_id)
             else:
-                context.user_data['selected_students'].append(student_id)
-
-            # Update message with current selection
-            students = await self.api_client.get_all_students()
-            keyboard = []
-            message_text = "Select students to assign homework to:\n\nSelected students:"
-
-            for student in students:
-                logger.info(f"Callback data created: {student['id']}")
-                selected = "✅ " if student['id'] in context.user_data['selected_students'] else "❌ "
-                options = [
-                    (student['id'], f"{'✅ ' if student['id'] in context.user_data['selected_students'] else '❌ '}{student['tg_handle']}")
-                    for student in students
-                ]
-                if student['id'] in context.user_data['selected_students']:
-                    message_text += f"\n- {student['tg_handle']}"
+                selected_students.append(student_id)
 
-            try:
-                # Try to edit both message text and reply markup
-                await query.edit_message_text(
-                    text=message_text,
-                    reply_markup=create_selection_menu(
-                        options,
-                        done_button=True,
-                        home_button=False
-                    )
+        text, markup = self._render_student_picker(context, await self._student_roster())
+        try:
+            await query.edit_message_text(text=text, reply_markup=markup)
+        except BadRequest as e:
+            # If the message content hasn't changed, just ignore the error
+            if "Message is not modified" not in str(e):
+                raise
+
+        return AWAITING_STUDENTS
+
+    async def student_inline_query(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+        """Answer "@bot <handle>" inline queries from teachers with matching students"""
+        inline_query = update.inline_query
+        # Inline queries arrive per keystroke, so the role check is cached for a
+        # while; /start clears it when the role changes
+        if time.time() - context.user_data.get('is_teacher_checked_at', 0) > ROLE_CHECK_TTL:
+            context.user_data['is_teacher'] = await self.check_user_role(
+                str(inline_query.from_user.id), 'teacher'
+            )
+            context.user_data['is_teacher_checked_at'] = time.time()
+        if not context.user_data['is_teacher'] or not inline_query.query.strip():
+            await inline_query.answer([], cache_time=0, is_personal=True)
+            return
+
+        students = await self.api_client.search_users(
+            inline_query.query, role='student', limit=INLINE_RESULTS
+        )
+        results = [
+            InlineQueryResultArticle(
+                id=student['id'],
+                title=f"@{student['tg_handle']}",
+                description="Add to the homework you're assigning",
+                input_message_content=InputTextMessageContent(
+                    f"{PICK_STUDENT_PREFIX}{student['id']} @{student['tg_handle']}"
                 )
-            except telegram.error.BadRequest as e:
-                if "Message is not modified" in str(e):
-                    # If the message content hasn't changed, just ignore the error
-                    pass
-                else:
-                    # If it's a different error, raise it
-                    raise
+            )
+            for student in students
+        ]
+        await inline_query.answer(results, cache_time=5, is_personal=True)
 
-            return AWAITING_STUDENTS
+    async def handle_student_pick(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+        """Select a student chosen from the inline query results"""
+        if 'homework_content' not in context.user_data:
+            await update.message.reply_text("Something went wrong. Please start over with /assign")
+            return ConversationHandler.END
+
+        student_id = context.matches[0].group(1)
+        selected_students = context.user_data.setdefault('selected_students', [])
+        if student_id not in selected_students:
+            selected_students.append(student_id)
+
+        text, markup = self._render_student_picker(context, await self._student_roster())
+        await update.message.reply_text(text, reply_markup=markup)
+        return AWAITING_STUDENTS
+
+    async def handle_student_search(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+        """Filter the student picker by handle prefix"""
+        if 'homework_content' not in context.user_data:
+            await update.message.reply_text("Something went wrong. Please start over with /assign")
+            return ConversationHandler.END
+
+        context.user_data['student_search'] = update.message.text.strip()
+        context.user_data['student_page'] = 0
+
+        text, markup = self._render_student_picker(context, await self._student_roster())
+        await update.message.reply_text(text, reply_markup=markup)
+        return AWAITING_STUDENTS
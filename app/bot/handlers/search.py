@@ -0,0 +1,39 @@
+from telegram import Update
+from telegram.ext import ContextTypes
+from .base import BaseHandler
+
+import logging
+logger = logging.getLogger(__name__)
+
+KIND_EMOJI = {
+    "homework": "📚",
+    "submission": "📤",
+    "feedback": "✍️"
+}
+
+class SearchHandler(BaseHandler):
+    async def search(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+        """Handler for /search <words> - full-text search over your coursework"""
+        query = " ".join(context.args or []).strip()
+        if not query:
+            await update.message.reply_text(
+                "Usage: /search <words>\n\n"
+                "Example: /search salsa turn\n"
+                "Use quotes for phrases and -word to exclude a word."
+            )
+            return
+
+        user = await self.api_client.get_user_by_telegram_id(str(update.effective_user.id))
+        results = await self.api_client.search(query, user)
+
+        if not results:
+            await update.message.reply_text(f"Nothing found for \"{query}\".")
+            return
+
+        lines = [f"🔎 Results for \"{query}\":\n"]
+        for result in results:
+            lines.append(
+                f"{KIND_EMOJI.get(result['kind'], '•')} {result['headline']}\n"
+                f"🕒 {result['created_at'][:10]} · {result['id']}\n"
+            )
+        await update.message.reply_text("\n".join(lines))
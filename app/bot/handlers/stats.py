@@ -0,0 +1,56 @@
+from telegram import Update
+from telegram.ext import ContextTypes
+from .base import BaseHandler
+
+import logging
+logger = logging.getLogger(__name__)
+
+def format_duration(seconds: float) -> str:
+    """Rough human duration, e.g. `45 min`, `5.5 h`, `3.2 days`"""
+    if seconds < 3600:
+        return f"{seconds / 60:.0f} min"
+    if seconds < 86400:
+        return f"{seconds / 3600:.1f} h"
+    return f"{seconds / 86400:.1f} days"
+
+class StatsHandler(BaseHandler):
+    async def stats(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+        """Handler for /stats - a teacher's review queue and class progress"""
+        user = await self.api_client.get_user_by_telegram_id(str(update.effective_user.id))
+        if user['role'] != 'teacher':
+            await update.message.reply_text("Only teachers can view class statistics!")
+            return
+
+        stats = await self.api_client.get_teacher_stats(user['id'])
+
+        lines = [
+            "📊 Your class statistics\n",
+            f"📝 Waiting for review: {stats['pending_review']}"
+            + (f" (oldest since {stats['oldest_pending_at'][:10]})" if stats['oldest_pending_at'] else ""),
+            f"⏱ Median review time: "
+            + (format_duration(stats['median_review_seconds']) if stats['median_review_seconds'] is not None else "n/a"),
+            f"📚 Homework: {stats['homework_count']} · "
+            f"{stats['submission_rate']:.0%} submitted · {stats['completion_rate']:.0%} completed\n"
+        ]
+
+        if stats['homework']:
+            lines.append("Recent homework:")
+            for hw in stats['homework']:
+                lines.append(
+                    f"• {hw['title'] or 'Untitled'}: "
+                    f"{hw['submitted_count']}/{hw['assigned_count']} submitted, "
+                    f"{hw['completed_count']}/{hw['assigned_count']} completed"
+                )
+            lines.append("")
+
+        if stats['overdue_students']:
+            lines.append(f"⚠️ Overdue students ({stats['overdue_students_total']}):")
+            for student in stats['overdue_students']:
+                lines.append(
+                    f"• @{student['tg_handle']}: {student['overdue_count']} homework, "
+                    f"since {student['oldest_assigned_at'][:10]}"
+                )
+        else:
+            lines.append("✅ No overdue students")
+
+        await update.message.reply_text("\n".join(lines))
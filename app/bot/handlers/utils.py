@@ -1,12 +1,24 @@
-from typing import List, Tuple, Optional
-from telegram import InlineKeyboardButton, InlineKeyboardMarkup
+from typing import AsyncIterator, Dict, List, Tuple, Optional, Union
+from bisect import bisect_left
+from telegram import InlineKeyboardButton, InlineKeyboardMarkup, Message
+
+PAGE_CALLBACK_PREFIX = "page_"
+
+TELEGRAM_MESSAGE_LIMIT = 4096
+MAX_CHUNKS_PER_REPLY = 3
+
+def page_count(total: int, page_size: int) -> int:
+    """Number of pages needed to show `total` items (at least one)"""
+    return max(1, -(-total // page_size))
 
 def create_selection_menu(
     options: List[Tuple[str, str]],  # List of (callback_data, display_text) tuples
     done_button: bool = False,
     home_button: bool = True,
     items_per_row: int = 1,
-    custom_buttons: Optional[List[List[InlineKeyboardButton]]] = None
+    custom_buttons: Optional[List[List[InlineKeyboardButton]]] = None,
+    page: int = 0,
+    page_size: Optional[int] = None
 ) -> InlineKeyboardMarkup:
     """
     Create an inline keyboard markup with the given options.
@@ -17,12 +29,30 @@ def create_selection_menu(
         home_button: Whether to add a "Back to Main Menu" button
         items_per_row: Number of items per row in the keyboard
         custom_buttons: Additional custom buttons to add before home/done buttons
+        page: Zero-based page to show when paginating
+        page_size: Options per page; adds prev/next buttons (`page_<n>` callbacks)
+            when there is more than one page. None shows all options
 
     Returns:
         InlineKeyboardMarkup with the specified options
     """
     keyboard = []
     current_row = []
+    navigation = []
+
+    if page_size:
+        total_pages = page_count(len(options), page_size)
+        page = min(max(page, 0), total_pages - 1)
+        options = options[page * page_size:(page + 1) * page_size]
+
+        if page > 0:
+            navigation.append(InlineKeyboardButton(
+                "⬅️ Prev", callback_data=f"{PAGE_CALLBACK_PREFIX}{page - 1}"
+            ))
+        if page < total_pages - 1:
+            navigation.append(InlineKeyboardButton(
+                "Next ➡️", callback_data=f"{PAGE_CALLBACK_PREFIX}{page + 1}"
+            ))
 
     # Add main options
     for callback_data, display_text in options:
@@ -37,6 +67,9 @@ def create_selection_menu(
     if current_row:  # Add any remaining buttons
         keyboard.append(current_row)
 
+    if navigation:
+        keyboard.append(navigation)
+
     # Add custom buttons if provided
     if custom_buttons:
         keyboard.extend(custom_buttons)
@@ -50,3 +83,72 @@ def create_selection_menu(
         keyboard.append([InlineKeyboardButton("🏠 Back to Main Menu", callback_data="main_menu")])
 
     return InlineKeyboardMarkup(keyboard)
+
+def filter_by_prefix(roster: List[Dict], prefix: str, key: str = 'tg_handle') -> List[Dict]:
+    """
+    Return the roster entries whose `key` starts with `prefix` (case-insensitive).
+
+    The roster must be sorted by the lowercased `key`, which lets the match be
+    found with a binary search instead of a scan.
+    """
+    prefix = prefix.lower().lstrip('@')
+    if not prefix:
+        return roster
+
+    sort_key = lambda entry: entry[key].lower()
+    start = bisect_left(roster, prefix, key=sort_key)
+    end = bisect_left(roster, prefix + '\U0010ffff', lo=start, key=sort_key)
+    return roster[start:end]
+
+async def reply_in_chunks(
+    message: Message,
+    header: str,
+    entries: AsyncIterator[Tuple[Union[int, str], str]],
+    empty_text: str,
+    more_callback: Optional[str] = None,
+    max_chunks: int = MAX_CHUNKS_PER_REPLY,
+    limit: int = TELEGRAM_MESSAGE_LIMIT
+) -> int:
+    """
+    Stream entries to the chat as messages of at most `limit` characters.
+
+    Entries are (cursor, text) pairs produced lazily, so the first message goes
+    out as soon as one chunk is full, regardless of how much history exists.
+    After `max_chunks` messages the last one gets a "More" button whose callback
+    data is `more_callback` followed by the cursor of the first unsent entry.
+
+    Returns:
+        Number of messages sent
+    """
+    sent = 0
+    buffer = header
+
+    async def flush(reply_markup=None):
+        nonlocal sent, buffer
+        await message.reply_text(buffer, reply_markup=reply_markup)
+        sent += 1
+        buffer = ""
+
+    has_entries = False
+    try:
+        async for cursor, text in entries:
+            has_entries = True
+            if len(buffer) + len(text) > limit and buffer:
+                if sent + 1 == max_chunks and more_callback:
+                    await flush(create_selection_menu([], custom_buttons=[[
+                        InlineKeyboardButton("📄 More", callback_data=f"{more_callback}{cursor}")
+                    ]]))
+                    return sent
+                await flush()
+            # A single oversized entry is split on the hard limit
+            while len(text) > limit:
+                buffer, text = text[:limit], text[limit:]
+                await flush()
+            buffer += text
+    finally:
+        await entries.aclose()
+
+    if not has_entries:
+        buffer = empty_text
+    await flush(create_selection_menu([], done_button=False))
+    return sent
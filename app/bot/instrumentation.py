@@ -0,0 +1,67 @@
+"""
+Bot-side metrics:
+1. Latency of every registered handler
+2. API calls and retries attributed to the handler that made them
+3. A root span per handled update, so API requests join the command's trace
+4. The Telegram user behind the current update, for per-user API routing
+"""
+
+import functools
+import time
+from contextvars import ContextVar
+from typing import Callable, List, Optional
+
+from opentelemetry import trace
+
+from ..core.metrics import (
+    BOT_HANDLER_LATENCY,
+    BOT_API_CALLS,
+    BOT_API_RETRIES,
+    BOT_API_CALLS_PER_HANDLER
+)
+
+tracer = trace.get_tracer(__name__)
+
+# Handler currently processing an update in this task
+current_handler: ContextVar[str] = ContextVar("current_handler", default="none")
+# Telegram user whose update the current handler is processing
+current_user: ContextVar[Optional[int]] = ContextVar("current_user", default=None)
+# Mutable counter of API calls made by the current handler
+_api_call_count: ContextVar[Optional[List[int]]] = ContextVar("api_call_count", default=None)
+
+def track_handler(name: str, callback: Callable) -> Callable:
+    """Wrap a handler callback to record its latency and API usage under `name`"""
+    @functools.wraps(callback)
+    async def wrapper(update, context):
+        handler_token = current_handler.set(name)
+        user = getattr(update, "effective_user", None)
+        user_token = current_user.set(user.id if user else None)
+        calls = [0]
+        calls_token = _api_call_count.set(calls)
+        status = "ok"
+        start_time = time.perf_counter()
+        try:
+            with tracer.start_as_current_span(f"bot {name}", attributes={"bot.handler": name}):
+                return await callback(update, context)
+        except Exception:
+            status = "error"
+            raise
+        finally:
+            BOT_HANDLER_LATENCY.labels(handler=name, status=status).observe(
+                time.perf_counter() - start_time
+            )
+            BOT_API_CALLS_PER_HANDLER.labels(handler=name).observe(calls[0])
+            _api_call_count.reset(calls_token)
+            current_user.reset(user_token)
+            current_handler.reset(handler_token)
+
+    return wrapper
+
+def record_api_call():
+    BOT_API_CALLS.labels(handler=current_handler.get()).inc()
+    calls = _api_call_count.get()
+    if calls is not None:
+        calls[0] += 1
+
+def record_api_retry():
+    BOT_API_RETRIES.labels(handler=current_handler.get()).inc()
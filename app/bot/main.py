@@ -10,17 +10,37 @@ load_dotenv()
 
 from telegram.ext import (
     Application,
+    ApplicationBuilder,
     CommandHandler,
     CallbackQueryHandler,
+    InlineQueryHandler,
     MessageHandler,
     filters,
     ConversationHandler
 )
 from telegram import Update
-from .handlers.homework import HomeworkHandler, AWAITING_CONTENT, AWAITING_STUDENTS
+from .handlers.homework import (
+    HomeworkHandler,
+    AWAITING_CONTENT,
+    AWAITING_STUDENTS,
+    MORE_HOMEWORK_PREFIX,
+    PICK_STUDENT_PATTERN
+)
 from .handlers.submission import SubmissionHandler, AWAITING_HOMEWORK_SELECTION, AWAITING_SUBMISSION
-from .handlers.feedback import FeedbackHandler, AWAITING_SUBMISSION_SELECTION, AWAITING_FEEDBACK
+from .handlers.feedback import (
+    FeedbackHandler,
+    AWAITING_SUBMISSION_SELECTION,
+    AWAITING_FEEDBACK,
+    MORE_FEEDBACK_PREFIX
+)
 from .handlers.basic import BasicHandler
+from .handlers.search import SearchHandler
+from .handlers.stats import StatsHandler
+from .persistence import PostgresPersistence
+from .instrumentation import track_handler
+from ..core.config import settings
+from ..core.tracing import setup_tracing
+from prometheus_client import start_http_server
 
 # Configure logging
 logging.basicConfig(
@@ -55,92 +75,165 @@ class DanceEducationBot:
         # Verify API connection first
         asyncio.get_event_loop().run_until_complete(self.verify_api_connection())
 
+        self.application = self.build_application(
+            Application.builder().token(os.getenv("TELEGRAM_BOT_TOKEN"))
+        )
+
+    def build_application(self, builder: ApplicationBuilder) -> Application:
+        """Build the application from `builder` and register every handler on it"""
         # Initialize handlers
         basic_handler = BasicHandler(self.api_client)
         homework_handler = HomeworkHandler(self.api_client)
         submission_handler = SubmissionHandler(self.api_client)
         feedback_handler = FeedbackHandler(self.api_client)
+        search_handler = SearchHandler(self.api_client)
+        stats_handler = StatsHandler(self.api_client)
 
-        # Build application
-        self.application = Application.builder().token(
-            os.getenv("TELEGRAM_BOT_TOKEN")
-        ).build()
+        # Keep conversation state in Postgres so a restart doesn't lose it. Polling
+        # allows one bot process at a time, so this isn't for running replicas
+        persistent = os.getenv("BOT_PERSISTENCE", "postgres") == "postgres"
+        if persistent:
+            builder = builder.persistence(PostgresPersistence())
+
+        application = builder.build()
 
         # Add basic handlers
-        self.application.add_handler(CommandHandler("start", basic_handler.start))
-        self.application.add_handler(CommandHandler("help", basic_handler.help))
-        self.application.add_handler(
-            CallbackQueryHandler(basic_handler.role_callback, pattern="^role_")
+        application.add_handler(
+            CommandHandler("start", track_handler("start", basic_handler.start))
+        )
+        application.add_handler(
+            CommandHandler("help", track_handler("help", basic_handler.help))
+        )
+        application.add_handler(
+            CallbackQueryHandler(
+                track_handler("role_callback", basic_handler.role_callback),
+                pattern="^role_"
+            )
         )
 
         # Add other handlers
-        self.application.add_handler(CommandHandler("homework", homework_handler.list_homework))
-        self.application.add_handler(
+        application.add_handler(
+            CommandHandler("homework", track_handler("list_homework", homework_handler.list_homework))
+        )
+        application.add_handler(
             CallbackQueryHandler(
-                homework_handler.handle_submit_button,
+                track_handler("handle_more_homework", homework_handler.handle_more_homework),
+                pattern=f"^{MORE_HOMEWORK_PREFIX}"
+            )
+        )
+        application.add_handler(
+            CallbackQueryHandler(
+                track_handler("handle_submit_button", homework_handler.handle_submit_button),
                 pattern="^submit_homework$"
             )
         )
-        self.application.add_handler(ConversationHandler(
-            entry_points=[CommandHandler("assign", homework_handler.start_assign)],
+        application.add_handler(ConversationHandler(
+            entry_points=[
+                CommandHandler("assign", track_handler("start_assign", homework_handler.start_assign))
+            ],
             states={
                 AWAITING_CONTENT: [MessageHandler(
                     filters.TEXT & ~filters.COMMAND,
-                    homework_handler.handle_homework_content
+                    track_handler("handle_homework_content", homework_handler.handle_homework_content)
                 )],
-                AWAITING_STUDENTS: [CallbackQueryHandler(
-                    homework_handler.handle_student_selection,
-                    pattern="^(usr_|done)"
-                )]
+                AWAITING_STUDENTS: [
+                    CallbackQueryHandler(
+                        track_handler("handle_student_selection", homework_handler.handle_student_selection),
+                        pattern="^(usr_|done|page_|clear_search)"
+                    ),
+                    MessageHandler(
+                        filters.VIA_BOT & filters.Regex(PICK_STUDENT_PATTERN),
+                        track_handler("handle_student_pick", homework_handler.handle_student_pick)
+                    ),
+                    MessageHandler(
+                        filters.TEXT & ~filters.COMMAND,
+                        track_handler("handle_student_search", homework_handler.handle_student_search)
+                    )
+                ]
             },
-            fallbacks=[CommandHandler("cancel", homework_handler.cancel)]
+            fallbacks=[CommandHandler("cancel", track_handler("cancel", homework_handler.cancel))],
+            name="assign_homework",
+            persistent=persistent
         ))
 
-        self.application.add_handler(ConversationHandler(
-            entry_points=[CommandHandler("submit", submission_handler.start_submit)],
+        # "🔎 Find student" in the /assign picker opens an inline query in the chat
+        application.add_handler(
+            InlineQueryHandler(track_handler("student_inline_query", homework_handler.student_inline_query))
+        )
+
+        application.add_handler(ConversationHandler(
+            entry_points=[
+                CommandHandler("submit", track_handler("start_submit", submission_handler.start_submit))
+            ],
             states={
                 AWAITING_HOMEWORK_SELECTION: [
-                    CallbackQueryHandler(submission_handler.handle_homework_selection)
+                    CallbackQueryHandler(track_handler(
+                        "handle_homework_selection", submission_handler.handle_homework_selection
+                    ))
                 ],
                 AWAITING_SUBMISSION: [
                     MessageHandler(
                         filters.TEXT & ~filters.COMMAND,
-                        submission_handler.handle_submission
+                        track_handler("handle_submission", submission_handler.handle_submission)
                     )
                 ]
             },
-            fallbacks=[CommandHandler("cancel", submission_handler.cancel)]
+            fallbacks=[CommandHandler("cancel", track_handler("cancel", submission_handler.cancel))],
+            name="submit_homework",
+            persistent=persistent
         ))
 
 
-        self.application.add_handler(
-            CommandHandler("feedback", feedback_handler.list_feedback)
+        application.add_handler(
+            CommandHandler("feedback", track_handler("list_feedback", feedback_handler.list_feedback))
+        )
+        application.add_handler(
+            CallbackQueryHandler(
+                track_handler("handle_more_feedback", feedback_handler.handle_more_feedback),
+                pattern=f"^{MORE_FEEDBACK_PREFIX}"
+            )
+        )
+
+        application.add_handler(
+            CommandHandler("search", track_handler("search", search_handler.search))
+        )
+        application.add_handler(
+            CommandHandler("stats", track_handler("stats", stats_handler.stats))
         )
 
         # Add callback handler for main menu button
-        self.application.add_handler(
+        application.add_handler(
             CallbackQueryHandler(
-                basic_handler.return_to_main_menu,
+                track_handler("return_to_main_menu", basic_handler.return_to_main_menu),
                 pattern="^main_menu$"
             )
         )
 
-        self.application.add_handler(ConversationHandler(
-            entry_points=[CommandHandler("pending_feedback", feedback_handler.list_pending_feedback)],
+        application.add_handler(ConversationHandler(
+            entry_points=[CommandHandler(
+                "pending_feedback",
+                track_handler("list_pending_feedback", feedback_handler.list_pending_feedback)
+            )],
             states={
                 AWAITING_SUBMISSION_SELECTION: [
-                    CallbackQueryHandler(feedback_handler.handle_submission_selection)
+                    CallbackQueryHandler(track_handler(
+                        "handle_submission_selection", feedback_handler.handle_submission_selection
+                    ))
                 ],
                 AWAITING_FEEDBACK: [
                     MessageHandler(
                         filters.TEXT & ~filters.COMMAND,
-                        feedback_handler.handle_feedback
+                        track_handler("handle_feedback", feedback_handler.handle_feedback)
                     )
                 ]
             },
-            fallbacks=[CommandHandler("cancel", feedback_handler.cancel)]
+            fallbacks=[CommandHandler("cancel", track_handler("cancel", feedback_handler.cancel))],
+            name="pending_feedback",
+            persistent=persistent
         ))
 
+        return application
+
     def start(self):
         """Start the bot"""
         # self.application.initialize()
@@ -164,6 +257,16 @@ def signal_handler(signum, frame):
 
 def main():
     """Main function"""
+    # Expose bot metrics for Prometheus
+    start_http_server(settings.BOT_METRICS_PORT)
+    logger.info(f"Metrics available on port {settings.BOT_METRICS_PORT}")
+
+    setup_tracing(
+        "bot",
+        os.getenv("TRACE_EXPORTER", "none"),
+        os.getenv("TRACE_EXPORT_FILE", "traces.jsonl")
+    )
+
     bot = DanceEducationBot()
     bot.setup()
 
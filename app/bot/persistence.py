@@ -0,0 +1,279 @@
+"""
+Conversation state for the bot, stored in the platform's Postgres.
+
+This module provides:
+1. A `BasePersistence` implementation so conversation states and
+   `context.user_data` survive restarts. It is not live sharing: PTB reads
+   conversation states once, in `Application.initialize`, and polling
+   allows one bot process at a time
+2. Compact serialization (compact JSON, zlib-compressed above a threshold)
+3. Write-behind batching: updates are staged in memory and written in one
+   upsert per batch, unchanged entries are never rewritten
+4. Refreshes that only read an entry's payload when its `updated_at` differs
+   from the version this process last wrote or read
+
+The `bot_state` table comes from the migrations, like the rest of the schema.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import zlib
+from collections import defaultdict
+from datetime import datetime
+from typing import Any, Dict, Optional, Tuple
+
+from sqlalchemy import select, delete
+from sqlalchemy.dialects.postgresql import insert
+from telegram.ext import BasePersistence, PersistenceInput
+
+from ..schemas.bot_state import bot_state
+
+logger = logging.getLogger(__name__)
+
+USER_DATA = "user_data"
+CHAT_DATA = "chat_data"
+BOT_DATA = "bot_data"
+CONVERSATION_PREFIX = "conversation:"
+
+_RAW = b"j"
+_COMPRESSED = b"z"
+
+
+def dumps(obj: Any, compress_threshold: int = 512) -> bytes:
+    """Serialize to compact JSON, compressing payloads above the threshold"""
+    raw = json.dumps(obj, separators=(",", ":"), ensure_ascii=False).encode()
+    if len(raw) > compress_threshold:
+        return _COMPRESSED + zlib.compress(raw)
+    return _RAW + raw
+
+
+def loads(payload: bytes) -> Any:
+    """Inverse of `dumps`"""
+    marker, body = payload[:1], payload[1:]
+    if marker == _COMPRESSED:
+        body = zlib.decompress(body)
+    return json.loads(body)
+
+
+class PostgresPersistence(BasePersistence):
+    def __init__(
+        self,
+        engine=None,
+        store_data: Optional[PersistenceInput] = None,
+        update_interval: float = 5,
+        write_delay: float = 0.5,
+        compress_threshold: int = 512,
+        refresh_from_db: bool = True,
+    ):
+        """
+        Args:
+            engine: SQLAlchemy engine, defaults to the platform engine from `app.db.base`
+            store_data: Which kinds of data to persist (callback data is never stored)
+            update_interval: How often the application hands changed data to us
+            write_delay: How long staged writes wait to be batched together
+            compress_threshold: Payloads larger than this many bytes are zlib-compressed
+            refresh_from_db: Reload user/chat data before each update when
+                something else has written it since, such as the process this
+                one replaced finishing its last batch
+        """
+        super().__init__(
+            store_data=store_data or PersistenceInput(callback_data=False),
+            update_interval=update_interval
+        )
+        if engine is None:
+            from ..db.base import get_engine
+            engine = get_engine()
+
+        self.engine = engine
+        self.write_delay = write_delay
+        self.compress_threshold = compress_threshold
+        self.refresh_from_db = refresh_from_db
+
+        # (kind, key) -> serialized payload, or None for a delete
+        self._pending: Dict[Tuple[str, str], Optional[bytes]] = {}
+        # (kind, key) -> digest of what we last wrote or read
+        self._digests: Dict[Tuple[str, str], bytes] = {}
+        # (kind, key) -> `updated_at` of what we last wrote or read
+        self._versions: Dict[Tuple[str, str], datetime] = {}
+        self._flush_task: Optional[asyncio.Task] = None
+        self._lock = asyncio.Lock()
+
+    # Serialization helpers
+
+    @staticmethod
+    def _digest(payload: bytes) -> bytes:
+        return hashlib.blake2b(payload, digest_size=16).digest()
+
+    def _stage(self, kind: str, key: str, data: Any) -> None:
+        """Stage a write, skipping it if the payload is unchanged"""
+        payload = dumps(data, self.compress_threshold)
+        digest = self._digest(payload)
+        if self._digests.get((kind, key)) == digest and (kind, key) not in self._pending:
+            return
+        self._digests[(kind, key)] = digest
+        self._pending[(kind, key)] = payload
+        self._schedule_flush()
+
+    def _stage_delete(self, kind: str, key: str) -> None:
+        self._digests.pop((kind, key), None)
+        self._versions.pop((kind, key), None)
+        self._pending[(kind, key)] = None
+        self._schedule_flush()
+
+    def _schedule_flush(self) -> None:
+        if self._flush_task and not self._flush_task.done():
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return  # No loop (e.g. during shutdown) - `flush` will write everything
+        self._flush_task = loop.create_task(self._delayed_flush())
+
+    async def _delayed_flush(self) -> None:
+        await asyncio.sleep(self.write_delay)
+        await self._write_pending()
+
+    # Database access (runs in a worker thread to keep the event loop free)
+
+    def _load_kind(self, kind: str) -> Dict[str, Any]:
+        with self.engine.connect() as connection:
+            rows = connection.execute(
+                select(bot_state.c.key, bot_state.c.payload, bot_state.c.updated_at)
+                .where(bot_state.c.kind == kind)
+            ).all()
+        result = {}
+        for key, payload, updated_at in rows:
+            self._digests[(kind, key)] = self._digest(payload)
+            self._versions[(kind, key)] = updated_at
+            result[key] = loads(payload)
+        return result
+
+    def _load_changed(self, kind: str, key: str) -> Optional[Tuple[bytes, datetime]]:
+        """The entry's payload and version, or None if it's missing or still at our version"""
+        with self.engine.connect() as connection:
+            return connection.execute(
+                select(bot_state.c.payload, bot_state.c.updated_at).where(
+                    bot_state.c.kind == kind,
+                    bot_state.c.key == key,
+                    bot_state.c.updated_at.is_distinct_from(self._versions.get((kind, key)))
+                )
+            ).first()
+
+    def _write_batch(self, batch: Dict[Tuple[str, str], Optional[bytes]]) -> None:
+        now = datetime.utcnow()
+        upserts = [
+            {"kind": kind, "key": key, "payload": payload, "updated_at": now}
+            for (kind, key), payload in batch.items()
+            if payload is not None
+        ]
+        deletes = [(kind, key) for (kind, key), payload in batch.items() if payload is None]
+
+        with self.engine.begin() as connection:
+            if upserts:
+                statement = insert(bot_state)
+                connection.execute(
+                    statement.on_conflict_do_update(
+                        index_elements=[bot_state.c.kind, bot_state.c.key],
+                        set_={
+                            "payload": statement.excluded.payload,
+                            "updated_at": statement.excluded.updated_at
+                        }
+                    ),
+                    upserts
+                )
+            for kind, key in deletes:
+                connection.execute(
+                    delete(bot_state).where(bot_state.c.kind == kind, bot_state.c.key == key)
+                )
+
+        for upsert in upserts:
+            self._versions[(upsert["kind"], upsert["key"])] = now
+
+    async def _write_pending(self) -> None:
+        async with self._lock:
+            if not self._pending:
+                return
+            batch, self._pending = self._pending, {}
+            try:
+                await asyncio.to_thread(self._write_batch, batch)
+                logger.debug(f"Persisted {len(batch)} bot state entries")
+            except Exception as e:
+                logger.error(f"Failed to persist bot state: {e}", exc_info=True)
+                # Put the batch back unless newer writes superseded it
+                for item, payload in batch.items():
+                    self._pending.setdefault(item, payload)
+
+    # BasePersistence API
+
+    async def get_user_data(self) -> Dict[int, Dict]:
+        data = await asyncio.to_thread(self._load_kind, USER_DATA)
+        return defaultdict(dict, {int(key): value for key, value in data.items()})
+
+    async def get_chat_data(self) -> Dict[int, Dict]:
+        data = await asyncio.to_thread(self._load_kind, CHAT_DATA)
+        return defaultdict(dict, {int(key): value for key, value in data.items()})
+
+    async def get_bot_data(self) -> Dict:
+        data = await asyncio.to_thread(self._load_kind, BOT_DATA)
+        return data.get("", {})
+
+    async def get_callback_data(self) -> None:
+        return None
+
+    async def get_conversations(self, name: str) -> Dict:
+        data = await asyncio.to_thread(self._load_kind, CONVERSATION_PREFIX + name)
+        return {tuple(json.loads(key)): state for key, state in data.items()}
+
+    async def update_conversation(self, name: str, key: Tuple, new_state: Optional[object]) -> None:
+        kind, serialized_key = CONVERSATION_PREFIX + name, json.dumps(list(key))
+        if new_state is None:
+            self._stage_delete(kind, serialized_key)
+        else:
+            self._stage(kind, serialized_key, new_state)
+
+    async def update_user_data(self, user_id: int, data: Dict) -> None:
+        self._stage(USER_DATA, str(user_id), data)
+
+    async def update_chat_data(self, chat_id: int, data: Dict) -> None:
+        self._stage(CHAT_DATA, str(chat_id), data)
+
+    async def update_bot_data(self, data: Dict) -> None:
+        self._stage(BOT_DATA, "", data)
+
+    async def update_callback_data(self, data: Any) -> None:
+        pass
+
+    async def drop_chat_data(self, chat_id: int) -> None:
+        self._stage_delete(CHAT_DATA, str(chat_id))
+
+    async def drop_user_data(self, user_id: int) -> None:
+        self._stage_delete(USER_DATA, str(user_id))
+
+    async def _refresh(self, kind: str, key: str, current: Dict) -> None:
+        if not self.refresh_from_db or (kind, key) in self._pending:
+            return  # Our local copy is newer than the database
+        changed = await asyncio.to_thread(self._load_changed, kind, key)
+        if changed is None:
+            return
+        payload, self._versions[(kind, key)] = changed
+        digest = self._digest(payload)
+        if self._digests.get((kind, key)) == digest:
+            return
+        self._digests[(kind, key)] = digest
+        current.clear()
+        current.update(loads(payload))
+
+    async def refresh_user_data(self, user_id: int, user_data: Dict) -> None:
+        await self._refresh(USER_DATA, str(user_id), user_data)
+
+    async def refresh_chat_data(self, chat_id: int, chat_data: Dict) -> None:
+        await self._refresh(CHAT_DATA, str(chat_id), chat_data)
+
+    async def refresh_bot_data(self, bot_data: Dict) -> None:
+        pass
+
+    async def flush(self) -> None:
+        # Any scheduled flush will find nothing left to write
+        await self._write_pending()
@@ -1,10 +1,17 @@
 import httpx
 import asyncio
 import logging
+import time
 from typing import Any, Optional, Dict, Union
 from httpx import Response, URL, Headers, QueryParams, Cookies
+from opentelemetry import trace
+from opentelemetry.trace import SpanKind
+from .instrumentation import current_user, record_api_call, record_api_retry
+from ..core.tracing import inject_headers
+from ..db.replicas import READ_PRIMARY_FOR_HEADER, READ_PRIMARY_HEADER
 
 logger = logging.getLogger(__name__)
+tracer = trace.get_tracer(__name__)
 
 class RetryingClient(httpx.AsyncClient):
     def __init__(
@@ -19,6 +26,8 @@ class RetryingClient(httpx.AsyncClient):
         self.max_retries = max_retries
         self.initial_retry_delay = initial_retry_delay
         self.max_retry_delay = max_retry_delay
+        # Per Telegram user, when their reads may go back to the replicas
+        self.read_primary_until: Dict[Optional[int], float] = {}
         logger.info(f"Initialized RetryingClient with base_url: {kwargs.get('base_url')}")
 
     async def _request_with_retry(
@@ -28,12 +37,48 @@ class RetryingClient(httpx.AsyncClient):
         max_retries: Optional[int] = None,
         **kwargs
     ) -> Response:
-        retry_delay = self.initial_retry_delay
         full_url = str(self.base_url) + str(url) if self.base_url else str(url)
 
         if max_retries is None:
             max_retries = self.max_retries
 
+        record_api_call()
+        with tracer.start_as_current_span(
+            f"API {method}",
+            kind=SpanKind.CLIENT,
+            attributes={"http.request.method": method, "url.full": full_url}
+        ) as span:
+            # The API continues the bot's trace from the traceparent header
+            kwargs["headers"] = inject_headers(kwargs.get("headers"))
+            user = current_user.get()
+            if self.read_primary_until.get(user, 0) > time.monotonic():
+                # Read this user's own recent writes, which replicas may not have yet
+                kwargs["headers"][READ_PRIMARY_HEADER] = "1"
+            response = await self._send_with_retry(method, url, full_url, max_retries, **kwargs)
+            if response is not None:
+                span.set_attribute("http.response.status_code", response.status_code)
+                self._remember_write(user, response)
+            return response
+
+    def _remember_write(self, user: Optional[int], response: Response):
+        window = response.headers.get(READ_PRIMARY_FOR_HEADER)
+        if not window:
+            return
+        now = time.monotonic()
+        self.read_primary_until = {
+            key: until for key, until in self.read_primary_until.items() if until > now
+        }
+        self.read_primary_until[user] = now + float(window)
+
+    async def _send_with_retry(
+        self,
+        method: str,
+        url: Union[str, URL],
+        full_url: str,
+        max_retries: int,
+        **kwargs
+    ) -> Response:
+        retry_delay = self.initial_retry_delay
         for attempt in range(max_retries):
             try:
                 logger.debug(f"Attempting {method} request to {full_url} (attempt {attempt + 1}/{self.max_retries})")
@@ -54,6 +99,7 @@ class RetryingClient(httpx.AsyncClient):
                     raise
 
             logger.info(f"Retrying in {retry_delay}s...")
+            record_api_retry()
             await asyncio.sleep(retry_delay)
             retry_delay = min(retry_delay * 2, self.max_retry_delay)
 
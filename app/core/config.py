@@ -14,11 +14,48 @@ class Settings(BaseSettings):
     DATABASE_URL: str = Field(default=os.getenv("DATABASE_URL"))
     TEST_DATABASE_URL: str = Field(default="postgresql://localhost/dance_edu_test")
 
+    # Read replicas (comma-separated URLs) for GET endpoints, see app.db.replicas
+    DATABASE_REPLICA_URLS: str = Field(default=os.getenv("DATABASE_REPLICA_URLS", ""))
+    REPLICA_MAX_LAG_SECONDS: float = Field(default=float(os.getenv("REPLICA_MAX_LAG_SECONDS", "2")))
+    REPLICA_LAG_CHECK_SECONDS: float = Field(default=float(os.getenv("REPLICA_LAG_CHECK_SECONDS", "1")))
+    # Seconds to wait for a replica connection, so an unreachable one is skipped quickly
+    REPLICA_CONNECT_TIMEOUT: int = Field(default=int(os.getenv("REPLICA_CONNECT_TIMEOUT", "2")))
+    # How long a client should read from the primary after its own write
+    READ_YOUR_WRITES_SECONDS: float = Field(default=float(os.getenv("READ_YOUR_WRITES_SECONDS", "5")))
+
+    # Connection pool of each engine, per process
+    DB_POOL_SIZE: int = Field(default=int(os.getenv("DB_POOL_SIZE", "5")))
+    DB_MAX_OVERFLOW: int = Field(default=int(os.getenv("DB_MAX_OVERFLOW", "10")))
+    DB_POOL_TIMEOUT: float = Field(default=float(os.getenv("DB_POOL_TIMEOUT", "30")))  # Seconds to wait for a connection
+    # Server-side limit on every statement, 0 for none
+    DB_STATEMENT_TIMEOUT_MS: int = Field(default=int(os.getenv("DB_STATEMENT_TIMEOUT_MS", "30000")))
+    # "pgbouncer" when DATABASE_URL points at a transaction-level pooler, see app.db.base
+    DB_POOLER: str = Field(default=os.getenv("DB_POOLER", "none"))
+
+    # What the API does on startup when the database isn't at the Alembic head: "off", "warn" or "fail"
+    SCHEMA_CHECK: str = Field(default=os.getenv("SCHEMA_CHECK", "warn"))
+
+    # Database instrumentation
+    SLOW_QUERY_THRESHOLD_MS: int = Field(default=int(os.getenv("SLOW_QUERY_THRESHOLD_MS", "200")))
+    SLOW_QUERY_LOG_SIZE: int = Field(default=100)
+    DEBUG_ENDPOINTS_ENABLED: bool = Field(
+        default=os.getenv("DEBUG_ENDPOINTS_ENABLED", "false").lower() == "true"
+    )
+
+    # Requests running more statements than this are logged (see app.core.timing)
+    QUERY_BUDGET: int = Field(default=int(os.getenv("QUERY_BUDGET", "20")))
+
     # RabbitMQ settings
     RABBITMQ_HOST: str = Field(default=os.getenv("RABBITMQ_HOST", "localhost"))
     RABBITMQ_PORT: int = Field(default=int(os.getenv("RABBITMQ_PORT", "5672")))
     RABBITMQ_USER: str = Field(default=os.getenv("RABBITMQ_USER", "guest"))
     RABBITMQ_PASS: str = Field(default=os.getenv("RABBITMQ_PASS", "guest"))
+    # Seconds to wait for a connection, or for the broker to unblock publishing
+    RABBITMQ_TIMEOUT: float = Field(default=float(os.getenv("RABBITMQ_TIMEOUT", "5")))
+
+    # Notifications the broker can't take are kept here until it's back, see
+    # app.queue.spool; empty to drop them instead
+    NOTIFICATION_SPOOL_PATH: str = Field(default=os.getenv("NOTIFICATION_SPOOL_PATH", "spool/notifications.jsonl"))
 
     # Queue names
     HOMEWORK_QUEUE: str = "homework_queue"
@@ -29,6 +66,15 @@ class Settings(BaseSettings):
     DEAD_LETTER_EXCHANGE: str = "dlx"
     MESSAGE_TTL: int = Field(default=86400000)  # 24 hours
 
+    # Metrics exporters for the consumer and bot processes (the API serves /metrics itself)
+    CONSUMER_METRICS_PORT: int = Field(default=int(os.getenv("CONSUMER_METRICS_PORT", "9101")))
+    BOT_METRICS_PORT: int = Field(default=int(os.getenv("BOT_METRICS_PORT", "9102")))
+    QUEUE_DEPTH_INTERVAL: int = Field(default=15)  # Seconds between queue depth checks
+
+    # Tracing: "none" (ids are still propagated), "console" or "file"
+    TRACE_EXPORTER: str = Field(default=os.getenv("TRACE_EXPORTER", "none"))
+    TRACE_EXPORT_FILE: str = Field(default=os.getenv("TRACE_EXPORT_FILE", "traces.jsonl"))
+
     # Telegram settings
     TELEGRAM_BOT_TOKEN: Optional[str] = Field(default=os.getenv("TELEGRAM_BOT_TOKEN"))
 
@@ -41,6 +87,27 @@ class Settings(BaseSettings):
             raise ValueError('Database URL must be a valid PostgreSQL connection string')
         return v
 
+    @field_validator('DB_POOL_SIZE', 'DB_MAX_OVERFLOW', 'DB_POOL_TIMEOUT', 'DB_STATEMENT_TIMEOUT_MS', 'REPLICA_CONNECT_TIMEOUT')
+    @classmethod
+    def validate_pool_setting(cls, v: Any) -> Any:
+        if v < 0:
+            raise ValueError('Pool sizes and timeouts cannot be negative')
+        return v
+
+    @field_validator('DB_POOLER')
+    @classmethod
+    def validate_pooler(cls, v: str) -> str:
+        if v not in ('none', 'pgbouncer'):
+            raise ValueError('DB_POOLER must be "none" or "pgbouncer"')
+        return v
+
+    @field_validator('SCHEMA_CHECK')
+    @classmethod
+    def validate_schema_check(cls, v: str) -> str:
+        if v not in ('off', 'warn', 'fail'):
+            raise ValueError('SCHEMA_CHECK must be "off", "warn" or "fail"')
+        return v
+
     @field_validator('RABBITMQ_PORT')
     @classmethod
     def validate_port(cls, v: Any) -> int:
@@ -73,7 +140,7 @@ class Settings(BaseSettings):
         """Hide sensitive information in string representation"""
         settings_dict = self.model_dump()
         # Mask sensitive fields
-        for key in ['DATABASE_URL', 'TELEGRAM_BOT_TOKEN', 'RABBITMQ_PASS']:
+        for key in ['DATABASE_URL', 'DATABASE_REPLICA_URLS', 'TELEGRAM_BOT_TOKEN', 'RABBITMQ_PASS']:
             if key in settings_dict and settings_dict[key]:
                 settings_dict[key] = '***'
         return str(settings_dict)
@@ -1,8 +1,13 @@
 from prometheus_client import Counter, Histogram, Gauge
 from prometheus_client import generate_latest, CONTENT_TYPE_LATEST
 from fastapi import FastAPI, Response
+from starlette.routing import Match
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 import time
 
+# Label used for requests that did not match any route (404s, scanners, ...)
+UNMATCHED_ROUTE = "<unmatched>"
+
 # Define metrics
 REQUEST_COUNT = Counter(
     'http_requests_total',
@@ -16,36 +21,208 @@ REQUEST_LATENCY = Histogram(
     ['method', 'endpoint']
 )
 
+REQUESTS_IN_PROGRESS = Gauge(
+    'http_requests_in_progress',
+    'HTTP requests currently being processed',
+    ['method']
+)
+
+RESPONSE_SIZE = Histogram(
+    'http_response_size_bytes',
+    'HTTP response body size',
+    ['method', 'endpoint'],
+    buckets=(100, 1_000, 10_000, 100_000, 1_000_000, 10_000_000)
+)
+
 DB_CONNECTION_GAUGE = Gauge(
     'db_connections_active',
     'Number of active database connections'
 )
 
+DB_POOL_OVERFLOW = Gauge(
+    'db_pool_overflow',
+    'Connections opened beyond the pool size, per engine (primary or replica host)',
+    ['engine']
+)
+
+DB_POOL_CHECKOUT_WAIT = Histogram(
+    'db_pool_checkout_wait_seconds',
+    'Time spent waiting for a connection from the pool',
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 30.0)
+)
+
+DB_QUERY_LATENCY = Histogram(
+    'db_query_duration_seconds',
+    'Database statement latency by normalized statement',
+    ['operation', 'table', 'fingerprint']
+)
+
+DB_READS_ROUTED = Counter(
+    'db_reads_routed_total',
+    'Read-only requests by the engine that served them and why',
+    ['target', 'reason']
+)
+
+DB_REPLICA_LAG = Gauge(
+    'db_replica_lag_seconds',
+    'Replication lag of each read replica at its last check (NaN if unreachable)',
+    ['replica']
+)
+
 QUEUE_MESSAGE_COUNT = Counter(
     'queue_messages_total',
     'Total messages processed',
     ['queue_name', 'status']
 )
 
+# Consumer metrics
+
+NOTIFICATION_COUNT = Counter(
+    'notifications_total',
+    'Notifications processed by the consumer',
+    ['type', 'status']
+)
+
+NOTIFICATION_SEND_LATENCY = Histogram(
+    'notification_send_duration_seconds',
+    'Time spent sending a notification to Telegram',
+    ['type']
+)
+
+NOTIFICATION_DELIVERY_LATENCY = Histogram(
+    'notification_delivery_seconds',
+    'Time from notification creation to delivery',
+    ['type'],
+    buckets=(0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 300.0)
+)
+
+QUEUE_LAG = Histogram(
+    'queue_lag_seconds',
+    'Time a message waited in the queue before the consumer received it',
+    ['queue_name'],
+    buckets=(0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0, 30.0, 60.0, 300.0)
+)
+
+QUEUE_DEPTH = Gauge(
+    'queue_depth',
+    'Messages waiting in the queue',
+    ['queue_name']
+)
+
+NOTIFICATIONS_SPOOLED = Counter(
+    'notifications_spooled_total',
+    'Notifications written to the local spool instead of the broker',
+    ['reason']
+)
+
+NOTIFICATION_SPOOL_BYTES = Gauge(
+    'notification_spool_bytes',
+    'Spooled notifications not yet replayed to the broker'
+)
+
+# Bot metrics
+
+BOT_HANDLER_LATENCY = Histogram(
+    'bot_handler_duration_seconds',
+    'Bot handler latency',
+    ['handler', 'status']
+)
+
+BOT_API_CALLS = Counter(
+    'bot_api_calls_total',
+    'API requests made by the bot',
+    ['handler']
+)
+
+BOT_API_RETRIES = Counter(
+    'bot_api_retries_total',
+    'API request retries made by the bot',
+    ['handler']
+)
+
+BOT_API_CALLS_PER_HANDLER = Histogram(
+    'bot_api_calls_per_handler',
+    'API requests made while handling one update',
+    ['handler'],
+    buckets=(0, 1, 2, 3, 5, 10, 20, 50, 100)
+)
+
+def route_template(scope: Scope) -> str:
+    """
+    Return the path template of the route that handled the request
+    (e.g. `/users/{user_id}`), so label cardinality is bounded by the
+    number of routes rather than the number of distinct URLs.
+    """
+    # Newer FastAPI versions keep included routers nested, so the matched
+    # route's own path lacks the include prefixes; the effective context has it
+    effective_route = scope.get("fastapi", {}).get("effective_route_context")
+    if getattr(effective_route, "path", None):
+        return effective_route.path
+
+    route = scope.get("route")
+    if route is None:
+        # Older Starlette versions don't record the matched route in the scope
+        app = scope.get("app")
+        for candidate in getattr(app, "routes", []):
+            match, _ = candidate.matches(scope)
+            if match == Match.FULL:
+                route = candidate
+                break
+    return getattr(route, "path", UNMATCHED_ROUTE)
+
+class MetricsMiddleware:
+    """
+    Pure ASGI middleware recording request count, latency, in-flight
+    requests and response size. Unlike `@app.middleware("http")` it
+    doesn't wrap requests/responses in extra objects or tasks.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        status_code = 500
+        response_size = 0
+
+        async def send_wrapper(message: Message):
+            nonlocal status_code, response_size
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            elif message["type"] == "http.response.body":
+                response_size += len(message.get("body", b""))
+            await send(message)
+
+        in_progress = REQUESTS_IN_PROGRESS.labels(method=method)
+        in_progress.inc()
+        start_time = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            duration = time.perf_counter() - start_time
+            in_progress.dec()
+
+            endpoint = route_template(scope)
+            REQUEST_COUNT.labels(
+                method=method,
+                endpoint=endpoint,
+                status_code=status_code
+            ).inc()
+            REQUEST_LATENCY.labels(
+                method=method,
+                endpoint=endpoint
+            ).observe(duration)
+            RESPONSE_SIZE.labels(
+                method=method,
+                endpoint=endpoint
+            ).observe(response_size)
+
 def setup_metrics(app: FastAPI):
-    @app.middleware("http")
-    async def metrics_middleware(request, call_next):
-        start_time = time.time()
-        response = await call_next(request)
-        duration = time.time() - start_time
-
-        REQUEST_COUNT.labels(
-            method=request.method,
-            endpoint=request.url.path,
-            status_code=response.status_code
-        ).inc()
-
-        REQUEST_LATENCY.labels(
-            method=request.method,
-            endpoint=request.url.path
-        ).observe(duration)
-
-        return response
+    app.add_middleware(MetricsMiddleware)
 
     @app.get("/metrics")
     def metrics():
@@ -0,0 +1,112 @@
+"""
+Per-request time breakdown:
+1. DB time and statement count, publish time and response serialization time,
+   accumulated while the request runs
+2. Returned to the client in a `Server-Timing` header
+3. JSON bodies rendered with orjson
+4. Requests running more statements than `QUERY_BUDGET` are logged, which
+   catches N+1 query loops
+"""
+
+import logging
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Iterator, Optional
+
+import orjson
+from fastapi.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from .config import settings
+from .metrics import route_template
+from .tracing import current_trace_id
+
+logger = logging.getLogger(__name__)
+
+class RequestTimings:
+    """Time (in seconds) spent by one request in each stage"""
+
+    def __init__(self):
+        self.db = 0.0
+        self.queries = 0
+        self.publish = 0.0
+        self.serialize = 0.0
+
+    def server_timing(self, total: float) -> str:
+        """Format as a `Server-Timing` header value (durations in ms)"""
+        return ", ".join([
+            f'db;dur={self.db * 1000:.1f};desc="{self.queries} queries"',
+            f"publish;dur={self.publish * 1000:.1f}",
+            f"serialize;dur={self.serialize * 1000:.1f}",
+            f"total;dur={total * 1000:.1f}"
+        ])
+
+# Timings of the request being handled; the object is shared with the worker
+# threads sync endpoints run in, since they get a copy of this context
+current_timings: ContextVar[Optional[RequestTimings]] = ContextVar("current_timings", default=None)
+
+def record_query(duration: float):
+    timings = current_timings.get()
+    if timings is not None:
+        timings.db += duration
+        timings.queries += 1
+
+@contextmanager
+def timed(stage: str) -> Iterator[None]:
+    """Add the time spent in the block to `stage` (`publish` or `serialize`)"""
+    timings = current_timings.get()
+    if timings is None:
+        yield
+        return
+    start_time = time.perf_counter()
+    try:
+        yield
+    finally:
+        setattr(timings, stage, getattr(timings, stage) + time.perf_counter() - start_time)
+
+class TimedJSONResponse(JSONResponse):
+    """JSONResponse rendered with orjson that records how long rendering the body took"""
+
+    def render(self, content: Any) -> bytes:
+        with timed("serialize"):
+            return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+
+class ServerTimingMiddleware:
+    """
+    Pure ASGI middleware that collects a `RequestTimings` per request, adds
+    it to the response as `Server-Timing` and logs requests over budget.
+    """
+
+    def __init__(self, app: ASGIApp, query_budget: Optional[int] = None):
+        self.app = app
+        self.query_budget = settings.QUERY_BUDGET if query_budget is None else query_budget
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        timings = RequestTimings()
+        token = current_timings.set(timings)
+        start_time = time.perf_counter()
+
+        async def send_wrapper(message: Message):
+            if message["type"] == "http.response.start":
+                header = timings.server_timing(time.perf_counter() - start_time)
+                message["headers"] = [
+                    *message.get("headers", []),
+                    (b"server-timing", header.encode())
+                ]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            current_timings.reset(token)
+            if timings.queries > self.query_budget:
+                logger.warning(
+                    f"Query budget exceeded: {scope['method']} {route_template(scope)} "
+                    f"ran {timings.queries} queries (budget {self.query_budget}) "
+                    f"taking {timings.db * 1000:.1f} ms, trace {current_trace_id()}"
+                )
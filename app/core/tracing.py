@@ -0,0 +1,134 @@
+"""
+Distributed tracing shared by the API, the notification consumer and the bot.
+
+Trace context travels in the W3C `traceparent` header: the bot sets it on
+every API request, the API continues it and copies it into the AMQP
+headers of published notifications, and the consumer continues it when
+sending to Telegram. Spans are recorded with the OpenTelemetry SDK and
+exported locally, so one trace covers bot command → API → DB → publish → send.
+"""
+
+import os
+from typing import Dict, Optional
+
+from opentelemetry import trace
+from opentelemetry.context import Context
+from opentelemetry.propagate import extract, inject
+from opentelemetry.sdk.resources import SERVICE_NAME, Resource
+from opentelemetry.sdk.trace import TracerProvider
+from opentelemetry.sdk.trace.export import BatchSpanProcessor, ConsoleSpanExporter
+from opentelemetry.trace import SpanKind, Status, StatusCode
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from .metrics import route_template
+
+TRACE_ID_HEADER = "X-Trace-Id"
+TRACE_EXPORTERS = ("none", "console", "file")
+
+tracer = trace.get_tracer(__name__)
+
+_provider: Optional[TracerProvider] = None
+
+def setup_tracing(
+    service_name: str,
+    exporter: str = "none",
+    export_file: Optional[str] = None
+) -> TracerProvider:
+    """
+    Install the process-wide tracer provider. Spans are always created (so
+    trace ids propagate), `exporter` only decides where finished spans go:
+    nowhere, stdout, or one JSON span per line appended to `export_file`.
+    """
+    global _provider
+    if _provider is not None:
+        return _provider
+
+    if exporter not in TRACE_EXPORTERS:
+        raise ValueError(f"Unknown trace exporter {exporter!r}, expected one of {TRACE_EXPORTERS}")
+
+    provider = TracerProvider(resource=Resource.create({SERVICE_NAME: service_name}))
+    if exporter == "console":
+        provider.add_span_processor(BatchSpanProcessor(ConsoleSpanExporter()))
+    elif exporter == "file":
+        provider.add_span_processor(BatchSpanProcessor(ConsoleSpanExporter(
+            out=open(export_file or "traces.jsonl", "a"),
+            formatter=lambda span: span.to_json(indent=None) + os.linesep
+        )))
+
+    trace.set_tracer_provider(provider)
+    _provider = provider
+    return provider
+
+def inject_headers(headers: Optional[Dict[str, str]] = None) -> Dict[str, str]:
+    """Add the current trace context to `headers` (a new dict if None)"""
+    headers = dict(headers or {})
+    inject(headers)
+    return headers
+
+def extract_headers(headers: Optional[Dict]) -> Context:
+    """Trace context carried by `headers`, ignoring anything that isn't a dict"""
+    if not isinstance(headers, dict):
+        headers = {}
+    return extract({key: str(value) for key, value in headers.items()})
+
+def current_trace_id() -> Optional[str]:
+    """Hex trace id of the active span, if any"""
+    span_context = trace.get_current_span().get_span_context()
+    if not span_context.is_valid:
+        return None
+    return trace.format_trace_id(span_context.trace_id)
+
+class TracingMiddleware:
+    """
+    Pure ASGI middleware that continues (or starts) a trace for every HTTP
+    request and returns its id in the `X-Trace-Id` response header.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        carrier = {
+            key.decode("latin-1"): value.decode("latin-1")
+            for key, value in scope.get("headers", [])
+        }
+
+        with tracer.start_as_current_span(
+            method,
+            context=extract(carrier),
+            kind=SpanKind.SERVER,
+            attributes={"http.request.method": method, "url.path": scope["path"]}
+        ) as span:
+            trace_id = current_trace_id()
+            # Hand our span down as the parent to anything below that reads
+            # the headers itself (e.g. FastAPI's own telemetry)
+            outgoing = inject_headers()
+            scope["headers"] = [
+                (key, value) for key, value in scope.get("headers", [])
+                if key.decode("latin-1") not in outgoing
+            ] + [(key.encode("latin-1"), value.encode("latin-1")) for key, value in outgoing.items()]
+
+            async def send_wrapper(message: Message):
+                if message["type"] == "http.response.start":
+                    status_code = message["status"]
+                    span.set_attribute("http.response.status_code", status_code)
+                    if status_code >= 500:
+                        span.set_status(Status(StatusCode.ERROR))
+                    if trace_id:
+                        message["headers"] = [
+                            *message.get("headers", []),
+                            (TRACE_ID_HEADER.lower().encode(), trace_id.encode())
+                        ]
+                await send(message)
+
+            try:
+                await self.app(scope, receive, send_wrapper)
+            finally:
+                route = route_template(scope)
+                span.update_name(f"{method} {route}")
+                span.set_attribute("http.route", route)
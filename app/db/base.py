@@ -1,34 +1,88 @@
-from sqlmodel import SQLModel, create_engine, Session
-from typing import Iterator
+from fastapi import Request, Response
+from sqlmodel import SQLModel, create_engine, Session, insert
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.exc import InvalidRequestError
+from sqlalchemy.pool import NullPool
+from typing import Any, Dict, Iterator, Optional, Type, TypeVar
 from functools import lru_cache
 import os
 from dotenv import load_dotenv
+from .instrumentation import instrument_engine, TimedQueuePool
+from .replicas import READ_PRIMARY_FOR_HEADER, READ_PRIMARY_HEADER, ReplicaSet, parse_urls, route_read
+from ..core.config import settings
+from ..schemas.base import TimeStampedModel
 
 load_dotenv()
 
+ReadModel = TypeVar("ReadModel", bound=SQLModel)
+
 # Database URL from environment
 DATABASE_URL = os.getenv("DATABASE_URL")
 if not DATABASE_URL:
     raise ValueError("DATABASE_URL environment variable is not set")
 
+def _pool_options() -> Dict[str, Any]:
+    """
+    Pool and connection arguments for `create_engine`. With `DB_POOLER=pgbouncer`
+    the URL points at a PgBouncer in transaction mode, where consecutive
+    transactions of one client may run on different server connections:
+    1. Pooling happens in PgBouncer, so `DB_POOL_SIZE=0` means no local pool
+       (NullPool), and a small local pool only saves the TCP and auth handshake
+    2. Nothing is set per connection: PgBouncer rejects the `options` startup
+       parameter, so set `statement_timeout` on the database role instead
+    3. psycopg2 binds parameters client-side and never prepares statements,
+       so no statement depends on the server connection it was sent on
+    """
+    if settings.DB_POOLER == "pgbouncer" and not settings.DB_POOL_SIZE:
+        return {"poolclass": NullPool}
+
+    options: Dict[str, Any] = {
+        "pool_pre_ping": True,  # Enables connection pool "pre-ping" feature
+        "poolclass": TimedQueuePool,  # QueuePool that records checkout waits
+        "pool_size": settings.DB_POOL_SIZE,  # Maximum number of permanent connections
+        "max_overflow": settings.DB_MAX_OVERFLOW,  # Maximum number of additional connections
+        "pool_timeout": settings.DB_POOL_TIMEOUT  # Seconds to wait for a free connection
+    }
+    if settings.DB_POOLER == "none" and settings.DB_STATEMENT_TIMEOUT_MS:
+        # Sent with the startup packet, so it costs no extra round trip
+        options["connect_args"] = {"options": f"-c statement_timeout={settings.DB_STATEMENT_TIMEOUT_MS}"}
+    return options
+
+def _create_engine(url: str, name: str = "primary", connect_timeout: Optional[int] = None) -> Engine:
+    options = _pool_options()
+    if connect_timeout:
+        options["connect_args"] = {**options.get("connect_args", {}), "connect_timeout": connect_timeout}
+    engine = create_engine(
+        url,
+        echo=False,  # Set to True for SQL query logging
+        **options
+    )
+    # Export pool metrics, per-statement latency and the slow query log
+    return instrument_engine(engine, name=name)
+
 # Create engine with some good defaults for PostgreSQL
 @lru_cache
 def get_engine():
-    return create_engine(
-        DATABASE_URL,
-        echo=False,  # Set to True for SQL query logging
-        pool_pre_ping=True,  # Enables connection pool "pre-ping" feature
-        pool_size=5,  # Maximum number of permanent connections
-        max_overflow=10  # Maximum number of additional connections
-    )
+    return _create_engine(DATABASE_URL)
 
-# Create all tables on startup
-def create_db_and_tables():
-    SQLModel.metadata.create_all(get_engine())
+@lru_cache
+def get_replicas() -> Optional[ReplicaSet]:
+    """Read replicas from `DATABASE_REPLICA_URLS`, None if there are none"""
+    urls = parse_urls(settings.DATABASE_REPLICA_URLS)
+    if not urls:
+        return None
+    return ReplicaSet(
+        [
+            # Named like the replica lag gauge's label
+            _create_engine(url, name=make_url(url).host, connect_timeout=settings.REPLICA_CONNECT_TIMEOUT)
+            for url in urls
+        ],
+        max_lag=settings.REPLICA_MAX_LAG_SECONDS,
+        check_interval=settings.REPLICA_LAG_CHECK_SECONDS
+    )
 
-# Session dependency
-def get_db() -> Iterator[Session]:
-    with Session(get_engine()) as session:
+def _session(engine: Engine) -> Iterator[Session]:
+    with Session(engine) as session:
         try:
             yield session
             session.commit()
@@ -37,3 +91,55 @@ def get_db() -> Iterator[Session]:
             raise
         finally:
             session.close()
+
+class ReadOnlySession(Session):
+    """Session that refuses to flush changes to the ORM objects it loaded"""
+
+    def flush(self, objects=None) -> None:
+        if self.new or self.dirty or self.deleted:
+            raise InvalidRequestError("Read-only session cannot flush changes")
+        super().flush(objects)
+
+@lru_cache
+def _autocommit(engine: Engine) -> Engine:
+    return engine.execution_options(isolation_level="AUTOCOMMIT")
+
+def _read_session(engine: Engine) -> Iterator[Session]:
+    """
+    Session on an autocommit connection: each statement runs on its own, so
+    there's no BEGIN, COMMIT or ROLLBACK round trip around the request. The
+    statements of one request don't share a snapshot
+    """
+    with ReadOnlySession(_autocommit(engine)) as session:
+        yield session
+
+# Session dependency
+def get_db(response: Response) -> Iterator[Session]:
+    """Session on the primary, for requests that write"""
+    if get_replicas():
+        # Tell the client to read from the primary until replicas have caught up
+        response.headers[READ_PRIMARY_FOR_HEADER] = f"{settings.READ_YOUR_WRITES_SECONDS:g}"
+    yield from _session(get_engine())
+
+def get_read_db(request: Request) -> Iterator[Session]:
+    """
+    Session for read-only requests: on a replica when one is caught up,
+    otherwise on the primary, and always on the primary when the client
+    sends `X-Read-Primary` after its own write
+    """
+    read_primary = READ_PRIMARY_HEADER in request.headers
+    yield from _read_session(route_read(get_replicas(), get_engine(), read_primary))
+
+def insert_row(
+    db: Session,
+    model: Type[TimeStampedModel],
+    read_model: Type[ReadModel],
+    data: SQLModel
+) -> ReadModel:
+    """
+    Insert a row built from a validated request body with a Core INSERT,
+    skipping ORM instance construction, and return it as `read_model`
+    """
+    row = model.new_row(data)
+    db.exec(insert(model).values(**row))
+    return read_model.model_validate(row)
@@ -0,0 +1,124 @@
+"""
+Denormalized progress counters on `HomeworkTask`:
+1. `assigned_count` - distinct assigned students, set when the homework is inserted
+2. `submitted_count` - distinct assigned students with at least one submission
+3. `completed_count` - distinct assigned students with a reviewed submission
+
+The endpoints bump them with one conditional `UPDATE` in the same transaction
+as the row that changes them. Two requests racing on the same student can
+still both count it, so `repair_homework_counters` recomputes the counters
+from the submissions, in batches, to fix any drift.
+"""
+
+import logging
+from typing import Optional, Tuple
+
+from sqlalchemy import distinct, exists, func, or_, update
+from sqlalchemy.orm import aliased
+from sqlmodel import Session, select
+
+from ..schemas.base import Status
+from ..schemas.homework import HomeworkTask
+from ..schemas.submission import Submission
+
+logger = logging.getLogger(__name__)
+
+def _other_submissions(submission_id: str, homework_id: str, student_id: str):
+    return select(Submission.id).where(
+        Submission.homework_task_id == homework_id,
+        Submission.student_id == student_id,
+        Submission.id != submission_id
+    )
+
+def record_submission(db: Session, submission_id: str, homework_id: str, student_id: str) -> None:
+    """Count the student as submitted, unless an earlier submission already did"""
+    db.exec(
+        update(HomeworkTask)
+        .where(
+            HomeworkTask.id == homework_id,
+            ~exists(_other_submissions(submission_id, homework_id, student_id))
+        )
+        .values(submitted_count=HomeworkTask.submitted_count + 1)
+        .execution_options(synchronize_session=False)
+    )
+
+def record_completion(db: Session, submission: Submission) -> Optional[Tuple[int, int]]:
+    """
+    Count the submission's student as completed, unless another of their
+    submissions already was. Call before marking `submission` completed.
+    Returns the new `(completed_count, assigned_count)`, or None if the
+    counters didn't change
+    """
+    if submission.status == Status.COMPLETED:
+        return None
+    already_completed = _other_submissions(
+        submission.id, submission.homework_task_id, submission.student_id
+    ).where(Submission.status == Status.COMPLETED)
+    return db.exec(
+        update(HomeworkTask)
+        .where(HomeworkTask.id == submission.homework_task_id, ~exists(already_completed))
+        .values(completed_count=HomeworkTask.completed_count + 1)
+        .returning(HomeworkTask.completed_count, HomeworkTask.assigned_count)
+        .execution_options(synchronize_session=False)
+    ).first()
+
+def _recount_update(homework_ids):
+    """`UPDATE` setting the counters of `homework_ids` to recomputed values, where they differ"""
+    homework = aliased(HomeworkTask)
+    assigned = func.unnest(homework.student_ids).table_valued("student_id").render_derived()
+
+    def students(*conditions):
+        return select(func.count(distinct(Submission.student_id))).where(
+            Submission.homework_task_id == homework.id,
+            Submission.student_id == func.any(homework.student_ids),
+            *conditions
+        ).scalar_subquery()
+
+    counts = select(
+        homework.id,
+        select(func.count(distinct(assigned.c.student_id))).scalar_subquery().label("assigned_count"),
+        students().label("submitted_count"),
+        students(Submission.status == Status.COMPLETED).label("completed_count")
+    ).where(homework.id.in_(homework_ids)).subquery("counts")
+
+    return (
+        update(HomeworkTask)
+        .where(
+            HomeworkTask.id == counts.c.id,
+            or_(
+                HomeworkTask.assigned_count != counts.c.assigned_count,
+                HomeworkTask.submitted_count != counts.c.submitted_count,
+                HomeworkTask.completed_count != counts.c.completed_count
+            )
+        )
+        .values(
+            assigned_count=counts.c.assigned_count,
+            submitted_count=counts.c.submitted_count,
+            completed_count=counts.c.completed_count
+        )
+        .execution_options(synchronize_session=False)
+    )
+
+def repair_homework_counters(db: Session, batch_size: int = 1000) -> int:
+    """
+    Recompute the counters of every homework, `batch_size` homework per
+    transaction in primary key order, and return how many were wrong
+    """
+    repaired = 0
+    last_id = ""
+    while True:
+        homework_ids = db.exec(
+            select(HomeworkTask.id)
+            .where(HomeworkTask.id > last_id)
+            .order_by(HomeworkTask.id)
+            .limit(batch_size)
+        ).all()
+        if not homework_ids:
+            return repaired
+
+        fixed = db.exec(_recount_update(homework_ids)).rowcount
+        db.commit()
+        if fixed:
+            logger.info(f"Repaired counters of {fixed} homework up to {homework_ids[-1]}")
+        repaired += fixed
+        last_id = homework_ids[-1]
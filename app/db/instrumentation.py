@@ -0,0 +1,211 @@
+"""
+SQLAlchemy engine instrumentation:
+1. Pool gauges (checked-out connections, overflow) and a checkout-wait histogram
+2. Per-statement latency labelled by a normalized SQL fingerprint
+3. A bounded in-memory slow query log with `EXPLAIN` plans
+4. A span per statement when it runs inside a traced request
+"""
+
+import hashlib
+import logging
+import re
+import time
+from collections import deque
+from datetime import datetime
+from typing import Deque, Dict, List, Optional, Tuple
+
+from opentelemetry import trace
+from opentelemetry.trace import SpanKind, Status, StatusCode
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import QueuePool
+
+from ..core.config import settings
+from ..core.timing import record_query
+from ..core.metrics import (
+    DB_CONNECTION_GAUGE,
+    DB_POOL_OVERFLOW,
+    DB_POOL_CHECKOUT_WAIT,
+    DB_QUERY_LATENCY
+)
+
+logger = logging.getLogger(__name__)
+tracer = trace.get_tracer(__name__)
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"\b\d+(?:\.\d+)?\b")
+_PARAMETER = re.compile(r"%\([^)]+\)s|%s|\$\d+|:\w+|\?")
+_IN_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)")
+_WHITESPACE = re.compile(r"\s+")
+_TABLE = re.compile(r'\b(?:FROM|INTO|UPDATE|JOIN)\s+"?(\w+)"?', re.IGNORECASE)
+
+_EXPLAINABLE = ("SELECT", "INSERT", "UPDATE", "DELETE")
+
+slow_queries: Deque[Dict] = deque(maxlen=settings.SLOW_QUERY_LOG_SIZE)
+
+# Normalizing is regex-heavy, and SQLAlchemy reuses the same statement
+# strings, so cache the result per statement text
+_fingerprint_cache: Dict[str, Tuple[str, str, str, str]] = {}
+_FINGERPRINT_CACHE_SIZE = 2048
+
+def normalize_statement(statement: str) -> str:
+    """Replace literals and bound parameters with `?` and collapse IN lists"""
+    normalized = _STRING_LITERAL.sub("?", statement)
+    normalized = _PARAMETER.sub("?", normalized)
+    normalized = _NUMBER_LITERAL.sub("?", normalized)
+    normalized = _IN_LIST.sub("(?)", normalized)
+    return _WHITESPACE.sub(" ", normalized).strip()
+
+def fingerprint(statement: str) -> Tuple[str, str, str, str]:
+    """
+    Return (operation, table, fingerprint, normalized statement) where the
+    fingerprint is a short hash of the normalized statement.
+    """
+    cached = _fingerprint_cache.get(statement)
+    if cached:
+        return cached
+
+    normalized = normalize_statement(statement)
+    operation = normalized.split(" ", 1)[0].upper() if normalized else "UNKNOWN"
+    table_match = _TABLE.search(normalized)
+    table = table_match.group(1).lower() if table_match else ""
+    digest = hashlib.sha1(normalized.encode()).hexdigest()[:12]
+
+    result = (operation, table, digest, normalized)
+    if len(_fingerprint_cache) < _FINGERPRINT_CACHE_SIZE:
+        _fingerprint_cache[statement] = result
+    return result
+
+class TimedQueuePool(QueuePool):
+    """QueuePool that records how long each checkout waited for a connection"""
+
+    def _do_get(self):
+        start_time = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            DB_POOL_CHECKOUT_WAIT.observe(time.perf_counter() - start_time)
+
+def get_slow_queries() -> List[Dict]:
+    """Slow queries captured so far, slowest first"""
+    return sorted(slow_queries, key=lambda query: query["duration_ms"], reverse=True)
+
+def _explain(connection, statement: str, parameters) -> Optional[str]:
+    cursor = connection.connection.cursor()
+    if connection.get_execution_options().get("isolation_level") == "AUTOCOMMIT":
+        # No transaction to protect, and savepoints need one
+        try:
+            cursor.execute(f"EXPLAIN {statement}", parameters)
+            return "\n".join(row[0] for row in cursor.fetchall())
+        except Exception as e:
+            logger.warning(f"Could not EXPLAIN slow query: {e}")
+            return None
+        finally:
+            cursor.close()
+
+    # A failing EXPLAIN must not abort the caller's transaction, so run it in a savepoint
+    try:
+        cursor.execute("SAVEPOINT explain_slow_query")
+        try:
+            cursor.execute(f"EXPLAIN {statement}", parameters)
+            plan = "\n".join(row[0] for row in cursor.fetchall())
+            cursor.execute("RELEASE SAVEPOINT explain_slow_query")
+            return plan
+        except Exception as e:
+            cursor.execute("ROLLBACK TO SAVEPOINT explain_slow_query")
+            logger.warning(f"Could not EXPLAIN slow query: {e}")
+            return None
+    except Exception as e:
+        logger.warning(f"Could not EXPLAIN slow query: {e}")
+        return None
+    finally:
+        cursor.close()
+
+def instrument_engine(
+    engine: Engine, slow_query_threshold_ms: Optional[int] = None, name: str = "primary"
+) -> Engine:
+    """Attach pool and statement instrumentation to `engine`, labelling its pool gauges with `name`"""
+    if slow_query_threshold_ms is None:
+        slow_query_threshold_ms = settings.SLOW_QUERY_THRESHOLD_MS
+    pool = engine.pool
+    pool_overflow = DB_POOL_OVERFLOW.labels(engine=name)
+
+    # Checkin fires before the connection is back in the pool, so the pool's own
+    # counters lag by one there; track checked-out connections ourselves
+    @event.listens_for(pool, "checkout")
+    def on_checkout(dbapi_connection, connection_record, connection_proxy):
+        DB_CONNECTION_GAUGE.inc()
+        if isinstance(pool, QueuePool):
+            pool_overflow.set(max(pool.overflow(), 0))
+
+    @event.listens_for(pool, "checkin")
+    def on_checkin(dbapi_connection, connection_record):
+        DB_CONNECTION_GAUGE.dec()
+        if isinstance(pool, QueuePool):
+            # A full pool closes this connection right after the event
+            overflow = pool.overflow() - (pool.checkedin() >= pool.size())
+            pool_overflow.set(max(overflow, 0))
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        # Only trace statements issued on behalf of a traced request or message
+        span = None
+        if trace.get_current_span().is_recording():
+            operation, table, digest, normalized = fingerprint(statement)
+            span = tracer.start_span(
+                f"{operation} {table}".strip(),
+                kind=SpanKind.CLIENT,
+                attributes={
+                    "db.system": "postgresql",
+                    "db.operation": operation,
+                    "db.sql.table": table,
+                    "db.statement": normalized
+                }
+            )
+        conn.info.setdefault("query_spans", []).append(span)
+        conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        duration = time.perf_counter() - conn.info["query_start_time"].pop()
+        span = conn.info["query_spans"].pop()
+        if span is not None:
+            span.end()
+        record_query(duration)
+        operation, table, digest, normalized = fingerprint(statement)
+        DB_QUERY_LATENCY.labels(
+            operation=operation,
+            table=table,
+            fingerprint=digest
+        ).observe(duration)
+
+        duration_ms = duration * 1000
+        if duration_ms < slow_query_threshold_ms:
+            return
+
+        plan = None
+        if not executemany and operation in _EXPLAINABLE:
+            plan = _explain(conn, statement, parameters)
+
+        slow_queries.append({
+            "fingerprint": digest,
+            "statement": normalized,
+            "duration_ms": round(duration_ms, 2),
+            "plan": plan,
+            "captured_at": datetime.utcnow().isoformat()
+        })
+        logger.warning(f"Slow query ({duration_ms:.1f} ms, {digest}): {normalized}")
+
+    @event.listens_for(engine, "handle_error")
+    def handle_error(exception_context):
+        # Failed statements never reach after_cursor_execute
+        connection = exception_context.connection
+        if connection is not None and connection.info.get("query_start_time"):
+            connection.info["query_start_time"].pop()
+            span = connection.info["query_spans"].pop()
+            if span is not None:
+                span.record_exception(exception_context.original_exception)
+                span.set_status(Status(StatusCode.ERROR))
+                span.end()
+
+    return engine
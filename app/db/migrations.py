@@ -0,0 +1,39 @@
+"""
+Startup check that the database is at the Alembic head this code expects.
+Reading `alembic_version` takes a couple of small queries, where
+`create_all` reflected every table on each start. Migrations themselves
+run with `alembic upgrade head` before the server starts
+"""
+
+import logging
+from functools import lru_cache
+from pathlib import Path
+from typing import FrozenSet, Optional
+
+from alembic.runtime.migration import MigrationContext
+from alembic.script import ScriptDirectory
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+SCRIPT_LOCATION = Path(__file__).resolve().parents[2] / "alembic"
+
+@lru_cache
+def head_revisions() -> FrozenSet[str]:
+    return frozenset(ScriptDirectory(str(SCRIPT_LOCATION)).get_heads())
+
+def current_revisions(engine: Engine) -> FrozenSet[str]:
+    """Revisions the database is stamped with, empty if it isn't under Alembic"""
+    with engine.connect() as connection:
+        return frozenset(MigrationContext.configure(connection).get_current_heads())
+
+def check_schema_revision(engine: Engine) -> Optional[str]:
+    """None when the database is at head, otherwise what's wrong with it"""
+    current = current_revisions(engine)
+    expected = head_revisions()
+    if current == expected:
+        return None
+    return (
+        f"Database is at revision {', '.join(sorted(current)) or 'none'}, "
+        f"expected {', '.join(sorted(expected))}; run `alembic upgrade head`"
+    )
@@ -0,0 +1,104 @@
+"""
+Read replica routing:
+1. Replicas are picked round-robin, skipping any whose replication lag is
+   over the limit or whose last lag check failed
+2. Lag is measured on the replica itself, at most once per check interval
+   per replica and process, so routing normally costs no extra round trip.
+   One request measures it while the others use the last value, so an
+   unreachable replica holds up one request for the connect timeout at most
+3. Read-your-writes is the client's side of the contract: write responses
+   carry `X-Read-Primary-For: <seconds>`, and a client that sends
+   `X-Read-Primary` on its reads within that window is served by the primary
+"""
+
+import itertools
+import logging
+import threading
+import time
+from typing import Dict, List, Optional, Sequence
+
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+
+from ..core.metrics import DB_READS_ROUTED, DB_REPLICA_LAG
+
+logger = logging.getLogger(__name__)
+
+# Response header of writes, and the request header that asks for the primary
+READ_PRIMARY_FOR_HEADER = "X-Read-Primary-For"
+READ_PRIMARY_HEADER = "X-Read-Primary"
+
+# Zero while the replica has replayed everything it received, otherwise the
+# age of the last replayed transaction; zero on a server that isn't a replica
+LAG_QUERY = text("""
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() THEN 0
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+    END
+""")
+
+class ReplicaSet:
+    def __init__(self, engines: Sequence[Engine], max_lag: float, check_interval: float):
+        self.engines = list(engines)
+        self.max_lag = max_lag
+        self.check_interval = check_interval
+        self._lag: Dict[int, Optional[float]] = {}  # None when the check failed
+        self._checked_at: Dict[int, float] = {}
+        self._next = itertools.count()
+        self._locks = [threading.Lock() for _ in self.engines]  # One check per replica at a time
+
+    def lag(self, n: int) -> Optional[float]:
+        """
+        Replication lag of replica `n` in seconds, None if it's unreachable or
+        hasn't been measured yet
+        """
+        if time.monotonic() - self._checked_at.get(n, float("-inf")) >= self.check_interval:
+            # While another thread measures it, use the last value
+            if self._locks[n].acquire(blocking=False):
+                try:
+                    if time.monotonic() - self._checked_at.get(n, float("-inf")) >= self.check_interval:
+                        self._lag[n] = self._measure(self.engines[n])
+                        self._checked_at[n] = time.monotonic()
+                finally:
+                    self._locks[n].release()
+        return self._lag.get(n)
+
+    def _measure(self, engine: Engine) -> Optional[float]:
+        try:
+            with engine.connect() as connection:
+                lag = float(connection.execute(LAG_QUERY).scalar())
+        except Exception as e:
+            logger.warning(f"Replica {engine.url.host} is unavailable: {e}")
+            DB_REPLICA_LAG.labels(replica=engine.url.host).set(float("nan"))
+            return None
+        DB_REPLICA_LAG.labels(replica=engine.url.host).set(lag)
+        return lag
+
+    def choose(self) -> Optional[Engine]:
+        """The next replica that is reachable and caught up, if any"""
+        start = next(self._next)
+        for offset in range(len(self.engines)):
+            n = (start + offset) % len(self.engines)
+            lag = self.lag(n)
+            if lag is not None and lag <= self.max_lag:
+                return self.engines[n]
+        return None
+
+def route_read(replicas: Optional[ReplicaSet], primary: Engine, read_primary: bool) -> Engine:
+    """Engine for a read-only request"""
+    if not replicas or not replicas.engines:
+        return primary
+    if read_primary:
+        DB_READS_ROUTED.labels(target="primary", reason="read_your_writes").inc()
+        return primary
+    engine = replicas.choose()
+    if engine is None:
+        DB_READS_ROUTED.labels(target="primary", reason="replicas_unavailable").inc()
+        return primary
+    DB_READS_ROUTED.labels(target="replica", reason="replica").inc()
+    return engine
+
+def parse_urls(value: str) -> List[str]:
+    """Comma-separated URLs, ignoring blanks"""
+    return [url.strip() for url in value.split(",") if url.strip()]
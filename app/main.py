@@ -2,8 +2,13 @@ from fastapi import FastAPI, HTTPException, status
 from sqlmodel import Session, text
 from contextlib import asynccontextmanager
 from .api.api import api_router
-from .db.base import create_db_and_tables, get_engine
+from .db.base import get_engine
+from .db.migrations import check_schema_revision
+from .queue.notifications import producer
 from .core.metrics import setup_metrics
+from .core.tracing import setup_tracing, TracingMiddleware
+from .core.timing import ServerTimingMiddleware, TimedJSONResponse
+from .core.config import settings
 import logging
 
 logging.basicConfig(
@@ -12,25 +17,52 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+def check_schema():
+    """Compare the database's Alembic revision with the code's, per `SCHEMA_CHECK`"""
+    if settings.SCHEMA_CHECK == "off":
+        return
+    try:
+        problem = check_schema_revision(get_engine())
+    except Exception as e:
+        # The database may still be starting; /health reports it meanwhile
+        logger.warning(f"Could not check the database revision: {e}")
+        return
+    if problem is None:
+        logger.info("Application startup: Database schema is up to date")
+    elif settings.SCHEMA_CHECK == "fail":
+        raise RuntimeError(problem)
+    else:
+        logger.warning(problem)
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Startup
-    create_db_and_tables()
-    logger.info("Application startup: Database tables created")
+    check_schema()
+    # Replays notifications spooled while the broker was down, in the background
+    producer.start()
     yield
     # Shutdown
+    producer.close()
     logger.info("Application shutdown")
 
 app = FastAPI(
     title="Dance Education Platform",
     description="API for managing dance education homework and feedback",
     version="1.0.0",
-    lifespan=lifespan
+    lifespan=lifespan,
+    default_response_class=TimedJSONResponse
 )
 
 # Setup metrics
 app = setup_metrics(app)
 
+# Per-request DB/publish/serialization breakdown in the Server-Timing header
+app.add_middleware(ServerTimingMiddleware)
+
+# Setup tracing (outermost, so the request span covers everything else)
+setup_tracing("api", settings.TRACE_EXPORTER, settings.TRACE_EXPORT_FILE)
+app.add_middleware(TracingMiddleware)
+
 # Include routers
 app.include_router(api_router)
 
@@ -15,6 +15,9 @@ def get_rabbitmq_connection():
                 settings.RABBITMQ_USER,
                 settings.RABBITMQ_PASS
             ),
-            heartbeat=600
+            heartbeat=600,
+            socket_timeout=settings.RABBITMQ_TIMEOUT,
+            # Publishing blocks while the broker is out of memory or disk
+            blocked_connection_timeout=settings.RABBITMQ_TIMEOUT
         )
     )
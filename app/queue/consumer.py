@@ -1,11 +1,27 @@
 from telegram import Bot
+from opentelemetry import trace
+from opentelemetry.trace import SpanKind, Status, StatusCode
 from .connection import get_rabbitmq_connection
 from .message_types import MessageType
+from ..core.config import settings
+from ..core.tracing import extract_headers
+from ..core.metrics import (
+    QUEUE_MESSAGE_COUNT,
+    QUEUE_LAG,
+    QUEUE_DEPTH,
+    NOTIFICATION_COUNT,
+    NOTIFICATION_SEND_LATENCY,
+    NOTIFICATION_DELIVERY_LATENCY
+)
+from datetime import datetime
+from typing import Optional
 import json
 import logging
 import asyncio
+import time
 
 logger = logging.getLogger(__name__)
+tracer = trace.get_tracer(__name__)
 
 class TelegramConsumer:
     def __init__(self, bot_token: str):
@@ -14,6 +30,7 @@ class TelegramConsumer:
         # Create a new event loop for this consumer
         self.loop = asyncio.new_event_loop()
         asyncio.set_event_loop(self.loop)
+        self._last_depth_check = 0.0
 
     def _initialize_connection(self):
         self.connection = get_rabbitmq_connection()
@@ -47,17 +64,11 @@ class TelegramConsumer:
 
         return "New notification received"
 
-    async def send_telegram_message(self, chat_id: str, text: str):
+    async def send_telegram_message(self, chat_id: int, text: str):
         try:
-            # Convert string telegram_id to integer if possible
-            try:
-                numeric_chat_id = int(chat_id)
-            except ValueError:
-                logger.error(f"Invalid telegram_id format: {chat_id}")
-                return False
-
+            # telegram_id is stored as BIGINT, so recipient ids arrive as integers
             await self.bot.send_message(
-                chat_id=numeric_chat_id,
+                chat_id=chat_id,
                 text=text
             )
             return True
@@ -65,10 +76,54 @@ class TelegramConsumer:
             logger.error(f"Failed to send telegram message: {e}", exc_info=True)
             return False
 
+    @staticmethod
+    def _seconds_since(timestamp: Optional[str]) -> Optional[float]:
+        """Seconds elapsed since a `Message.timestamp` (naive UTC ISO format)"""
+        if not timestamp:
+            return None
+        try:
+            return (datetime.utcnow() - datetime.fromisoformat(timestamp)).total_seconds()
+        except ValueError:
+            return None
+
+    def _update_queue_depth(self, ch):
+        now = time.monotonic()
+        if now - self._last_depth_check < settings.QUEUE_DEPTH_INTERVAL:
+            return
+        self._last_depth_check = now
+        try:
+            result = ch.queue_declare(queue='notifications', durable=True, passive=True)
+            QUEUE_DEPTH.labels(queue_name='notifications').set(result.method.message_count)
+        except Exception as e:
+            logger.debug(f"Could not read queue depth: {e}")
+
     def process_message(self, ch, method, properties, body):
+        # Continue the trace of the API request that published the message
+        with tracer.start_as_current_span(
+            "notifications process",
+            context=extract_headers(getattr(properties, "headers", None)),
+            kind=SpanKind.CONSUMER,
+            attributes={
+                "messaging.system": "rabbitmq",
+                "messaging.destination.name": "notifications"
+            }
+        ):
+            self._process_message(ch, method, body)
+
+    def _process_message(self, ch, method, body):
+        msg_type = "unknown"
+        span = trace.get_current_span()
         try:
             logger.info(f"Received message: {body}")
             message = json.loads(body)
+            msg_type = message.get('type', msg_type)
+            span.set_attribute("notification.type", msg_type)
+
+            lag = self._seconds_since(message.get('timestamp'))
+            if lag is not None:
+                QUEUE_LAG.labels(queue_name='notifications').observe(lag)
+            self._update_queue_depth(ch)
+
             formatted_message = self._format_message(
                 MessageType(message['type']),
                 message['data']
@@ -77,23 +132,44 @@ class TelegramConsumer:
             logger.info(f"Attempting to send to: {message['recipient_id']}")
 
             # Use the event loop to run the async send
-            success = self.loop.run_until_complete(
-                self.send_telegram_message(
-                    message['recipient_id'],
-                    formatted_message
+            send_start = time.perf_counter()
+            with tracer.start_as_current_span("telegram send_message", kind=SpanKind.CLIENT) as send_span:
+                success = self.loop.run_until_complete(
+                    self.send_telegram_message(
+                        message['recipient_id'],
+                        formatted_message
+                    )
                 )
+                if not success:
+                    send_span.set_status(Status(StatusCode.ERROR))
+            NOTIFICATION_SEND_LATENCY.labels(type=msg_type).observe(
+                time.perf_counter() - send_start
             )
 
             if success:
                 logger.info("Message sent successfully")
                 ch.basic_ack(delivery_tag=method.delivery_tag)
+                delivery_latency = self._seconds_since(message.get('timestamp'))
+                if delivery_latency is not None:
+                    NOTIFICATION_DELIVERY_LATENCY.labels(type=msg_type).observe(delivery_latency)
+                self._record_outcome(msg_type, "processed")
             else:
                 logger.error("Failed to send message")
                 ch.basic_nack(delivery_tag=method.delivery_tag, requeue=False)  # Don't requeue failed messages
+                span.set_status(Status(StatusCode.ERROR))
+                self._record_outcome(msg_type, "failed")
 
         except Exception as e:
             logger.error(f"Error processing message: {e}", exc_info=True)
+            span.record_exception(e)
+            span.set_status(Status(StatusCode.ERROR))
             ch.basic_nack(delivery_tag=method.delivery_tag, requeue=False)
+            self._record_outcome(msg_type, "failed")
+
+    @staticmethod
+    def _record_outcome(msg_type: str, status: str):
+        QUEUE_MESSAGE_COUNT.labels(queue_name='notifications', status=status).inc()
+        NOTIFICATION_COUNT.labels(type=msg_type, status=status).inc()
 
     def start_consuming(self):
         try:
@@ -11,7 +11,7 @@ class Message:
     def __init__(
         self,
         type: MessageType,
-        recipient_id: str,  # telegram_id
+        recipient_id: int,  # telegram_id
         data: Dict[str, Any]
     ):
         self.type = type
@@ -3,7 +3,7 @@ from .message_types import Message, MessageType
 
 producer = NotificationProducer()
 
-def notify_homework_assigned(student_tg_id: str, homework_data: dict):
+def notify_homework_assigned(student_tg_id: int, homework_data: dict):
     message = Message(
         type=MessageType.HOMEWORK_ASSIGNED,
         recipient_id=student_tg_id,
@@ -14,7 +14,7 @@ def notify_homework_assigned(student_tg_id: str, homework_data: dict):
     )
     return producer.send_message(message)
 
-def notify_submission_received(teacher_tg_id: str, submission_data: dict):
+def notify_submission_received(teacher_tg_id: int, submission_data: dict):
     message = Message(
         type=MessageType.SUBMISSION_RECEIVED,
         recipient_id=teacher_tg_id,
@@ -27,7 +27,7 @@ def notify_submission_received(teacher_tg_id: str, submission_data: dict):
     )
     return producer.send_message(message)
 
-def notify_feedback_provided(student_tg_id: str, feedback_data: dict):
+def notify_feedback_provided(student_tg_id: int, feedback_data: dict):
     message = Message(
         type=MessageType.FEEDBACK_PROVIDED,
         recipient_id=student_tg_id,
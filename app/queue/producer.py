@@ -1,42 +1,189 @@
 import pika
+from opentelemetry import trace
+from opentelemetry.trace import SpanKind, Status, StatusCode
 from .connection import get_rabbitmq_connection
 from .message_types import Message
+from .spool import NotificationSpool
+from ..core.config import settings
+from ..core.metrics import NOTIFICATIONS_SPOOLED
+from ..core.tracing import inject_headers
+from ..core.timing import timed
+from typing import Dict, Optional
 import json
 import logging
+import threading
+import time
 
 logger = logging.getLogger(__name__)
+tracer = trace.get_tracer(__name__)
+
+# Spooled records replayed between offset commits
+DRAIN_BATCH = 100
 
 class NotificationProducer:
-    def __init__(self):
+    """
+    Publishes notifications, connecting on the first message rather than on
+    construction so that importing the API never waits for the broker.
+    After a failed connection attempt, messages fail fast for
+    `reconnect_interval` seconds before the next attempt.
+
+    Messages the broker doesn't take go to a local spool (`spool_path`,
+    `NOTIFICATION_SPOOL_PATH` by default, empty to drop them), and so do
+    all messages while the spool isn't empty, to keep their order. A
+    background thread replays the spool once the broker is back, then
+    any spool file another process left behind.
+
+    The channel is in confirm mode: a publish returns once the broker has
+    taken the message and raises if it nacks it or can't route it, so
+    only confirmed messages count as sent or replayed
+    """
+
+    def __init__(self, reconnect_interval: float = 5.0, spool_path: Optional[str] = None):
         self.channel = None
         self.connection = None
-        try:
-            self._initialize_connection()
-        except Exception as e:
-            logger.error(f"Failed to initialize connection: {e}")
+        self.reconnect_interval = reconnect_interval
+        self.spool_path = settings.NOTIFICATION_SPOOL_PATH if spool_path is None else spool_path
+        self.spool: Optional[NotificationSpool] = None
+        self._next_attempt = 0.0
+        self._lock = threading.Lock()  # The spool and its drainer
+        # pika connections aren't thread-safe: connecting, publishing and
+        # closing all hold this
+        self._io_lock = threading.RLock()
+        self._drainer: Optional[threading.Thread] = None
+        self._wakeup = threading.Event()
+        self._closing = threading.Event()
 
-    def send_message(self, message: Message) -> bool:
-        try:
-            message_dict = message.to_dict()
-            logger.info(f"Attempting to send message: {message_dict}")  # Add this line
+    def _ensure_channel(self) -> None:
+        with self._io_lock:
+            if self.channel is not None and self.channel.is_open:
+                return
+            if time.monotonic() < self._next_attempt:
+                raise ConnectionError("Broker unavailable, waiting to reconnect")
+            if self.connection is not None and not self.connection.is_open:
+                # The cached connection is dead, open a new one
+                get_rabbitmq_connection.cache_clear()
+            try:
+                self._initialize_connection()
+            except Exception:
+                self.channel = None
+                self._next_attempt = time.monotonic() + self.reconnect_interval
+                raise
+
+    def _publish(self, body: str, headers: Dict[str, str]) -> None:
+        with self._io_lock:
+            self._ensure_channel()
             self.channel.basic_publish(
                 exchange='',
                 routing_key='notifications',
-                body=json.dumps(message_dict),
+                body=body,
+                mandatory=True,  # Unroutable messages raise rather than vanish
                 properties=pika.BasicProperties(
-                    delivery_mode=2  # Make message persistent
+                    delivery_mode=2,  # Make message persistent
+                    headers=headers  # Lets the consumer continue the trace
                 )
             )
-            logger.info("Message published successfully")  # Add this line
-            return True
+
+    def start(self) -> None:
+        """Open the spool and replay whatever an earlier process left in it"""
+        if not self.spool_path:
+            return
+        with self._lock:
+            if self.spool is None:
+                self._closing.clear()
+                self.spool = NotificationSpool(self.spool_path)
+            if self._drainer is None:
+                self._drainer = threading.Thread(
+                    target=self._drain, args=(self.spool,), name="notification-spool", daemon=True
+                )
+                self._drainer.start()
+        self._wakeup.set()
+
+    def _drain(self, spool: NotificationSpool) -> None:
+        while not self._closing.is_set():
+            if spool.pending():
+                self._replay(spool)
+                continue
+
+            # Our own file is empty: take over one left behind by another process
+            orphan = spool.adopt_sibling()
+            if orphan is not None:
+                try:
+                    while orphan.pending() and not self._closing.is_set():
+                        self._replay(orphan)
+                finally:
+                    orphan.close()
+                continue
+
+            self._wakeup.wait()
+            self._wakeup.clear()
+
+    def _replay(self, spool: NotificationSpool) -> None:
+        """Publish one batch of `spool`, committing what the broker confirmed"""
+        replayed = None
+        try:
+            self._ensure_channel()
+            for offset, record in spool.read(DRAIN_BATCH):
+                if record is not None:
+                    self._publish(record["body"], record["headers"])
+                replayed = offset  # Confirmed by the broker
         except Exception as e:
-            logger.error(f"Failed to send message: {e}", exc_info=True)  # Add exc_info=True
-            return False
+            logger.warning(f"Could not replay spooled notifications from {spool.path}: {e}")
+            self._closing.wait(self.reconnect_interval)
+        finally:
+            if replayed is not None:
+                spool.commit(replayed)
+
+    def _spool_message(self, body: str, headers: Dict[str, str], reason: str) -> None:
+        if self.spool is None:
+            self.start()
+        self.spool.append({"body": body, "headers": headers})
+        NOTIFICATIONS_SPOOLED.labels(reason=reason).inc()
+        self._wakeup.set()
+
+    def send_message(self, message: Message) -> bool:
+        with tracer.start_as_current_span(
+            "notifications publish",
+            kind=SpanKind.PRODUCER,
+            attributes={
+                "messaging.system": "rabbitmq",
+                "messaging.destination.name": "notifications",
+                "notification.type": message.type.value
+            }
+        ) as span:
+            try:
+                message_dict = message.to_dict()
+                logger.info(f"Attempting to send message: {message_dict}")  # Add this line
+                body = json.dumps(message_dict)
+                headers = inject_headers()
+                with timed("publish"):
+                    if self.spool is not None and self.spool.pending():
+                        # Behind the messages waiting to be replayed
+                        self._spool_message(body, headers, "backlog")
+                        span.set_attribute("notification.spooled", True)
+                        return True
+                    try:
+                        self._publish(body, headers)
+                    except Exception as e:
+                        if not self.spool_path:
+                            raise
+                        logger.warning(f"Broker didn't take the message, spooling it: {e}")
+                        span.record_exception(e)
+                        self._spool_message(body, headers, "unavailable")
+                        span.set_attribute("notification.spooled", True)
+                        return True
+                logger.info("Message published successfully")  # Add this line
+                return True
+            except Exception as e:
+                logger.error(f"Failed to send message: {e}", exc_info=True)  # Add exc_info=True
+                span.record_exception(e)
+                span.set_status(Status(StatusCode.ERROR))
+                return False
 
     def _initialize_connection(self):
         try:
             self.connection = get_rabbitmq_connection()
             self.channel = self.connection.channel()
+            self.channel.confirm_delivery()
             self.channel.queue_declare(queue='notifications', durable=True)
         except Exception as e:
             logger.error(f"Failed to initialize connection: {e}")
@@ -47,7 +194,16 @@ class NotificationProducer:
             raise
 
     def close(self):
-        if self.channel and not self.channel.is_closed:
-            self.channel.close()
-        if self.connection and not self.connection.is_closed:
-            self.connection.close()
+        if self._drainer is not None:
+            self._closing.set()
+            self._wakeup.set()
+            self._drainer.join(timeout=self.reconnect_interval)
+            self._drainer = None
+        if self.spool is not None:
+            self.spool.close()
+            self.spool = None
+        with self._io_lock:
+            if self.channel and not self.channel.is_closed:
+                self.channel.close()
+            if self.connection and not self.connection.is_closed:
+                self.connection.close()
@@ -0,0 +1,216 @@
+"""
+Append-only local spool for notifications the broker couldn't take:
+1. Records are JSON lines in a file this process holds an exclusive lock
+   on. Other processes sharing the path (API workers) take `<path>.1`,
+   `<path>.2`..., and whoever takes a file next replays what's left in it.
+   Files no process holds any more, say after the number of workers went
+   down, are adopted and replayed by a process whose own file is empty
+2. `append` returns once the record is on disk. Concurrent appends share
+   fsyncs: each fsync covers everything written before it started
+3. Replay reads from the committed offset, kept in `<path>.offset`. Records
+   replayed after the last commit are replayed again after a crash, so
+   delivery is at least once
+4. Once everything is replayed the file is truncated
+"""
+
+import fcntl
+import json
+import logging
+import os
+import re
+import threading
+from itertools import count
+from typing import BinaryIO, Dict, List, Optional, Tuple
+
+from ..core.metrics import NOTIFICATION_SPOOL_BYTES
+
+logger = logging.getLogger(__name__)
+
+def _try_lock(path: str) -> Optional[BinaryIO]:
+    """`path` opened and locked, or None if another process holds it"""
+    file = open(path, "a+b")
+    try:
+        fcntl.flock(file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        return file
+    except BlockingIOError:
+        file.close()
+        return None
+
+def _open_locked(path: str) -> Tuple[str, BinaryIO]:
+    """The first of `path`, `path.1`, ... that no other process holds, locked"""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    for n in count():
+        candidate = f"{path}.{n}" if n else path
+        file = _try_lock(candidate)
+        if file is not None:
+            return candidate, file
+
+def _spool_files(path: str) -> List[str]:
+    """Existing spool files for `path`: `path` itself and `path.1`, `path.2`..."""
+    directory, name = os.path.split(path)
+    pattern = re.compile(rf"{re.escape(name)}(\.\d+)?")
+    return sorted(
+        os.path.join(directory, entry)
+        for entry in os.listdir(directory or ".")
+        if pattern.fullmatch(entry)
+    )
+
+def _fsync_directory(path: str) -> None:
+    directory = os.open(os.path.dirname(os.path.abspath(path)), os.O_RDONLY)
+    try:
+        os.fsync(directory)
+    finally:
+        os.close(directory)
+
+class NotificationSpool:
+    def __init__(self, path: str):
+        self.base_path = path
+        self.path, self._file = _open_locked(path)
+        self._report_bytes = True
+        self._attach()
+
+    @classmethod
+    def adopt(cls, base_path: str, path: str) -> Optional["NotificationSpool"]:
+        """
+        The spool file `path` if no process holds it and it has records left
+        to replay, otherwise None. Adopted spools don't report their size,
+        the gauge is for the process's own spool
+        """
+        file = _try_lock(path)
+        if file is None:
+            return None
+        spool = cls.__new__(cls)
+        spool.base_path, spool.path, spool._file = base_path, path, file
+        spool._report_bytes = False
+        spool._attach()
+        if not spool.pending():
+            spool.close()
+            return None
+        return spool
+
+    def adopt_sibling(self) -> Optional["NotificationSpool"]:
+        """Another spool file for the same path that was left with records and no owner"""
+        for path in _spool_files(self.base_path):
+            if path != self.path:
+                spool = NotificationSpool.adopt(self.base_path, path)
+                if spool is not None:
+                    logger.info(f"Adopted {spool.path} to replay its notifications")
+                    return spool
+        return None
+
+    def _attach(self) -> None:
+        self._reader = open(self.path, "rb")
+        self._offset_path = f"{self.path}.offset"
+        self._lock = threading.Lock()  # Appends and the file's length
+        self._sync_lock = threading.Lock()  # One fsync at a time
+        self._written = 0
+        self._synced = 0
+        self._offset = 0
+        self._recover()
+
+    def _recover(self) -> None:
+        size = os.fstat(self._file.fileno()).st_size
+        offset = self._read_offset()
+        if offset > size:
+            # Truncated after a full replay, before the offset was removed
+            offset = 0
+
+        # A record torn by a crash mid-write was never acknowledged, drop it
+        end = offset
+        self._reader.seek(offset)
+        for line in self._reader:
+            if not line.endswith(b"\n"):
+                break
+            end += len(line)
+        if end < size:
+            logger.warning(f"Dropping {size - end} bytes of a torn record from {self.path}")
+            self._file.truncate(end)
+            os.fsync(self._file.fileno())
+
+        self._written = self._synced = end
+        self._offset = offset
+        self._report(end - offset)
+        if end > offset:
+            logger.info(f"{end - offset} bytes of notifications to replay from {self.path}")
+
+    def _report(self, size: int) -> None:
+        if self._report_bytes:
+            NOTIFICATION_SPOOL_BYTES.set(size)
+
+    def _read_offset(self) -> int:
+        try:
+            with open(self._offset_path) as f:
+                return int(f.read() or 0)
+        except FileNotFoundError:
+            return 0
+
+    def _write_offset(self, offset: int) -> None:
+        temporary = f"{self._offset_path}.tmp"
+        with open(temporary, "w") as f:
+            f.write(str(offset))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temporary, self._offset_path)
+        _fsync_directory(self._offset_path)
+
+    def pending(self) -> bool:
+        """Whether there are records left to replay"""
+        return self._written > self._offset
+
+    def append(self, record: Dict) -> None:
+        """Write `record` and return once it's on disk"""
+        line = json.dumps(record, separators=(",", ":")).encode() + b"\n"
+        with self._lock:
+            self._file.write(line)
+            self._written += len(line)
+            end = self._written
+        self._sync(end)
+        self._report(self._written - self._offset)
+
+    def _sync(self, end: int) -> None:
+        with self._sync_lock:
+            # An fsync that started after our write already covered it
+            if self._synced >= end:
+                return
+            with self._lock:
+                self._file.flush()
+                target = self._written
+            os.fsync(self._file.fileno())
+            self._synced = target
+
+    def read(self, limit: int) -> List[Tuple[int, Optional[Dict]]]:
+        """
+        Up to `limit` records after the committed offset, each with the
+        offset just past it. Unreadable records are None
+        """
+        records: List[Tuple[int, Optional[Dict]]] = []
+        position, end = self._offset, self._synced
+        self._reader.seek(position)
+        while len(records) < limit and position < end:
+            line = self._reader.readline()
+            position += len(line)
+            try:
+                records.append((position, json.loads(line)))
+            except ValueError:
+                logger.error(f"Skipping an unreadable record in {self.path} before offset {position}")
+                records.append((position, None))
+        return records
+
+    def commit(self, offset: int) -> None:
+        """Mark the records before `offset` as replayed"""
+        with self._sync_lock, self._lock:
+            self._offset = offset
+            if offset == self._written:
+                # Everything is replayed: start over with an empty file
+                self._file.truncate(0)
+                os.fsync(self._file.fileno())
+                if os.path.exists(self._offset_path):
+                    os.remove(self._offset_path)
+                self._written = self._synced = self._offset = 0
+            else:
+                self._write_offset(offset)
+            self._report(self._written - self._offset)
+
+    def close(self) -> None:
+        self._reader.close()
+        self._file.close()  # Releases the lock
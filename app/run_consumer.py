@@ -1,5 +1,7 @@
 from app.queue.consumer import TelegramConsumer
 from app.core.config import settings
+from app.core.tracing import setup_tracing
+from prometheus_client import start_http_server
 import logging
 import asyncio
 
@@ -11,6 +13,12 @@ def main():
     loop = asyncio.new_event_loop()
     asyncio.set_event_loop(loop)
 
+    # Expose consumer metrics for Prometheus
+    start_http_server(settings.CONSUMER_METRICS_PORT)
+    logger.info(f"Metrics available on port {settings.CONSUMER_METRICS_PORT}")
+
+    setup_tracing("consumer", settings.TRACE_EXPORTER, settings.TRACE_EXPORT_FILE)
+
     consumer = TelegramConsumer(settings.TELEGRAM_BOT_TOKEN)
     try:
         logger.info("Starting consumer...")
@@ -0,0 +1,27 @@
+"""
+Recompute the denormalized homework counters from the submissions.
+
+Usage:
+    python -m app.run_counter_repair [--batch-size 1000]
+"""
+
+from app.db.base import get_engine
+from app.db.counters import repair_homework_counters
+from sqlmodel import Session
+import argparse
+import logging
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--batch-size", type=int, default=1000, help="Homework per transaction")
+    args = parser.parse_args()
+
+    with Session(get_engine()) as session:
+        repaired = repair_homework_counters(session, args.batch_size)
+    logger.info(f"Repaired counters of {repaired} homework")
+
+if __name__ == "__main__":
+    main()
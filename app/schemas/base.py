@@ -1,15 +1,55 @@
+import os
+import time
 from datetime import datetime
-from typing import Optional, Dict
+from typing import Any, Optional, Dict, Type
 from sqlmodel import SQLModel, Field
-from uuid import uuid4
 from enum import Enum
-from sqlalchemy import JSON
+from sqlalchemy import Column, Computed, Index
+from sqlalchemy.dialects.postgresql import JSONB, TSVECTOR
 
 class Status(str, Enum):
     COMPLETED = "completed"
     PENDING = "pending"
     CANCELLED = "cancelled"
 
+# Crockford base32, whose character order matches numeric order
+ULID_ALPHABET = "0123456789ABCDEFGHJKMNPQRSTVWXYZ"
+
+def ulid(timestamp_ms: Optional[int] = None, randomness: Optional[int] = None) -> str:
+    """
+    26-character ULID: a 48-bit millisecond timestamp followed by 80 random
+    bits. ULIDs sort by creation time, so new rows land at the right edge
+    of the primary key index instead of on random pages.
+    """
+    if timestamp_ms is None:
+        timestamp_ms = time.time_ns() // 1_000_000
+    if randomness is None:
+        randomness = int.from_bytes(os.urandom(10), "big")
+    value = (timestamp_ms << 80) | randomness
+    chars = []
+    for _ in range(26):
+        chars.append(ULID_ALPHABET[value & 31])
+        value >>= 5
+    return "".join(reversed(chars))
+
+def new_id(prefix: str) -> str:
+    """Prefixed, time-ordered id, e.g. `usr_01J9ZQ4X3KZ6M8T1V0W2Y5B7CD`"""
+    return f"{prefix}_{ulid()}"
+
+# Text search configuration of the `search` columns, queries must use the same
+SEARCH_CONFIG = "english"
+
+def add_search_column(model: Type[SQLModel], document: str) -> Column:
+    """
+    Add a `search` tsvector column that Postgres generates from the SQL
+    expression `document`, with a GIN index, to `model`'s table. The column
+    isn't mapped on the model, so it never reaches inserts or responses
+    """
+    column = Column("search", TSVECTOR, Computed(document, persisted=True))
+    model.__table__.append_column(column)
+    Index(f"ix_{model.__tablename__}_search", column, postgresql_using="gin")
+    return column
+
 class TimeStampedModel(SQLModel):
     id: str = Field(default=None, primary_key=True)
     created_at: datetime = Field(
@@ -20,10 +60,35 @@ class TimeStampedModel(SQLModel):
     def __init__(self, **data):
         if 'id' not in data:
             prefix = getattr(self, 'id_prefix', 'item')
-            data['id'] = f"{prefix}_{uuid4()}"
+            data['id'] = new_id(prefix)
         super().__init__(**data)
 
+    @classmethod
+    def new_row(cls, data: SQLModel) -> Dict[str, Any]:
+        """
+        Column values for a new row from a validated request body, with a
+        fresh id and the model's defaults for everything the body doesn't set
+        """
+        row = {"id": new_id(getattr(cls, 'id_prefix', 'item')), **data.model_dump()}
+        for name, field in cls.model_fields.items():
+            if name not in row:
+                row[name] = field.get_default(call_default_factory=True)
+        return row
+
 class SequenceItemBase(TimeStampedModel):
     # previous_id: Optional[str] = Field(default=None)
-    content: Dict = Field(default_factory=dict, sa_type=JSON)
+    content: Dict = Field(default_factory=dict, sa_type=JSONB)
     status: Status = Field(default=Status.PENDING)
+
+# Slim request and response bodies. Clients never set `id`, `created_at`
+# or `status`; the server assigns them when the row is created
+class SequenceItemCreate(SQLModel):
+    content: Dict = Field(default_factory=dict)
+
+class TimeStampedRead(SQLModel):
+    id: str
+    created_at: datetime
+
+class SequenceItemRead(TimeStampedRead):
+    content: Dict
+    status: Status
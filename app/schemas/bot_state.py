@@ -0,0 +1,14 @@
+from datetime import datetime
+from sqlalchemy import Column, DateTime, LargeBinary, String, Table
+from sqlmodel import SQLModel
+
+# Bot persistence (`app.bot.persistence`): serialized conversation states
+# and user/chat/bot data, shared between bot replicas
+bot_state = Table(
+    "bot_state",
+    SQLModel.metadata,
+    Column("kind", String, primary_key=True),  # user_data, chat_data, bot_data, conversation:<name>
+    Column("key", String, primary_key=True),
+    Column("payload", LargeBinary, nullable=False),
+    Column("updated_at", DateTime, nullable=False, default=datetime.utcnow),
+)
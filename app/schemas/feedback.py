@@ -1,13 +1,36 @@
-from typing import ClassVar
+from typing import ClassVar, Optional
 from sqlmodel import SQLModel, Field
-from .base import SequenceItemBase
+from sqlalchemy import Index
+from .base import SEARCH_CONFIG, SequenceItemBase, SequenceItemCreate, SequenceItemRead, add_search_column
 
 class Feedback(SequenceItemBase, table=True):
     id_prefix: ClassVar[str] = "fb"
 
-    student_id: str = Field(foreign_key="user.id")
-    teacher_id: str = Field(foreign_key="user.id")
+    student_id: str = Field(foreign_key="user.id", index=True)
+    teacher_id: str = Field(foreign_key="user.id", index=True)
     submission_id: str = Field(foreign_key="submission.id")
 
     class Config:
         from_attributes = True
+
+# Feedback histories, paged in (created_at, id) order from a keyset cursor
+Index("ix_feedback_student_history", Feedback.student_id, Feedback.created_at, Feedback.id)
+Index("ix_feedback_teacher_history", Feedback.teacher_id, Feedback.created_at, Feedback.id)
+
+feedback_search = add_search_column(
+    Feedback, f"to_tsvector('{SEARCH_CONFIG}', coalesce(content ->> 'text', ''))"
+)
+
+class FeedbackCreate(SequenceItemCreate):
+    student_id: str
+    teacher_id: str
+    submission_id: str
+
+class FeedbackRead(SequenceItemRead):
+    student_id: str
+    teacher_id: str
+    submission_id: str
+
+class FeedbackHistoryItem(FeedbackRead):
+    homework_title: Optional[str]
+    student_handle: str
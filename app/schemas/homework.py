@@ -1,18 +1,58 @@
 from sqlmodel import SQLModel, Field
-from typing import List, ClassVar
-from .base import SequenceItemBase
+from typing import Any, ClassVar, Dict, List
+from .base import SEARCH_CONFIG, SequenceItemBase, SequenceItemCreate, SequenceItemRead, add_search_column
 from .user import UserRole
-from sqlalchemy import Column, String
+from sqlalchemy import Column, Index, String
 from sqlalchemy.dialects.postgresql import ARRAY
 
 class HomeworkTask(SequenceItemBase, table=True):
     id_prefix: ClassVar[str] = "hw"
 
-    teacher_id: str = Field(foreign_key="user.id")
+    teacher_id: str = Field(foreign_key="user.id", index=True)
     student_ids: List[str] = Field(
         default_factory=list,
         sa_column=Column(ARRAY(String))
     )
+    # Distinct students assigned / with a submission / with a reviewed
+    # submission, kept up to date by `app.db.counters`
+    assigned_count: int = Field(default=0, sa_column_kwargs={"server_default": "0"})
+    submitted_count: int = Field(default=0, sa_column_kwargs={"server_default": "0"})
+    completed_count: int = Field(default=0, sa_column_kwargs={"server_default": "0"})
 
     class Config:
         from_attributes = True
+
+    def __init__(self, **data):
+        data.setdefault("assigned_count", len(set(data.get("student_ids") or [])))
+        super().__init__(**data)
+
+    @classmethod
+    def new_row(cls, data: SQLModel) -> Dict[str, Any]:
+        row = super().new_row(data)
+        row["assigned_count"] = len(set(row["student_ids"]))
+        return row
+
+# `content->>'title'`, matched by the expression index below, so filtering
+# and sorting by title don't read the whole document
+homework_title = HomeworkTask.content["title"].astext
+
+Index("ix_homeworktask_title", homework_title)
+# Student homework lists filter with `student_ids @> ARRAY[...]`
+Index("ix_homeworktask_student_ids", HomeworkTask.student_ids, postgresql_using="gin")
+
+# Title matches rank above description matches
+homework_search = add_search_column(HomeworkTask, (
+    f"setweight(to_tsvector('{SEARCH_CONFIG}', coalesce(content ->> 'title', '')), 'A') || "
+    f"setweight(to_tsvector('{SEARCH_CONFIG}', coalesce(content ->> 'description', '')), 'B')"
+))
+
+class HomeworkTaskCreate(SequenceItemCreate):
+    teacher_id: str
+    student_ids: List[str] = Field(default_factory=list)
+
+class HomeworkTaskRead(SequenceItemRead):
+    teacher_id: str
+    student_ids: List[str]
+    assigned_count: int
+    submitted_count: int
+    completed_count: int
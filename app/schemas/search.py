@@ -0,0 +1,15 @@
+from datetime import datetime
+from enum import Enum
+from sqlmodel import SQLModel
+
+class SearchKind(str, Enum):
+    HOMEWORK = "homework"
+    SUBMISSION = "submission"
+    FEEDBACK = "feedback"
+
+class SearchResult(SQLModel):
+    kind: SearchKind
+    id: str
+    created_at: datetime
+    rank: float
+    headline: str  # Matching fragments, with the matched words in **
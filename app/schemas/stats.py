@@ -0,0 +1,70 @@
+from datetime import datetime
+from enum import Enum, IntEnum
+from typing import Dict, List, Optional
+from sqlmodel import SQLModel
+from .base import Status
+
+class HomeworkProgress(SQLModel):
+    id: str
+    title: Optional[str]
+    status: Status
+    created_at: datetime
+    assigned_count: int
+    submitted_count: int
+    completed_count: int
+    submission_rate: float  # Share of assigned students who submitted
+    completion_rate: float  # Share of assigned students with a reviewed submission
+
+class OverdueStudent(SQLModel):
+    student_id: str
+    tg_handle: str
+    overdue_count: int  # Pending homework past the deadline with no submission
+    oldest_assigned_at: datetime
+
+class TeacherStats(SQLModel):
+    teacher_id: str
+    pending_review: int
+    oldest_pending_at: Optional[datetime]
+    homework_count: int
+    submission_rate: float
+    completion_rate: float
+    reviewed: int  # Submissions first reviewed within `days`
+    median_review_seconds: Optional[float]
+    homework: List[HomeworkProgress]  # Most recent first
+    overdue_students_total: int
+    overdue_students: List[OverdueStudent]  # Most overdue homework first
+
+class ProgressCell(IntEnum):
+    """Cell codes of the progress matrix, ordered by progress"""
+    NOT_ASSIGNED = 0
+    ASSIGNED = 1
+    SUBMITTED = 2
+    COMPLETED = 3
+
+class MatrixEncoding(str, Enum):
+    TEXT = "text"  # `rows`: one string per student, one digit per homework
+    PACKED = "packed"  # `packed`: base64 of 2 bits per cell, row-major, first cell in the high bits
+
+class MatrixHomework(SQLModel):
+    id: str
+    title: Optional[str]
+    created_at: datetime
+    completion_rate: float  # Share of assigned students with a reviewed submission
+
+class MatrixStudent(SQLModel):
+    id: str
+    tg_handle: Optional[str]
+    assigned: int
+    submission_rate: float
+    completion_rate: float
+    current_streak: int  # Latest assigned homework submitted in a row
+    longest_streak: int
+    percentile: float  # Percentile rank of `completion_rate` in the class
+
+class ProgressMatrix(SQLModel):
+    teacher_id: str
+    homework: List[MatrixHomework]  # Columns, oldest first
+    students: List[MatrixStudent]  # Rows, by handle
+    rows: Optional[List[str]] = None
+    packed: Optional[str] = None
+    completion_percentiles: Dict[str, float]  # Of student completion rates, "p10" to "p90"
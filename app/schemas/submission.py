@@ -1,13 +1,36 @@
 from typing import ClassVar
 from sqlmodel import SQLModel, Field
-from .base import SequenceItemBase
+from sqlalchemy import Index, text
+from .base import SEARCH_CONFIG, SequenceItemBase, SequenceItemCreate, SequenceItemRead, add_search_column
 
 class Submission(SequenceItemBase, table=True):
     id_prefix: ClassVar[str] = "sub"
 
-    student_id: str = Field(foreign_key="user.id")
-    teacher_id: str = Field(foreign_key="user.id")
-    homework_task_id: str = Field(foreign_key="homeworktask.id")
+    student_id: str = Field(foreign_key="user.id", index=True)
+    teacher_id: str = Field(foreign_key="user.id", index=True)
+    homework_task_id: str = Field(foreign_key="homeworktask.id", index=True)
 
     class Config:
         from_attributes = True
+
+# A teacher's review queue, whatever the length of their history
+Index(
+    "ix_submission_pending_review",
+    Submission.teacher_id,
+    Submission.created_at,
+    postgresql_where=text("status = 'PENDING'")
+)
+
+submission_search = add_search_column(
+    Submission, f"to_tsvector('{SEARCH_CONFIG}', coalesce(content ->> 'text', ''))"
+)
+
+class SubmissionCreate(SequenceItemCreate):
+    student_id: str
+    teacher_id: str
+    homework_task_id: str
+
+class SubmissionRead(SequenceItemRead):
+    student_id: str
+    teacher_id: str
+    homework_task_id: str
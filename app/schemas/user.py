@@ -1,8 +1,9 @@
 from enum import Enum
 from sqlmodel import SQLModel, Field
-from .base import TimeStampedModel
+from .base import TimeStampedModel, TimeStampedRead
 from typing import Optional, Dict, ClassVar
-from sqlalchemy import JSON
+from sqlalchemy import DDL, BigInteger, Index, event
+from sqlalchemy.dialects.postgresql import JSONB
 
 class UserRole(str, Enum):
     STUDENT = "student"
@@ -12,10 +13,31 @@ class User(TimeStampedModel, table=True):
     id_prefix: ClassVar[str] = "usr"
 
     tg_handle: str = Field(unique=True, index=True)
-    telegram_id: str = Field(unique=True, index=True)  # Numeric Telegram ID
+    telegram_id: int = Field(unique=True, index=True, sa_type=BigInteger)
 
     role: UserRole
-    meta: Dict = Field(default_factory=dict, sa_type=JSON)
+    meta: Dict = Field(default_factory=dict, sa_type=JSONB)
 
     class Config:
         from_attributes = True
+
+# Handle search (`/users/search`) matches trigrams, which needs pg_trgm
+event.listen(SQLModel.metadata, "before_create", DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+Index(
+    "ix_user_tg_handle_trgm",
+    User.tg_handle,
+    postgresql_using="gin",
+    postgresql_ops={"tg_handle": "gin_trgm_ops"}
+)
+
+class UserCreate(SQLModel):
+    tg_handle: str
+    telegram_id: int
+    role: UserRole
+    meta: Dict = Field(default_factory=dict)
+
+class UserRead(TimeStampedRead):
+    tg_handle: str
+    telegram_id: int
+    role: UserRole
+    meta: Dict
@@ -0,0 +1,432 @@
+"""
+Bot command latency and fan-out, replaying synthetic users through the real handler graph.
+
+Builds the application exactly as `DanceEducationBot.build_application` does
+and feeds it fabricated `Update` objects for `--users` concurrent users, each
+replaying scripted conversations (`/start`, `/homework`, `/assign` with
+student toggles, `/submit`, `/pending_feedback`) as seeded teachers and
+students. The Bot API is stubbed in-process with a configurable latency and
+buttons are pressed from the keyboards the bot actually sent.
+
+Reports per step latency and how many platform API and Telegram calls each
+step triggered, so N+1 request patterns show up as numbers, plus event loop
+lag (how late a 10 ms ticker wakes up), which exposes handlers that block the
+loop.
+
+By default the platform API runs in-process through httpx's ASGI transport
+against `--database-url`; pass `--base-url` to use a running server instead.
+
+Usage:
+    python -m benchmarks.seed --database-url postgresql://... --reset
+    python -m benchmarks.bench_bot --database-url postgresql://... [--scenarios assign submit]
+        [--users 16] [--iterations 10] [--telegram-latency-ms 30] [--json PATH]
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import random
+import time
+from collections import Counter, defaultdict
+from contextvars import ContextVar
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple
+
+import httpx
+from sqlalchemy import create_engine, func
+from sqlmodel import Session, select
+from telegram import Update
+from telegram.ext import Application, ContextTypes
+from telegram.request import BaseRequest, RequestData
+
+from app.schemas.base import Status
+from app.schemas.homework import HomeworkTask
+from app.schemas.submission import Submission
+from app.schemas.user import User, UserRole
+
+from .stats import latency_summary, report
+
+BENCH_TOKEN = "123456:bench"
+BOT_USER = {"id": 1, "is_bot": True, "first_name": "Bench", "username": "bench_bot"}
+LAG_INTERVAL = 0.01
+
+# Calls made while the current step is processed, by kind ("api" or "telegram")
+_step_calls: ContextVar[Optional[Counter]] = ContextVar("step_calls", default=None)
+
+def _count_call(kind: str):
+    calls = _step_calls.get()
+    if calls is not None:
+        calls[kind] += 1
+
+class CountingTransport(httpx.AsyncBaseTransport):
+    """Counts platform API requests against the step being processed"""
+
+    def __init__(self, transport: httpx.AsyncBaseTransport):
+        self.transport = transport
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        _count_call("api")
+        return await self.transport.handle_async_request(request)
+
+    async def aclose(self):
+        await self.transport.aclose()
+
+class FakeBotRequest(BaseRequest):
+    """
+    In-process stand-in for the Bot API. Answers every method after a
+    simulated network latency and remembers the callback data of the last
+    inline keyboard sent to each chat, so scripted users can press buttons.
+    """
+
+    def __init__(self, latency_ms: float, jitter_ms: float, seed: int):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.rng = random.Random(seed)
+        self.keyboards: Dict[int, List[str]] = {}
+        self._message_id = 0
+
+    @property
+    def read_timeout(self) -> Optional[float]:
+        return None
+
+    async def initialize(self):
+        pass
+
+    async def shutdown(self):
+        pass
+
+    def _remember_keyboard(self, parameters: Dict):
+        chat_id = parameters.get("chat_id")
+        markup = parameters.get("reply_markup")
+        if chat_id is None:
+            return
+        if isinstance(markup, str):
+            markup = json.loads(markup)
+        self.keyboards[int(chat_id)] = [
+            button["callback_data"]
+            for row in (markup or {}).get("inline_keyboard", [])
+            for button in row
+            if "callback_data" in button
+        ]
+
+    async def do_request(
+        self,
+        url: str,
+        method: str,
+        request_data: Optional[RequestData] = None,
+        read_timeout=None,
+        write_timeout=None,
+        connect_timeout=None,
+        pool_timeout=None
+    ) -> Tuple[int, bytes]:
+        api_method = url.rsplit("/", 1)[-1]
+        parameters = request_data.parameters if request_data else {}
+        if api_method != "getMe":
+            _count_call("telegram")
+            await asyncio.sleep(max(0.0, self.rng.gauss(self.latency_ms, self.jitter_ms)) / 1000)
+
+        if api_method == "getMe":
+            result = BOT_USER
+        elif api_method == "answerCallbackQuery":
+            result = True
+        else:
+            self._remember_keyboard(parameters)
+            self._message_id += 1
+            result = {
+                "message_id": self._message_id,
+                "date": int(time.time()),
+                "chat": {"id": int(parameters.get("chat_id", 0)), "type": "private"},
+                "from": BOT_USER,
+                "text": parameters.get("text", "")
+            }
+        return 200, json.dumps({"ok": True, "result": result}).encode()
+
+class UpdateFactory:
+    """Fabricates the updates Telegram would deliver for a user's messages and button presses"""
+
+    def __init__(self, bot):
+        self.bot = bot
+        self._update_id = 0
+
+    def _next_id(self) -> int:
+        self._update_id += 1
+        return self._update_id
+
+    @staticmethod
+    def _user(telegram_id: int) -> Dict:
+        return {"id": telegram_id, "is_bot": False, "first_name": "Bench", "username": f"bench_{telegram_id}"}
+
+    def message(self, telegram_id: int, text: str) -> Update:
+        update_id = self._next_id()
+        message = {
+            "message_id": update_id,
+            "date": int(time.time()),
+            "chat": {"id": telegram_id, "type": "private"},
+            "from": self._user(telegram_id),
+            "text": text
+        }
+        if text.startswith("/"):
+            message["entities"] = [{"type": "bot_command", "offset": 0, "length": len(text.split()[0])}]
+        return Update.de_json({"update_id": update_id, "message": message}, self.bot)
+
+    def button(self, telegram_id: int, data: str) -> Update:
+        update_id = self._next_id()
+        return Update.de_json({
+            "update_id": update_id,
+            "callback_query": {
+                "id": str(update_id),
+                "from": self._user(telegram_id),
+                "chat_instance": str(telegram_id),
+                "data": data,
+                "message": {
+                    "message_id": update_id,
+                    "date": int(time.time()),
+                    "chat": {"id": telegram_id, "type": "private"},
+                    "from": BOT_USER,
+                    "text": "keyboard"
+                }
+            }
+        }, self.bot)
+
+# (callback data on the last keyboard, rng) -> button to press, or None if it isn't there
+Picker = Callable[[List[str], random.Random], Optional[str]]
+
+def _first_option(options: List[str], rng: random.Random) -> Optional[str]:
+    choices = [data for data in options if data != "main_menu"]
+    return choices[0] if choices else None
+
+def _random_student(options: List[str], rng: random.Random) -> Optional[str]:
+    students = [data for data in options if data.startswith("usr_")]
+    return rng.choice(students) if students else None
+
+def _press(data: str) -> Picker:
+    return lambda options, rng: data if data in options else None
+
+class Step(NamedTuple):
+    name: str
+    text: Optional[str] = None
+    button: Optional[Picker] = None
+
+class Scenario(NamedTuple):
+    role: UserRole
+    steps: List[Step]
+
+SCENARIOS: Dict[str, Scenario] = {
+    "start": Scenario(UserRole.STUDENT, [Step("command", "/start")]),
+    "homework": Scenario(UserRole.STUDENT, [Step("command", "/homework")]),
+    "assign": Scenario(UserRole.TEACHER, [
+        Step("command", "/assign"),
+        Step("content", "Title: Bench routine\nDescription: Generated by benchmarks.bench_bot"),
+        Step("toggle", button=_random_student),
+        Step("toggle", button=_random_student),
+        Step("toggle", button=_random_student),
+        Step("next_page", button=_press("page_1")),
+        Step("done", button=_press("done")),
+    ]),
+    "submit": Scenario(UserRole.STUDENT, [
+        Step("command", "/submit"),
+        Step("select", button=_first_option),
+        Step("content", "Recorded the routine, generated by benchmarks.bench_bot"),
+    ]),
+    "pending_feedback": Scenario(UserRole.TEACHER, [
+        Step("command", "/pending_feedback"),
+        Step("select", button=_first_option),
+        Step("content", "Good timing, generated by benchmarks.bench_bot"),
+    ]),
+    "search": Scenario(UserRole.TEACHER, [Step("command", "/search routine posture")]),
+}
+
+class StepStats:
+    def __init__(self):
+        self.latencies: List[float] = []
+        self.api_calls: List[int] = []
+        self.telegram_calls: List[int] = []
+        self.skipped = 0
+
+    def summary(self) -> Dict:
+        count = len(self.latencies)
+        return {
+            "count": count,
+            "skipped": self.skipped,
+            **latency_summary(self.latencies),
+            "api_calls_mean": round(sum(self.api_calls) / count, 2) if count else 0.0,
+            "api_calls_max": max(self.api_calls, default=0),
+            "telegram_calls_mean": round(sum(self.telegram_calls) / count, 2) if count else 0.0
+        }
+
+def sample_users(database_url: str, count: int) -> Dict[UserRole, List[int]]:
+    """
+    Telegram ids of seeded teachers with pending submissions and of students
+    with pending homework, so every scenario has something to work on
+    """
+    engine = create_engine(database_url)
+    with Session(engine) as session:
+        teacher_ids = session.exec(
+            select(Submission.teacher_id)
+            .where(Submission.status == Status.PENDING)
+            .group_by(Submission.teacher_id)
+            .order_by(func.random())
+            .limit(count)
+        ).all()
+        homework = session.exec(
+            select(HomeworkTask.student_ids)
+            .where(HomeworkTask.status == Status.PENDING)
+            .order_by(func.random())
+            .limit(count)
+        ).all()
+        student_ids = list({student_ids[0] for student_ids in homework if student_ids})
+
+        def telegram_ids(user_ids: List[str]) -> List[int]:
+            if not user_ids:
+                return []
+            return list(session.exec(
+                select(User.telegram_id).where(User.id.in_(user_ids))
+            ).all())
+
+        users = {
+            UserRole.TEACHER: telegram_ids(list(teacher_ids)),
+            UserRole.STUDENT: telegram_ids(student_ids)
+        }
+    engine.dispose()
+
+    if not users[UserRole.TEACHER] or not users[UserRole.STUDENT]:
+        raise SystemExit("No teachers or students with pending work, run benchmarks.seed first")
+    return users
+
+def build_api_transport(database_url: str, base_url: Optional[str]) -> httpx.AsyncBaseTransport:
+    if base_url:
+        return CountingTransport(httpx.AsyncHTTPTransport())
+
+    # The app reads its database from the environment when first imported
+    os.environ["DATABASE_URL"] = database_url
+    from app.main import app
+    return CountingTransport(httpx.ASGITransport(app=app))
+
+def build_application(args) -> Tuple[Application, FakeBotRequest, "APIClient"]:
+    # Conversation state stays in memory; the harness measures handlers, not persistence
+    os.environ["BOT_PERSISTENCE"] = "none"
+    from app.bot.client import APIClient
+    from app.bot.main import DanceEducationBot
+
+    # The bot configures logging on import; per-request INFO lines would dominate the run
+    logging.getLogger().setLevel(logging.WARNING)
+
+    bot = DanceEducationBot()
+    bot.api_client = APIClient(
+        base_url=args.base_url or "http://bench",
+        transport=build_api_transport(args.database_url, args.base_url)
+    )
+    request = FakeBotRequest(args.telegram_latency_ms, args.telegram_jitter_ms, args.seed)
+    builder = Application.builder().token(BENCH_TOKEN).request(request).get_updates_request(request)
+    return bot.build_application(builder), request, bot.api_client
+
+async def monitor_loop_lag(lags: List[float], stop: asyncio.Event):
+    """Record how much later than requested a short sleep wakes up"""
+    while not stop.is_set():
+        start_time = time.perf_counter()
+        await asyncio.sleep(LAG_INTERVAL)
+        lags.append(max(0.0, time.perf_counter() - start_time - LAG_INTERVAL))
+
+async def run(args) -> Dict:
+    users = sample_users(args.database_url, args.users)
+    application, request, api_client = build_application(args)
+    updates = UpdateFactory(application.bot)
+    stats: Dict[str, StepStats] = defaultdict(StepStats)
+    errors = Counter()
+
+    async def on_error(update: object, context: ContextTypes.DEFAULT_TYPE):
+        errors[type(context.error).__name__] += 1
+
+    application.add_error_handler(on_error)
+
+    async def process(name: str, update: Update) -> None:
+        calls = Counter()
+        token = _step_calls.set(calls)
+        start_time = time.perf_counter()
+        try:
+            await application.process_update(update)
+        finally:
+            _step_calls.reset(token)
+        stats[name].latencies.append(time.perf_counter() - start_time)
+        stats[name].api_calls.append(calls["api"])
+        stats[name].telegram_calls.append(calls["telegram"])
+
+    async def play(scenario_name: str, telegram_id: int, rng: random.Random):
+        scenario = SCENARIOS[scenario_name]
+        for index, step in enumerate(scenario.steps):
+            name = f"{scenario_name}.{step.name}"
+            if step.text is not None:
+                await process(name, updates.message(telegram_id, step.text))
+                continue
+
+            data = step.button(request.keyboards.get(telegram_id, []), rng)
+            if data is None:
+                # Nothing to press (e.g. no pending homework); leave the conversation
+                for skipped in scenario.steps[index:]:
+                    stats[f"{scenario_name}.{skipped.name}"].skipped += 1
+                await application.process_update(updates.message(telegram_id, "/cancel"))
+                return
+            await process(name, updates.button(telegram_id, data))
+
+    async def worker(worker_id: int):
+        rng = random.Random(args.seed * 1000 + worker_id)
+        # Each worker is its own teacher and student, so conversations never interleave
+        identities = {role: ids[worker_id % len(ids)] for role, ids in users.items()}
+        for _ in range(args.iterations):
+            scenario_name = rng.choice(args.scenarios)
+            await play(scenario_name, identities[SCENARIOS[scenario_name].role], rng)
+
+    lags: List[float] = []
+    stop = asyncio.Event()
+    async with application:
+        monitor = asyncio.create_task(monitor_loop_lag(lags, stop))
+        start = time.perf_counter()
+        try:
+            await asyncio.gather(*(worker(i) for i in range(args.users)))
+        finally:
+            elapsed = time.perf_counter() - start
+            stop.set()
+            await monitor
+            await api_client.close()
+
+    total = sum(len(step.latencies) for step in stats.values())
+    return {
+        "all": {
+            "updates": total,
+            "errors": sum(errors.values()),
+            "updates_per_s": round(total / elapsed, 1) if elapsed else 0.0
+        },
+        "errors": dict(errors),
+        "steps": {name: stats[name].summary() for name in sorted(stats)},
+        "loop_lag": latency_summary(lags)
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--database-url", default=os.getenv("DATABASE_URL"))
+    parser.add_argument("--base-url", help="Use a running API server instead of the in-process app")
+    parser.add_argument("--scenarios", nargs="+", choices=list(SCENARIOS), default=list(SCENARIOS))
+    parser.add_argument("--users", type=int, default=16, help="Concurrent synthetic users")
+    parser.add_argument("--iterations", type=int, default=10, help="Scenarios replayed per user")
+    parser.add_argument("--telegram-latency-ms", type=float, default=30.0, help="Stub Bot API response time")
+    parser.add_argument("--telegram-jitter-ms", type=float, default=5.0)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--json", help="Write results to this file")
+    args = parser.parse_args()
+
+    if not args.database_url:
+        parser.error("--database-url or DATABASE_URL is required")
+
+    results = asyncio.run(run(args))
+    report(results, {
+        "mode": "server" if args.base_url else "in-process",
+        "scenarios": args.scenarios,
+        "users": args.users,
+        "iterations": args.iterations,
+        "telegram_latency_ms": args.telegram_latency_ms,
+        "seed": args.seed
+    }, args.json)
+
+if __name__ == "__main__":
+    main()
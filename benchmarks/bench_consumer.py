@@ -0,0 +1,199 @@
+"""
+Notification consumer throughput with an in-memory broker and a fake Telegram.
+
+Feeds `--messages` notifications through an in-memory stand-in for the pika
+channel (either all at once, or at `--publish-rate` messages/s) into a
+consumer whose `telegram.Bot` talks to a local fake Bot API server with
+configurable latency and 429 injection. Reports messages/s, delivery latency
+(publish → ack) and processing latency (delivery → ack/nack) percentiles,
+and how many messages were dropped.
+
+New consumer implementations register a builder in `CONSUMER_MODES` so all
+modes are measured with the same harness.
+
+Usage:
+    python -m benchmarks.bench_consumer [--modes default] [--messages 2000]
+        [--latency-ms 50] [--rate-limit-ratio 0.01] [--publish-rate 0] [--json PATH]
+"""
+
+import argparse
+import json
+import os
+import random
+import time
+from collections import deque
+from types import SimpleNamespace
+from typing import Callable, Dict, List, Optional
+from unittest.mock import patch
+
+# The consumer reads its settings on import but never touches the database
+os.environ.setdefault("DATABASE_URL", "postgresql://localhost/unused")
+
+from telegram import Bot
+
+from app.queue.consumer import TelegramConsumer
+from app.queue.message_types import Message, MessageType
+
+from .fake_telegram import FakeTelegramServer
+from .stats import latency_summary, report
+
+BENCH_TOKEN = "123456:bench"
+
+class InMemoryChannel:
+    """
+    Just enough of pika's `BlockingChannel` for the consumer: messages are
+    delivered one at a time from a deque, and acks/nacks are timed.
+    """
+
+    def __init__(self):
+        self.is_closed = False
+        self.prefetch_count = None
+        self._queue = deque()  # (scheduled publish time offset, body, properties)
+        self._callback: Optional[Callable] = None
+        self._next_tag = 0
+        self._published_at: Dict[int, float] = {}
+        self._delivered_at: Dict[int, float] = {}
+
+        self.delivery_latencies: List[float] = []
+        self.processing_latencies: List[float] = []
+        self.acked = 0
+        self.dropped = 0
+        self.requeued = 0
+
+    def publish(self, body: bytes, offset: float = 0.0, headers: Optional[Dict] = None):
+        """Queue a message to be published `offset` seconds after consuming starts"""
+        self._queue.append((offset, body, SimpleNamespace(headers=headers or {})))
+
+    def queue_declare(self, queue: str, durable: bool = False, passive: bool = False):
+        return SimpleNamespace(method=SimpleNamespace(message_count=len(self._queue)))
+
+    def basic_qos(self, prefetch_count: int):
+        self.prefetch_count = prefetch_count
+
+    def basic_consume(self, queue: str, on_message_callback: Callable):
+        self._callback = on_message_callback
+
+    def start_consuming(self):
+        start = time.perf_counter()
+        while self._queue:
+            offset, body, properties = self._queue.popleft()
+            # Messages published later in the run aren't available yet
+            wait = start + offset - time.perf_counter()
+            if wait > 0:
+                time.sleep(wait)
+
+            self._next_tag += 1
+            tag = self._next_tag
+            self._published_at[tag] = start + offset
+            self._delivered_at[tag] = time.perf_counter()
+            self._callback(self, SimpleNamespace(delivery_tag=tag), properties, body)
+
+    def _settle(self, delivery_tag: int):
+        now = time.perf_counter()
+        self.delivery_latencies.append(now - self._published_at.pop(delivery_tag))
+        self.processing_latencies.append(now - self._delivered_at.pop(delivery_tag))
+
+    def basic_ack(self, delivery_tag: int):
+        self.acked += 1
+        self._settle(delivery_tag)
+
+    def basic_nack(self, delivery_tag: int, requeue: bool = True):
+        if requeue:
+            self.requeued += 1
+        else:
+            self.dropped += 1
+        self._settle(delivery_tag)
+
+    def close(self):
+        self.is_closed = True
+
+def build_default_consumer(channel: InMemoryChannel, bot_base_url: str) -> TelegramConsumer:
+    """The current blocking, one-message-at-a-time `TelegramConsumer`"""
+    connection = SimpleNamespace(channel=lambda: channel, is_closed=False, close=lambda: None)
+    with patch("app.queue.consumer.get_rabbitmq_connection", return_value=connection):
+        consumer = TelegramConsumer(BENCH_TOKEN)
+    consumer.bot = Bot(BENCH_TOKEN, base_url=bot_base_url)
+    return consumer
+
+CONSUMER_MODES: Dict[str, Callable[[InMemoryChannel, str], object]] = {
+    "default": build_default_consumer,
+}
+
+def make_messages(count: int, seed: int) -> List[bytes]:
+    rng = random.Random(seed)
+    samples = [
+        (MessageType.HOMEWORK_ASSIGNED, {"title": "Salsa basics", "description": "Practice the basic step"}),
+        (MessageType.SUBMISSION_RECEIVED, {
+            "student_name": "bench_student", "homework_title": "Salsa basics",
+            "submission_id": "sub_bench", "content_preview": "Recorded the full routine"
+        }),
+        (MessageType.FEEDBACK_PROVIDED, {
+            "homework_title": "Salsa basics", "feedback_id": "fb_bench",
+            "content_preview": "Good timing", "teacher_name": "bench_teacher"
+        }),
+    ]
+    messages = []
+    for _ in range(count):
+        msg_type, data = rng.choice(samples)
+        message = Message(type=msg_type, recipient_id=rng.randint(10**8, 10**9), data=data)
+        messages.append(json.dumps(message.to_dict()).encode())
+    return messages
+
+def run_mode(mode: str, args) -> Dict:
+    server = FakeTelegramServer(
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        rate_limit_ratio=args.rate_limit_ratio,
+        retry_after=args.retry_after,
+        seed=args.seed
+    ).start()
+    channel = InMemoryChannel()
+    for i, body in enumerate(make_messages(args.messages, args.seed)):
+        channel.publish(body, offset=i / args.publish_rate if args.publish_rate else 0.0)
+
+    consumer = CONSUMER_MODES[mode](channel, server.base_url)
+    try:
+        start = time.perf_counter()
+        consumer.start_consuming()
+        elapsed = time.perf_counter() - start
+    finally:
+        server.stop()
+
+    return {
+        "messages": args.messages,
+        "delivered": channel.acked,
+        "dropped": channel.dropped,
+        "requeued": channel.requeued,
+        "telegram_calls": server.received,
+        "rate_limited": server.rate_limited,
+        "messages_per_s": round(channel.acked / elapsed, 1) if elapsed else 0.0,
+        "delivery": latency_summary(channel.delivery_latencies),
+        "processing": latency_summary(channel.processing_latencies)
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--modes", nargs="+", choices=list(CONSUMER_MODES), default=list(CONSUMER_MODES))
+    parser.add_argument("--messages", type=int, default=2000)
+    parser.add_argument("--publish-rate", type=float, default=0.0,
+                        help="Messages published per second (0 = all queued up front)")
+    parser.add_argument("--latency-ms", type=float, default=50.0, help="Fake Telegram response time")
+    parser.add_argument("--jitter-ms", type=float, default=10.0)
+    parser.add_argument("--rate-limit-ratio", type=float, default=0.0, help="Share of calls answered with 429")
+    parser.add_argument("--retry-after", type=int, default=1)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--json", help="Write results to this file")
+    args = parser.parse_args()
+
+    results = {mode: run_mode(mode, args) for mode in args.modes}
+    report(results, {
+        "messages": args.messages,
+        "publish_rate": args.publish_rate,
+        "latency_ms": args.latency_ms,
+        "jitter_ms": args.jitter_ms,
+        "rate_limit_ratio": args.rate_limit_ratio,
+        "seed": args.seed
+    }, args.json)
+
+if __name__ == "__main__":
+    main()
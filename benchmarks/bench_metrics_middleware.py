@@ -0,0 +1,105 @@
+"""
+Per-request overhead of the HTTP metrics middleware.
+
+Drives a minimal FastAPI app directly through ASGI (no network, no database)
+with three setups and reports the mean time per request:
+1. no metrics middleware (baseline)
+2. the previous `@app.middleware("http")` implementation (BaseHTTPMiddleware)
+3. the pure ASGI `MetricsMiddleware`
+
+Usage:
+    python -m benchmarks.bench_metrics_middleware [--requests N] [--json PATH]
+"""
+
+import argparse
+import asyncio
+import json
+import time
+
+from fastapi import FastAPI
+
+from app.core.metrics import MetricsMiddleware, REQUEST_COUNT, REQUEST_LATENCY
+
+def build_app(mode: str) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/users/{user_id}")
+    def get_user(user_id: str):
+        return {"id": user_id}
+
+    if mode == "base_http":
+        @app.middleware("http")
+        async def metrics_middleware(request, call_next):
+            start_time = time.time()
+            response = await call_next(request)
+            duration = time.time() - start_time
+            REQUEST_COUNT.labels(
+                method=request.method,
+                endpoint=request.url.path,
+                status_code=response.status_code
+            ).inc()
+            REQUEST_LATENCY.labels(
+                method=request.method,
+                endpoint=request.url.path
+            ).observe(duration)
+            return response
+    elif mode == "asgi":
+        app.add_middleware(MetricsMiddleware)
+
+    return app
+
+async def run(app: FastAPI, requests: int) -> float:
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        pass
+
+    def scope(i: int) -> dict:
+        return {
+            "type": "http",
+            "asgi": {"version": "3.0"},
+            "http_version": "1.1",
+            "method": "GET",
+            "scheme": "http",
+            "path": f"/users/usr_{i}",
+            "raw_path": f"/users/usr_{i}".encode(),
+            "root_path": "",
+            "query_string": b"",
+            "headers": [],
+            "server": ("bench", 80),
+            "client": ("bench", 1234),
+        }
+
+    # Warm up (route compilation, first-time label creation)
+    for i in range(200):
+        await app(scope(i), receive, send)
+
+    start = time.perf_counter()
+    for i in range(requests):
+        await app(scope(i), receive, send)
+    return (time.perf_counter() - start) / requests
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=20000)
+    parser.add_argument("--json", help="Write results to this file")
+    args = parser.parse_args()
+
+    results = {}
+    for mode in ["none", "base_http", "asgi"]:
+        per_request = asyncio.run(run(build_app(mode), args.requests))
+        results[mode] = {"us_per_request": round(per_request * 1e6, 2)}
+
+    for mode in ["base_http", "asgi"]:
+        results[mode]["overhead_us"] = round(
+            results[mode]["us_per_request"] - results["none"]["us_per_request"], 2
+        )
+
+    print(json.dumps(results, indent=2))
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+if __name__ == "__main__":
+    main()
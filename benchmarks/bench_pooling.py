@@ -0,0 +1,196 @@
+"""
+Postgres server connections against throughput, with one pool per process.
+
+Each scenario starts `--processes` worker processes that build the app's
+engine (`app.db.base.get_engine`) from the scenario's DB_* settings, and
+runs `--threads` concurrent requests per process for `--duration` seconds.
+A request holds a session the way the API does: a read session without a
+transaction, or for `--write-ratio` of them a transaction. It runs two
+statements of `--query-ms` with `--app-ms` of application work in between.
+Server connections to the database are sampled from `pg_stat_activity`
+every 50 ms.
+
+Scenarios:
+1. `direct-<n>` - straight to Postgres with a pool of n and no overflow per
+   process, for each of `--pool-sizes`
+2. `pgbouncer-nullpool`, `pgbouncer-pool-2` - through `--pooler-url`, a
+   PgBouncer in transaction mode (`docker-compose --profile pgbouncer`)
+
+Usage:
+    python -m benchmarks.bench_pooling --database-url postgresql://...
+        [--pooler-url postgresql://...:6432/...] [--processes 4] [--threads 16]
+        [--pool-sizes 1 4 16] [--duration 10] [--json results.json]
+"""
+
+import argparse
+import json
+import os
+import random
+import subprocess
+import sys
+import threading
+import time
+from typing import Dict, List, NamedTuple, Optional
+
+from sqlalchemy import create_engine, text
+
+from .stats import summarize, report
+
+SAMPLE_INTERVAL = 0.05
+
+SERVER_CONNECTIONS = text("""
+    SELECT count(*) FROM pg_stat_activity
+    WHERE datname = current_database() AND backend_type = 'client backend' AND pid <> pg_backend_pid()
+""")
+
+class Scenario(NamedTuple):
+    name: str
+    url: str
+    pooler: str
+    pool_size: int
+
+def scenarios(args) -> List[Scenario]:
+    result = [Scenario(f"direct-{size}", args.database_url, "none", size) for size in args.pool_sizes]
+    if args.pooler_url:
+        result += [
+            Scenario("pgbouncer-nullpool", args.pooler_url, "pgbouncer", 0),
+            Scenario("pgbouncer-pool-2", args.pooler_url, "pgbouncer", 2)
+        ]
+    return result
+
+def worker(args):
+    """One process of a scenario: waits for `go` on stdin, prints its latencies as JSON"""
+    from app.db.base import _read_session, _session, get_engine
+
+    engine = get_engine()
+    statement = text("SELECT pg_sleep(:seconds)").bindparams(seconds=args.query_ms / 1000)
+    latencies: List[float] = []
+    errors = [0]
+
+    def run(thread_id: int, deadline: float):
+        rng = random.Random(args.seed * 1000 + thread_id)
+        while time.perf_counter() < deadline:
+            session_factory = _session if rng.random() < args.write_ratio else _read_session
+            start_time = time.perf_counter()
+            try:
+                for session in session_factory(engine):
+                    session.exec(statement)
+                    time.sleep(args.app_ms / 1000)
+                    session.exec(statement)
+            except Exception:
+                errors[0] += 1
+                continue
+            latencies.append(time.perf_counter() - start_time)
+
+    print("ready", flush=True)
+    sys.stdin.readline()
+    start = time.perf_counter()
+    threads = [
+        threading.Thread(target=run, args=(n, start + args.duration)) for n in range(args.threads)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    print(json.dumps({"latencies": latencies, "errors": errors[0], "elapsed": time.perf_counter() - start}))
+
+def sample_connections(database_url: str, until: float, samples: List[int]):
+    engine = create_engine(database_url, isolation_level="AUTOCOMMIT")
+    try:
+        # Autocommit, so pg_stat_activity isn't frozen at the first sample
+        with engine.connect() as connection:
+            while time.perf_counter() < until:
+                samples.append(connection.execute(SERVER_CONNECTIONS).scalar())
+                time.sleep(SAMPLE_INTERVAL)
+    finally:
+        engine.dispose()
+
+def run_scenario(args, scenario: Scenario) -> Dict:
+    env = {
+        **os.environ,
+        "DATABASE_URL": scenario.url,
+        "DB_POOLER": scenario.pooler,
+        "DB_POOL_SIZE": str(scenario.pool_size),
+        "DB_MAX_OVERFLOW": "0"
+    }
+    command = [
+        sys.executable, "-m", "benchmarks.bench_pooling", "--worker",
+        "--threads", str(args.threads),
+        "--duration", str(args.duration),
+        "--query-ms", str(args.query_ms),
+        "--app-ms", str(args.app_ms),
+        "--write-ratio", str(args.write_ratio),
+        "--seed", str(args.seed)
+    ]
+    workers = [
+        subprocess.Popen(command, env=env, stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True)
+        for _ in range(args.processes)
+    ]
+    # Start everyone together, once the imports are done
+    for process in workers:
+        process.stdout.readline()
+    samples: List[int] = []
+    sampler = threading.Thread(
+        target=sample_connections,
+        args=(args.database_url, time.perf_counter() + args.duration, samples)
+    )
+    for process in workers:
+        process.stdin.write("go\n")
+        process.stdin.flush()
+    sampler.start()
+
+    outputs = [json.loads(process.communicate()[0]) for process in workers]
+    sampler.join()
+
+    latencies = [latency for output in outputs for latency in output["latencies"]]
+    elapsed = max(output["elapsed"] for output in outputs)
+    return {
+        **summarize(latencies, elapsed, sum(output["errors"] for output in outputs)),
+        "local_pool_capacity": args.processes * scenario.pool_size if scenario.pool_size else None,
+        "server_connections_max": max(samples, default=0),
+        "server_connections_mean": round(sum(samples) / len(samples), 1) if samples else 0.0
+    }
+
+def max_connections(database_url: str) -> Optional[int]:
+    engine = create_engine(database_url)
+    try:
+        with engine.connect() as connection:
+            return int(connection.execute(text("SHOW max_connections")).scalar())
+    finally:
+        engine.dispose()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--database-url", default=os.getenv("DATABASE_URL"))
+    parser.add_argument("--pooler-url", help="The same database through PgBouncer in transaction mode")
+    parser.add_argument("--processes", type=int, default=4)
+    parser.add_argument("--threads", type=int, default=16, help="Concurrent requests per process")
+    parser.add_argument("--pool-sizes", type=int, nargs="+", default=[1, 4, 16])
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds per scenario")
+    parser.add_argument("--query-ms", type=float, default=2.0, help="Server time per statement")
+    parser.add_argument("--app-ms", type=float, default=5.0, help="Application time between statements")
+    parser.add_argument("--write-ratio", type=float, default=0.2)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--json", help="Write results to this file")
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        return worker(args)
+    if not args.database_url:
+        parser.error("--database-url or DATABASE_URL is required")
+
+    results = {scenario.name: run_scenario(args, scenario) for scenario in scenarios(args)}
+    report(results, {
+        "processes": args.processes,
+        "threads": args.threads,
+        "duration": args.duration,
+        "query_ms": args.query_ms,
+        "app_ms": args.app_ms,
+        "write_ratio": args.write_ratio,
+        "max_connections": max_connections(args.database_url),
+        "seed": args.seed
+    }, args.json)
+
+if __name__ == "__main__":
+    main()
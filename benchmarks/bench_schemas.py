@@ -0,0 +1,111 @@
+"""
+Request/response model CPU cost of the create endpoints, without the database.
+
+For each create endpoint, replays what FastAPI and the endpoint do with the
+body and the created row: parse and validate the JSON body, build the row,
+then validate and serialize the response model. `table` uses the SQLModel
+table classes as body and response models and builds an ORM instance (the
+old behaviour); `slim` uses the `*Create`/`*Read` schemas and builds the row
+as plain column values, as `insert_row` does. Reports CPU time per request;
+the INSERT itself (ORM flush vs. Core insert) is not included.
+
+Usage:
+    python -m benchmarks.bench_schemas [--modes table slim] [--iterations 20000] [--json PATH]
+"""
+
+import argparse
+import json
+import time
+from typing import Callable, Dict, NamedTuple, Type
+
+from pydantic import TypeAdapter
+from sqlmodel import SQLModel
+
+from app.schemas.feedback import Feedback, FeedbackCreate, FeedbackRead
+from app.schemas.homework import HomeworkTask, HomeworkTaskCreate, HomeworkTaskRead
+from app.schemas.submission import Submission, SubmissionCreate, SubmissionRead
+from app.schemas.user import User, UserCreate, UserRead
+
+from .stats import report
+
+class Endpoint(NamedTuple):
+    table: Type[SQLModel]
+    create: Type[SQLModel]
+    read: Type[SQLModel]
+    body: Dict
+
+ENDPOINTS: Dict[str, Endpoint] = {
+    "create_user": Endpoint(User, UserCreate, UserRead, {
+        "tg_handle": "bench_student", "telegram_id": 9000000001, "role": "student", "meta": {}
+    }),
+    "assign_homework": Endpoint(HomeworkTask, HomeworkTaskCreate, HomeworkTaskRead, {
+        "teacher_id": "usr_teacher",
+        "student_ids": [f"usr_student_{i}" for i in range(30)],
+        "content": {"title": "Salsa basics", "description": "Practice the basic step"},
+        "status": "pending"
+    }),
+    "create_submission": Endpoint(Submission, SubmissionCreate, SubmissionRead, {
+        "homework_task_id": "hw_bench", "student_id": "usr_student", "teacher_id": "usr_teacher",
+        "content": {"text": "Recorded the full routine"}, "status": "pending"
+    }),
+    "create_feedback": Endpoint(Feedback, FeedbackCreate, FeedbackRead, {
+        "submission_id": "sub_bench", "student_id": "usr_student", "teacher_id": "usr_teacher",
+        "content": {"text": "Good timing"}, "status": "completed"
+    }),
+}
+
+def table_handler(endpoint: Endpoint) -> Callable[[bytes], bytes]:
+    model = TypeAdapter(endpoint.table)
+
+    def handle(body: bytes) -> bytes:
+        row = model.validate_python(json.loads(body))
+        return model.dump_json(model.validate_python(row))
+    return handle
+
+def slim_handler(endpoint: Endpoint) -> Callable[[bytes], bytes]:
+    create = TypeAdapter(endpoint.create)
+    read = TypeAdapter(endpoint.read)
+
+    def handle(body: bytes) -> bytes:
+        # What `insert_row` does, minus the INSERT itself
+        row = read.validate_python(endpoint.table.new_row(create.validate_python(json.loads(body))))
+        return read.dump_json(read.validate_python(row))
+    return handle
+
+MODES: Dict[str, Callable[[Endpoint], Callable[[bytes], bytes]]] = {
+    "table": table_handler,
+    "slim": slim_handler,
+}
+
+def measure(handle: Callable[[bytes], bytes], body: bytes, iterations: int) -> Dict:
+    for _ in range(min(1000, iterations)):
+        handle(body)
+    start = time.process_time()
+    for _ in range(iterations):
+        handle(body)
+    cpu = time.process_time() - start
+    return {"cpu_us_per_req": round(cpu / iterations * 1_000_000, 2)}
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--modes", nargs="+", choices=list(MODES), default=list(MODES))
+    parser.add_argument("--endpoints", nargs="+", choices=list(ENDPOINTS), default=list(ENDPOINTS))
+    parser.add_argument("--iterations", type=int, default=20000)
+    parser.add_argument("--json", help="Write results to this file")
+    args = parser.parse_args()
+
+    results = {
+        mode: {
+            name: measure(
+                MODES[mode](ENDPOINTS[name]),
+                json.dumps(ENDPOINTS[name].body).encode(),
+                args.iterations
+            )
+            for name in args.endpoints
+        }
+        for mode in args.modes
+    }
+    report(results, {"endpoints": args.endpoints, "iterations": args.iterations}, args.json)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""
+API cold start: interpreter, `import app.main` and the lifespan startup.
+
+Each run starts a fresh Python process that imports the app and runs its
+lifespan startup against `--database-url`, the way uvicorn does before it
+accepts connections. Reports each phase over `--runs` runs. `--top N` adds
+the N slowest packages from `python -X importtime` of one more run.
+
+Usage:
+    python -m benchmarks.bench_startup --database-url postgresql://... [--runs 10] [--top 15] [--json PATH]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import re
+import subprocess
+import sys
+import time
+from typing import Dict, List
+
+from .stats import latency_summary, report
+
+# `import time: self [us] | cumulative | imported package`
+_IMPORT_TIME = re.compile(r"import time:\s+(\d+) \|\s+\d+ \|\s*(\S+)")
+
+def worker():
+    """One cold start, printing the duration of each phase in seconds as JSON"""
+    start = time.perf_counter()
+    from app.main import app
+    imported = time.perf_counter()
+
+    async def startup():
+        async with app.router.lifespan_context(app):
+            started = time.perf_counter()
+        return started
+
+    started = asyncio.run(startup())
+    print(json.dumps({"import": imported - start, "lifespan": started - imported}))
+
+def cold_start(env: Dict[str, str]) -> Dict[str, float]:
+    start = time.perf_counter()
+    output = subprocess.run(
+        [sys.executable, "-m", "benchmarks.bench_startup", "--worker"],
+        env=env, capture_output=True, text=True, check=True
+    ).stdout
+    phases = json.loads(output.splitlines()[-1])
+    # Includes the interpreter itself, up to the end of the lifespan startup
+    phases["total"] = time.perf_counter() - start
+    return phases
+
+def slowest_imports(env: Dict[str, str], top: int) -> List[Dict]:
+    """Top-level packages by the import time of their own modules"""
+    stderr = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import app.main"],
+        env=env, capture_output=True, text=True, check=True
+    ).stderr
+    packages: Dict[str, int] = {}
+    for line in stderr.splitlines():
+        match = _IMPORT_TIME.match(line)
+        if match:
+            name = match.group(2).split(".")[0]
+            packages[name] = packages.get(name, 0) + int(match.group(1))
+    ranked = sorted(packages.items(), key=lambda item: item[1], reverse=True)[:top]
+    return [{"package": name, "self_ms": round(us / 1000, 1)} for name, us in ranked]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--database-url", default=os.getenv("DATABASE_URL"))
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--top", type=int, default=0, help="Also report the N slowest imports")
+    parser.add_argument("--json", help="Write results to this file")
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        return worker()
+    if not args.database_url:
+        parser.error("--database-url or DATABASE_URL is required")
+
+    env = {**os.environ, "DATABASE_URL": args.database_url}
+    runs = [cold_start(env) for _ in range(args.runs)]
+    results = {
+        phase: latency_summary([run[phase] for run in runs])
+        for phase in ("import", "lifespan", "total")
+    }
+    if args.top:
+        results["slowest_imports"] = slowest_imports(env, args.top)
+    report(results, {
+        "runs": args.runs,
+        "rabbitmq_host": os.getenv("RABBITMQ_HOST", "localhost")
+    }, args.json)
+
+if __name__ == "__main__":
+    main()
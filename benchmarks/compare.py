@@ -0,0 +1,54 @@
+"""
+Compare two benchmark JSON reports (e.g. before and after a change).
+
+Prints every metric present in both reports with its relative change.
+Latency increases and throughput drops beyond `--threshold` are marked
+as regressions.
+
+Usage:
+    python -m benchmarks.compare baseline.json candidate.json [--threshold 0.1]
+"""
+
+import argparse
+import json
+from typing import Dict, Iterator, Tuple
+
+# Metrics where a bigger value is better; for everything else smaller is better
+HIGHER_IS_BETTER = {"req_per_s", "messages_per_s", "updates_per_s"}
+
+def flatten(results: Dict, prefix: str = "") -> Iterator[Tuple[str, float]]:
+    for key, value in results.items():
+        path = f"{prefix}.{key}" if prefix else key
+        if isinstance(value, dict):
+            yield from flatten(value, path)
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            yield path, value
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("baseline")
+    parser.add_argument("candidate")
+    parser.add_argument("--threshold", type=float, default=0.1, help="Relative change flagged as a regression")
+    args = parser.parse_args()
+
+    with open(args.baseline) as f:
+        baseline = dict(flatten(json.load(f)["results"]))
+    with open(args.candidate) as f:
+        candidate = dict(flatten(json.load(f)["results"]))
+
+    regressions = 0
+    for path in sorted(baseline.keys() & candidate.keys()):
+        before, after = baseline[path], candidate[path]
+        change = (after - before) / before if before else 0.0
+        metric = path.rsplit(".", 1)[-1]
+        worse = -change if metric in HIGHER_IS_BETTER else change
+        flag = ""
+        if metric.endswith(("_ms", "_per_s", "_per_req")) and worse > args.threshold:
+            flag = "  <-- regression"
+            regressions += 1
+        print(f"{path:60} {before:>12} {after:>12} {change:>+8.1%}{flag}")
+
+    print(f"\n{regressions} regression(s) above {args.threshold:.0%}")
+
+if __name__ == "__main__":
+    main()
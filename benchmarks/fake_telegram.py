@@ -0,0 +1,105 @@
+"""
+A local stand-in for the Telegram Bot API, for benchmarks.
+
+Answers `sendMessage` after a configurable latency and rejects a configurable
+share of calls with 429 Too Many Requests, the way Telegram throttles bots.
+Point a `telegram.Bot` at it with `Bot(token, base_url=server.base_url)`.
+"""
+
+import asyncio
+import random
+import socket
+import threading
+import time
+from typing import Dict
+
+import uvicorn
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+
+class FakeTelegramServer:
+    def __init__(
+        self,
+        latency_ms: float = 50.0,
+        jitter_ms: float = 10.0,
+        rate_limit_ratio: float = 0.0,
+        retry_after: int = 1,
+        seed: int = 42
+    ):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.rate_limit_ratio = rate_limit_ratio
+        self.retry_after = retry_after
+        self.rng = random.Random(seed)
+
+        self.received = 0
+        self.rate_limited = 0
+        self.port = self._free_port()
+        self._message_id = 0
+        self._server = None
+        self._thread = None
+
+    @staticmethod
+    def _free_port() -> int:
+        with socket.socket() as sock:
+            sock.bind(("127.0.0.1", 0))
+            return sock.getsockname()[1]
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self.port}/bot"
+
+    async def _parameters(self, request: Request) -> Dict:
+        if request.headers.get("content-type", "").startswith("application/json"):
+            return await request.json()
+        return dict(await request.form())
+
+    async def _handle(self, request: Request) -> JSONResponse:
+        self.received += 1
+        parameters = await self._parameters(request)
+
+        delay = max(0.0, self.rng.gauss(self.latency_ms, self.jitter_ms)) / 1000
+        await asyncio.sleep(delay)
+
+        if self.rng.random() < self.rate_limit_ratio:
+            self.rate_limited += 1
+            return JSONResponse({
+                "ok": False,
+                "error_code": 429,
+                "description": f"Too Many Requests: retry after {self.retry_after}",
+                "parameters": {"retry_after": self.retry_after}
+            }, status_code=429)
+
+        method = request.path_params["method"]
+        if method == "getMe":
+            return JSONResponse({"ok": True, "result": {
+                "id": 1, "is_bot": True, "first_name": "Bench", "username": "bench_bot"
+            }})
+
+        self._message_id += 1
+        return JSONResponse({"ok": True, "result": {
+            "message_id": self._message_id,
+            "date": int(time.time()),
+            "chat": {"id": int(parameters.get("chat_id", 0)), "type": "private"},
+            "text": parameters.get("text", "")
+        }})
+
+    def start(self) -> "FakeTelegramServer":
+        app = Starlette(routes=[
+            Route("/bot{token}/{method}", self._handle, methods=["POST", "GET"])
+        ])
+        self._server = uvicorn.Server(uvicorn.Config(
+            app, host="127.0.0.1", port=self.port, log_level="warning"
+        ))
+        self._thread = threading.Thread(target=self._server.run, daemon=True)
+        self._thread.start()
+        while not self._server.started:
+            time.sleep(0.01)
+        return self
+
+    def stop(self):
+        if self._server:
+            self._server.should_exit = True
+            self._thread.join(timeout=5)
@@ -0,0 +1,286 @@
+"""
+API throughput and latency under a scripted workload per router.
+
+Each workload mixes the read and write endpoints of one router in
+`app/api/endpoints` (all but `/debug`, which is off outside development),
+with ids sampled from a database seeded by `benchmarks.seed`. Workloads run
+one after another for `--duration` seconds with `--concurrency` concurrent
+clients, and report req/s and p50/p95/p99 per workload and per operation,
+plus process CPU time per request.
+
+By default the app runs in-process through httpx's ASGI transport against
+`--database-url`, which is good for comparing versions of the code. Pass
+`--base-url` to load a running server instead (the database is then only
+used to sample ids).
+
+Usage:
+    python -m benchmarks.seed --database-url postgresql://... --students 100000 --reset
+    python -m benchmarks.load --database-url postgresql://... [--routers users homework]
+        [--duration 10] [--concurrency 16] [--json results.json]
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import time
+import uuid
+from collections import defaultdict
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple
+
+import httpx
+from sqlalchemy import create_engine, func
+from sqlmodel import Session, select
+
+from app.schemas.feedback import Feedback
+from app.schemas.homework import HomeworkTask
+from app.schemas.submission import Submission
+from app.schemas.user import User, UserRole
+
+from .seed import HANDLE_PREFIX
+from .stats import summarize, report
+
+SAMPLE_SIZE = 2000
+
+# Words from the text `benchmarks.seed` writes, plus one that matches nothing
+SEARCH_TERMS = ["routine", "practice tempo", "posture turns", "timing", "\"full routine\"", "pirouette"]
+
+class Operation(NamedTuple):
+    name: str
+    weight: int
+    # (rng, fixtures) -> (method, url, request kwargs)
+    build: Callable[[random.Random, Dict], Tuple[str, str, Dict]]
+
+def sample_fixtures(database_url: str) -> Dict[str, List]:
+    """Random ids (and the related ids writes need) from the seeded database"""
+    engine = create_engine(database_url)
+    with Session(engine) as session:
+        def sample(statement):
+            return session.exec(statement.order_by(func.random()).limit(SAMPLE_SIZE)).all()
+
+        fixtures = {
+            "teachers": sample(select(User.id).where(User.role == UserRole.TEACHER)),
+            "students": sample(
+                select(User.id, User.telegram_id, User.tg_handle).where(User.role == UserRole.STUDENT)
+            ),
+            "homework": sample(
+                select(HomeworkTask.id, HomeworkTask.teacher_id, HomeworkTask.student_ids)
+            ),
+            "submissions": sample(
+                select(Submission.id, Submission.student_id, Submission.teacher_id)
+            ),
+            "feedback": sample(select(Feedback.id))
+        }
+    engine.dispose()
+
+    empty = [name for name, rows in fixtures.items() if not rows]
+    if empty:
+        raise SystemExit(f"No {', '.join(empty)} in the database, run benchmarks.seed first")
+    return fixtures
+
+def _new_user(rng: random.Random, fixtures: Dict):
+    # Not derived from the seed: handles must stay unique across runs
+    suffix = uuid.uuid4()
+    return "POST", "/users/", {"json": {
+        "tg_handle": f"{HANDLE_PREFIX}load_{suffix.hex[:16]}",
+        "telegram_id": 10**12 + suffix.int % 10**12,
+        "role": UserRole.STUDENT.value
+    }}
+
+def _assign_homework(rng: random.Random, fixtures: Dict):
+    students = rng.sample(fixtures["students"], min(5, len(fixtures["students"])))
+    return "POST", "/homework/assign/", {"json": {
+        "teacher_id": rng.choice(fixtures["teachers"]),
+        "student_ids": [student.id for student in students],
+        "content": {"title": "Load test routine", "description": "Generated by benchmarks.load"}
+    }}
+
+def _submit(rng: random.Random, fixtures: Dict):
+    homework = rng.choice(fixtures["homework"])
+    return "POST", "/submissions/", {"json": {
+        "homework_task_id": homework.id,
+        "student_id": rng.choice(homework.student_ids),
+        "teacher_id": homework.teacher_id,
+        "content": {"text": "Load test submission"}
+    }}
+
+def _give_feedback(rng: random.Random, fixtures: Dict):
+    submission = rng.choice(fixtures["submissions"])
+    return "POST", "/feedback/", {"json": {
+        "submission_id": submission.id,
+        "student_id": submission.student_id,
+        "teacher_id": submission.teacher_id,
+        "content": {"text": "Load test feedback"}
+    }}
+
+def _search(rng: random.Random, fixtures: Dict):
+    scope = rng.choice(["teacher_id", "student_id"])
+    user_id = rng.choice(fixtures["teachers"]) if scope == "teacher_id" else rng.choice(fixtures["students"]).id
+    return "GET", "/search/", {"params": {"q": rng.choice(SEARCH_TERMS), scope: user_id}}
+
+def _search_users(rng: random.Random, fixtures: Dict):
+    handle = rng.choice(fixtures["students"]).tg_handle
+    # A distinctive fragment, a vague one that matches most handles, and a typo
+    q = rng.choice([handle[-8:], handle[len(HANDLE_PREFIX):len(HANDLE_PREFIX) + 3], handle[:-2] + handle[-1]])
+    return "GET", "/users/search", {"params": {"q": q}}
+
+def _get(url: Callable[[random.Random, Dict], str], **params) -> Callable:
+    return lambda rng, fixtures: ("GET", url(rng, fixtures), {"params": params} if params else {})
+
+WORKLOADS: Dict[str, List[Operation]] = {
+    "users": [
+        Operation("get_by_id", 35, _get(lambda rng, f: f"/users/{rng.choice(f['students']).id}")),
+        Operation("get_by_telegram_id", 20, _get(
+            lambda rng, f: f"/users/by_telegram_id/{rng.choice(f['students']).telegram_id}"
+        )),
+        Operation("get_by_telegram_handle", 15, _get(
+            lambda rng, f: f"/users/by_telegram_handle/{rng.choice(f['students']).tg_handle}"
+        )),
+        Operation("list_students", 10, _get(lambda rng, f: "/users/students/", limit=100)),
+        Operation("list_teachers", 5, _get(lambda rng, f: "/users/teachers/", limit=100)),
+        Operation("search", 10, _search_users),
+        Operation("create", 5, _new_user),
+    ],
+    "homework": [
+        Operation("get_by_id", 40, _get(lambda rng, f: f"/homework/{rng.choice(f['homework']).id}")),
+        Operation("list_for_student", 30, _get(
+            lambda rng, f: f"/homework/student/{rng.choice(f['students']).id}"
+        )),
+        Operation("list_for_teacher", 20, _get(
+            lambda rng, f: f"/homework/teacher/{rng.choice(f['teachers'])}"
+        )),
+        Operation("assign", 10, _assign_homework),
+    ],
+    "submissions": [
+        Operation("get_by_id", 40, _get(
+            lambda rng, f: f"/submissions/{rng.choice(f['submissions']).id}"
+        )),
+        Operation("list_for_student", 25, _get(
+            lambda rng, f: f"/submissions/student/{rng.choice(f['students']).id}"
+        )),
+        Operation("list_for_teacher", 25, _get(
+            lambda rng, f: f"/submissions/teacher/{rng.choice(f['teachers'])}"
+        )),
+        Operation("create", 10, _submit),
+    ],
+    "feedback": [
+        Operation("get_by_id", 45, _get(lambda rng, f: f"/feedback/{rng.choice(f['feedback'])}")),
+        Operation("list_for_submission", 45, _get(
+            lambda rng, f: f"/feedback/submission/{rng.choice(f['submissions']).id}"
+        )),
+        Operation("create", 10, _give_feedback),
+    ],
+    "teachers": [
+        Operation("stats", 60, _get(lambda rng, f: f"/teachers/{rng.choice(f['teachers'])}/stats")),
+        Operation("progress_matrix", 40, _get(
+            lambda rng, f: f"/teachers/{rng.choice(f['teachers'])}/progress-matrix"
+        )),
+    ],
+    "search": [
+        Operation("search", 100, _search),
+    ],
+}
+
+async def run_workload(
+    client: httpx.AsyncClient,
+    operations: List[Operation],
+    fixtures: Dict,
+    duration: float,
+    concurrency: int,
+    seed: int
+) -> Dict:
+    latencies: Dict[str, List[float]] = defaultdict(list)
+    errors: Dict[str, int] = defaultdict(int)
+    weights = [operation.weight for operation in operations]
+    deadline = time.perf_counter() + duration
+
+    async def worker(worker_id: int):
+        rng = random.Random(seed * 1000 + worker_id)
+        while time.perf_counter() < deadline:
+            operation = rng.choices(operations, weights)[0]
+            method, url, kwargs = operation.build(rng, fixtures)
+            start_time = time.perf_counter()
+            try:
+                response = await client.request(method, url, **kwargs)
+                failed = response.status_code >= 400
+            except httpx.HTTPError:
+                failed = True
+            if failed:
+                errors[operation.name] += 1
+            else:
+                latencies[operation.name].append(time.perf_counter() - start_time)
+
+    start = time.perf_counter()
+    cpu_start = time.process_time()
+    await asyncio.gather(*(worker(i) for i in range(concurrency)))
+    cpu = time.process_time() - cpu_start
+    elapsed = time.perf_counter() - start
+
+    all_latencies = [latency for values in latencies.values() for latency in values]
+    results = {
+        "all": {
+            **summarize(all_latencies, elapsed, sum(errors.values())),
+            # Process CPU (client and, in-process, the app) per completed request
+            "cpu_ms_per_req": round(cpu / len(all_latencies) * 1000, 3) if all_latencies else 0.0
+        }
+    }
+    for operation in operations:
+        results[operation.name] = summarize(
+            latencies[operation.name], elapsed, errors[operation.name]
+        )
+    return results
+
+def build_client(database_url: str, base_url: Optional[str], timeout: float) -> httpx.AsyncClient:
+    if base_url:
+        return httpx.AsyncClient(base_url=base_url, timeout=timeout)
+
+    # The app reads its database from the environment when first imported
+    os.environ["DATABASE_URL"] = database_url
+    from app.main import app
+    return httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=app),
+        base_url="http://bench",
+        timeout=timeout
+    )
+
+async def run(args) -> Dict:
+    fixtures = sample_fixtures(args.database_url)
+    client = build_client(args.database_url, args.base_url, args.timeout)
+    results = {}
+    try:
+        for router in args.routers:
+            # Short warm-up so connection pool setup and first-time imports don't skew p99
+            await run_workload(client, WORKLOADS[router], fixtures, 1, args.concurrency, args.seed)
+            results[router] = await run_workload(
+                client, WORKLOADS[router], fixtures, args.duration, args.concurrency, args.seed
+            )
+    finally:
+        await client.aclose()
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--database-url", default=os.getenv("DATABASE_URL"))
+    parser.add_argument("--base-url", help="Load a running server instead of the in-process app")
+    parser.add_argument("--routers", nargs="+", choices=list(WORKLOADS), default=list(WORKLOADS))
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds per workload")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--timeout", type=float, default=30.0)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--json", help="Write results to this file")
+    args = parser.parse_args()
+
+    if not args.database_url:
+        parser.error("--database-url or DATABASE_URL is required")
+
+    results = asyncio.run(run(args))
+    report(results, {
+        "mode": "server" if args.base_url else "in-process",
+        "routers": args.routers,
+        "duration": args.duration,
+        "concurrency": args.concurrency,
+        "seed": args.seed
+    }, args.json)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,225 @@
+"""
+Seeded synthetic data for the API benchmarks.
+
+Generates teachers, students, homework (each assigned to a random subset of
+students via `student_ids`), submissions and feedback, and bulk-inserts them
+in batches. The same `--seed` and scale always produce the same rows, so runs
+against different versions of the code see identical data.
+
+Usage:
+    python -m benchmarks.seed --database-url postgresql://... --students 100000 [--reset]
+"""
+
+import argparse
+import os
+import random
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterator, List
+
+from sqlalchemy import create_engine, insert, text
+from sqlmodel import SQLModel
+
+from app.schemas.base import Status, ulid
+from app.schemas.feedback import Feedback
+from app.schemas.homework import HomeworkTask
+from app.schemas.submission import Submission
+from app.schemas.user import User, UserRole
+
+# Synthetic users use this handle prefix and telegram ids from this offset,
+# so they never collide with real accounts
+HANDLE_PREFIX = "bench_"
+TELEGRAM_ID_OFFSET = 9_000_000_000
+
+def make_id(rng: random.Random, prefix: str, created_at: datetime) -> str:
+    """Same format as `TimeStampedModel` ids, but reproducible"""
+    timestamp_ms = int(created_at.replace(tzinfo=timezone.utc).timestamp() * 1000)
+    return f"{prefix}_{ulid(timestamp_ms, rng.getrandbits(80))}"
+
+class DataGenerator:
+    def __init__(
+        self,
+        students: int = 1000,
+        teachers: int = 20,
+        homework_per_teacher: int = 10,
+        students_per_homework: int = 30,
+        submission_rate: float = 0.6,
+        feedback_rate: float = 0.5,
+        seed: int = 42
+    ):
+        self.students = students
+        self.teachers = teachers
+        self.homework_per_teacher = homework_per_teacher
+        self.students_per_homework = min(students_per_homework, students)
+        self.submission_rate = submission_rate
+        self.feedback_rate = feedback_rate
+        self.rng = random.Random(seed)
+        self.start = datetime(2024, 1, 1)
+
+        self.teacher_ids: List[str] = []
+        self.student_ids: List[str] = []
+
+    def _timestamp(self) -> datetime:
+        return self.start + timedelta(seconds=self.rng.randint(0, 180 * 24 * 3600))
+
+    def users(self) -> Iterator[Dict]:
+        for i in range(self.teachers):
+            created_at = self._timestamp()
+            user_id = make_id(self.rng, "usr", created_at)
+            self.teacher_ids.append(user_id)
+            yield {
+                "id": user_id,
+                "created_at": created_at,
+                "tg_handle": f"{HANDLE_PREFIX}teacher_{i:06d}",
+                "telegram_id": TELEGRAM_ID_OFFSET + i,
+                "role": UserRole.TEACHER,
+                "meta": {}
+            }
+        for i in range(self.students):
+            created_at = self._timestamp()
+            user_id = make_id(self.rng, "usr", created_at)
+            self.student_ids.append(user_id)
+            yield {
+                "id": user_id,
+                "created_at": created_at,
+                "tg_handle": f"{HANDLE_PREFIX}student_{i:06d}",
+                "telegram_id": TELEGRAM_ID_OFFSET + self.teachers + i,
+                "role": UserRole.STUDENT,
+                "meta": {}
+            }
+
+    def coursework(self) -> Iterator[tuple]:
+        """
+        Yield ("homework" | "submission" | "feedback", row) tuples. Must run
+        after `users`, whose ids it references.
+        """
+        for teacher_id in self.teacher_ids:
+            for n in range(self.homework_per_teacher):
+                assigned_at = self._timestamp()
+                homework_id = make_id(self.rng, "hw", assigned_at)
+                assigned = self.rng.sample(self.student_ids, self.students_per_homework)
+                rows = []
+                submitted = completed = 0
+
+                for student_id in assigned:
+                    if self.rng.random() >= self.submission_rate:
+                        continue
+                    submitted_at = assigned_at + timedelta(hours=self.rng.randint(1, 96))
+                    submission_id = make_id(self.rng, "sub", submitted_at)
+                    reviewed = self.rng.random() < self.feedback_rate
+                    submitted += 1
+                    rows.append(("submission", {
+                        "id": submission_id,
+                        "created_at": submitted_at,
+                        "student_id": student_id,
+                        "teacher_id": teacher_id,
+                        "homework_task_id": homework_id,
+                        "content": {"text": "Recorded the full routine", "file_id": None},
+                        "status": Status.COMPLETED if reviewed else Status.PENDING
+                    }))
+                    if reviewed:
+                        completed += 1
+                        reviewed_at = assigned_at + timedelta(hours=self.rng.randint(97, 200))
+                        rows.append(("feedback", {
+                            "id": make_id(self.rng, "fb", reviewed_at),
+                            "created_at": reviewed_at,
+                            "student_id": student_id,
+                            "teacher_id": teacher_id,
+                            "submission_id": submission_id,
+                            "content": {"text": "Good timing, watch your posture in the turns"},
+                            "status": Status.COMPLETED
+                        }))
+
+                yield "homework", {
+                    "id": homework_id,
+                    "created_at": assigned_at,
+                    "teacher_id": teacher_id,
+                    "student_ids": assigned,
+                    "content": {
+                        "title": f"Routine {n} by {teacher_id[-6:]}",
+                        "description": "Practice the combination slowly, then at tempo"
+                    },
+                    "status": Status.PENDING,
+                    "assigned_count": len(assigned),
+                    "submitted_count": submitted,
+                    "completed_count": completed
+                }
+                yield from rows
+
+def seed(engine, generator: DataGenerator, batch_size: int = 5000, reset: bool = False) -> Dict[str, int]:
+    """Insert the generated rows, returning the number of rows per table"""
+    tables = {
+        "user": User.__table__,
+        "homework": HomeworkTask.__table__,
+        "submission": Submission.__table__,
+        "feedback": Feedback.__table__
+    }
+    SQLModel.metadata.create_all(engine)
+    counts = {name: 0 for name in tables}
+    batches = {name: [] for name in tables}
+
+    with engine.begin() as connection:
+        if reset:
+            connection.execute(text(
+                'TRUNCATE feedback, submission, homeworktask, "user" CASCADE'
+            ))
+
+        def flush(name: str):
+            if batches[name]:
+                connection.execute(insert(tables[name]), batches[name])
+                counts[name] += len(batches[name])
+                batches[name] = []
+
+        def flush_all():
+            # Parents before children, so the foreign keys are satisfied
+            for name in tables:
+                flush(name)
+
+        for row in generator.users():
+            batches["user"].append(row)
+            if len(batches["user"]) >= batch_size:
+                flush("user")
+        flush("user")
+
+        for name, row in generator.coursework():
+            batches[name].append(row)
+            if len(batches[name]) >= batch_size:
+                flush_all()
+        flush_all()
+
+        connection.execute(text("ANALYZE"))
+
+    return counts
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--database-url", default=os.getenv("DATABASE_URL"))
+    parser.add_argument("--students", type=int, default=1000)
+    parser.add_argument("--teachers", type=int, default=20)
+    parser.add_argument("--homework-per-teacher", type=int, default=10)
+    parser.add_argument("--students-per-homework", type=int, default=30)
+    parser.add_argument("--submission-rate", type=float, default=0.6)
+    parser.add_argument("--feedback-rate", type=float, default=0.5)
+    parser.add_argument("--batch-size", type=int, default=5000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--reset", action="store_true", help="Empty all tables first")
+    args = parser.parse_args()
+
+    if not args.database_url:
+        parser.error("--database-url or DATABASE_URL is required")
+
+    generator = DataGenerator(
+        students=args.students,
+        teachers=args.teachers,
+        homework_per_teacher=args.homework_per_teacher,
+        students_per_homework=args.students_per_homework,
+        submission_rate=args.submission_rate,
+        feedback_rate=args.feedback_rate,
+        seed=args.seed
+    )
+    start = time.perf_counter()
+    counts = seed(create_engine(args.database_url), generator, args.batch_size, args.reset)
+    print(f"Seeded {counts} in {time.perf_counter() - start:.1f}s")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""
+Latency summaries shared by the benchmarks, so every JSON report has the same shape.
+"""
+
+import json
+import platform
+import subprocess
+from datetime import datetime
+from typing import Dict, List, Optional, Sequence
+
+def percentile(sorted_values: Sequence[float], fraction: float) -> float:
+    """Nearest-rank percentile of already sorted values"""
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, round(fraction * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+def latency_summary(latencies: List[float]) -> Dict:
+    """Mean, p50/p95/p99 and max of latencies given in seconds, in milliseconds"""
+    values = sorted(latencies)
+    count = len(values)
+    return {
+        "mean_ms": round(sum(values) / count * 1000, 3) if count else 0.0,
+        "p50_ms": round(percentile(values, 0.50) * 1000, 3),
+        "p95_ms": round(percentile(values, 0.95) * 1000, 3),
+        "p99_ms": round(percentile(values, 0.99) * 1000, 3),
+        "max_ms": round(values[-1] * 1000, 3) if count else 0.0
+    }
+
+def summarize(latencies: List[float], elapsed: float, errors: int = 0) -> Dict:
+    """
+    Summarize per-operation latencies (seconds) measured over `elapsed`
+    seconds of wall time. Latencies are reported in milliseconds.
+    """
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "req_per_s": round(len(latencies) / elapsed, 1) if elapsed else 0.0,
+        **latency_summary(latencies)
+    }
+
+def git_revision() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def report(results: Dict, parameters: Dict, path: Optional[str] = None) -> Dict:
+    """Print results with run metadata as JSON, and write them to `path` if given"""
+    output = {
+        "meta": {
+            "revision": git_revision(),
+            "python": platform.python_version(),
+            "created_at": datetime.utcnow().isoformat(),
+            "parameters": parameters
+        },
+        "results": results
+    }
+    print(json.dumps(output, indent=2))
+    if path:
+        with open(path, "w") as f:
+            json.dump(output, f, indent=2)
+    return output
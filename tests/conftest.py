@@ -8,9 +8,10 @@ from unittest.mock import Mock, AsyncMock, patch
 from telegram import Update, User as TelegramUser, Chat
 from telegram.ext import ContextTypes
 from app.main import app
-from app.db.base import get_db
+from app.db.base import get_db, get_read_db
 from app.bot.client import APIClient
 from app.core.config import settings
+from app.schemas.bot_state import bot_state  # Not imported by the API, needed for create_all
 
 from app.queue.producer import NotificationProducer
 from app.queue.consumer import TelegramConsumer
@@ -47,6 +48,7 @@ def client(session):
             session.close()
 
     app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_read_db] = override_get_db
     with TestClient(app) as test_client:
         yield test_client
     app.dependency_overrides.clear()
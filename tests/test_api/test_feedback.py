@@ -295,3 +295,120 @@ def test_feedback_status_filter(client):
     assert response.status_code == 200
     data = response.json()
     assert all(feedback["status"] == "completed" for feedback in data)
+
+def test_homework_progress_counters(client):
+    # Given
+    teacher_id = client.post("/users/", json={
+        "tg_handle": "counter_teacher",
+        "telegram_id": "555666901",
+        "role": "teacher",
+        "meta": {}
+    }).json()["id"]
+    student_ids = [
+        client.post("/users/", json={
+            "tg_handle": f"counter_student{i}",
+            "telegram_id": str(555666902 + i),
+            "role": "student",
+            "meta": {}
+        }).json()["id"]
+        for i in range(2)
+    ]
+    homework = client.post("/homework/assign/", json={
+        "teacher_id": teacher_id,
+        "student_ids": student_ids,
+        "content": {"title": "Counted Homework"},
+        "status": "pending"
+    }).json()
+    assert (homework["assigned_count"], homework["submitted_count"], homework["completed_count"]) == (2, 0, 0)
+
+    def submit(student_id):
+        return client.post("/submissions/", json={
+            "homework_task_id": homework["id"],
+            "student_id": student_id,
+            "teacher_id": teacher_id,
+            "content": {"text": "Attempt"},
+            "status": "pending"
+        }).json()["id"]
+
+    def review(submission_id, student_id):
+        response = client.post("/feedback/", json={
+            "submission_id": submission_id,
+            "teacher_id": teacher_id,
+            "student_id": student_id,
+            "content": {"text": "Reviewed"},
+            "status": "completed"
+        })
+        assert response.status_code == 200
+
+    def counters():
+        data = client.get(f"/homework/{homework['id']}").json()
+        return data["submitted_count"], data["completed_count"], data["status"]
+
+    # When / Then
+    # A second submission or review by the same student counts once
+    first, second = submit(student_ids[0]), submit(student_ids[0])
+    assert counters() == (1, 0, "pending")
+
+    review(first, student_ids[0])
+    review(second, student_ids[0])
+    review(second, student_ids[0])
+    assert counters() == (1, 1, "pending")
+
+    review(submit(student_ids[1]), student_ids[1])
+    assert counters() == (2, 2, "completed")
+
+def test_feedback_history_pages_from_the_last_feedback(client):
+    # Given
+    teacher_id = client.post("/users/", json={
+        "tg_handle": "history_teacher", "telegram_id": "555666961", "role": "teacher", "meta": {}
+    }).json()["id"]
+    student_id = client.post("/users/", json={
+        "tg_handle": "history_student", "telegram_id": "555666962", "role": "student", "meta": {}
+    }).json()["id"]
+    homework_id = client.post("/homework/assign/", json={
+        "teacher_id": teacher_id,
+        "student_ids": [student_id],
+        "content": {"title": "Bachata basics"},
+        "status": "pending"
+    }).json()["id"]
+    feedback_ids = []
+    for i in range(5):
+        submission_id = client.post("/submissions/", json={
+            "homework_task_id": homework_id,
+            "student_id": student_id,
+            "teacher_id": teacher_id,
+            "content": {"text": f"Attempt {i}"},
+            "status": "pending"
+        }).json()["id"]
+        feedback_ids.append(client.post("/feedback/", json={
+            "submission_id": submission_id,
+            "teacher_id": teacher_id,
+            "student_id": student_id,
+            "content": {"text": f"Feedback {i}"},
+            "status": "completed"
+        }).json()["id"])
+
+    # When
+    first = client.get(f"/feedback/student/{student_id}", params={"limit": 2}).json()
+    rest = client.get(
+        f"/feedback/student/{student_id}", params={"after": first[-1]["id"], "limit": 10}
+    ).json()
+    teacher_view = client.get(f"/feedback/teacher/{teacher_id}").json()
+
+    # Then
+    assert [f["id"] for f in first + rest] == feedback_ids
+    assert rest[0]["homework_title"] == "Bachata basics"
+    assert [f["id"] for f in teacher_view] == feedback_ids
+    assert {f["student_handle"] for f in teacher_view} == {"history_student"}
+
+def test_feedback_history_rejects_unknown_cursor(client):
+    # Given
+    student_id = client.post("/users/", json={
+        "tg_handle": "history_student2", "telegram_id": "555666963", "role": "student", "meta": {}
+    }).json()["id"]
+
+    # When
+    response = client.get(f"/feedback/student/{student_id}", params={"after": "fb_missing"})
+
+    # Then
+    assert response.status_code == 400
@@ -333,3 +333,139 @@ def test_get_student_homework_with_status(client):
     assert response.status_code == 200
     data = response.json()
     assert all(hw["status"] == "pending" for hw in data)
+
+def test_homework_list_matches_single_homework(client):
+    # Given
+    teacher_response = client.post("/users/", json={
+        "tg_handle": "homework_teacher7",
+        "telegram_id": "999888787",
+        "role": "teacher",
+        "meta": {}
+    })
+    teacher_id = teacher_response.json()["id"]
+
+    student_response = client.post("/users/", json={
+        "tg_handle": "homework_student7",
+        "telegram_id": "777888987",
+        "role": "student",
+        "meta": {}
+    })
+    student_id = student_response.json()["id"]
+
+    for title in ["First", "Second"]:
+        response = client.post("/homework/assign/", json={
+            "teacher_id": teacher_id,
+            "student_ids": [student_id],
+            "content": {"title": f"{title} Homework", "nested": {"steps": [1, 2]}}
+        })
+        assert response.status_code == 200
+    homework_id = response.json()["id"]
+    client.patch(f"/homework/{homework_id}/status", params={"status": "completed"})
+
+    # When - list responses are rendered by Postgres instead of the response model
+    listed = client.get(f"/homework/teacher/{teacher_id}").json()
+
+    # Then - every item has exactly the shape of the single-item endpoint
+    assert len(listed) == 2
+    for item in listed:
+        assert item == client.get(f"/homework/{item['id']}").json()
+    assert {item["status"] for item in listed} == {"pending", "completed"}
+
+def test_assign_homework_ignores_server_assigned_fields(client):
+    # Given
+    teacher_id = client.post("/users/", json={
+        "tg_handle": "homework_teacher8",
+        "telegram_id": "999888788",
+        "role": "teacher"
+    }).json()["id"]
+    student_id = client.post("/users/", json={
+        "tg_handle": "homework_student8",
+        "telegram_id": "777888988",
+        "role": "student"
+    }).json()["id"]
+
+    # When - the client tries to pick the id, timestamp and status
+    response = client.post("/homework/assign/", json={
+        "id": "hw_chosen_by_client",
+        "created_at": "2000-01-01T00:00:00",
+        "status": "completed",
+        "teacher_id": teacher_id,
+        "student_ids": [student_id],
+        "content": {"title": "Server Fields"}
+    })
+
+    # Then
+    assert response.status_code == 200
+    data = response.json()
+    assert data["id"] != "hw_chosen_by_client"
+    assert not data["created_at"].startswith("2000")
+    assert data["status"] == "pending"
+
+def test_teacher_homework_filter_and_sort_by_title(client):
+    # Given
+    teacher_id = client.post("/users/", json={
+        "tg_handle": "homework_teacher9",
+        "telegram_id": "999888789",
+        "role": "teacher"
+    }).json()["id"]
+    student_id = client.post("/users/", json={
+        "tg_handle": "homework_student9",
+        "telegram_id": "777888989",
+        "role": "student"
+    }).json()["id"]
+
+    for title in ["Waltz", "Bachata", "Cha-cha"]:
+        client.post("/homework/assign/", json={
+            "teacher_id": teacher_id,
+            "student_ids": [student_id],
+            "content": {"title": title}
+        })
+
+    # When
+    ascending = client.get(f"/homework/teacher/{teacher_id}", params={"sort": "title"})
+    descending = client.get(f"/homework/student/{student_id}", params={"sort": "-title"})
+    filtered = client.get(f"/homework/teacher/{teacher_id}", params={"title": "Bachata"})
+    invalid = client.get(f"/homework/teacher/{teacher_id}", params={"sort": "content"})
+
+    # Then
+    assert [hw["content"]["title"] for hw in ascending.json()] == ["Bachata", "Cha-cha", "Waltz"]
+    assert [hw["content"]["title"] for hw in descending.json()] == ["Waltz", "Cha-cha", "Bachata"]
+    assert [hw["content"]["title"] for hw in filtered.json()] == ["Bachata"]
+    assert invalid.status_code == 422
+
+def test_homework_pages_default_to_creation_order(client):
+    # Given
+    teacher_id = client.post("/users/", json={
+        "tg_handle": "homework_pages_teacher", "telegram_id": "555666964", "role": "teacher"
+    }).json()["id"]
+    student_id = client.post("/users/", json={
+        "tg_handle": "homework_pages_student", "telegram_id": "555666965", "role": "student"
+    }).json()["id"]
+    homework_ids = [
+        client.post("/homework/assign/", json={
+            "teacher_id": teacher_id,
+            "student_ids": [student_id],
+            "content": {"title": f"Step {i}"}
+        }).json()["id"]
+        for i in range(5)
+    ]
+    # A submission rewrites the first homework's counters
+    client.post("/submissions/", json={
+        "homework_task_id": homework_ids[0],
+        "student_id": student_id,
+        "teacher_id": teacher_id,
+        "content": {"text": "Attempt"},
+        "status": "pending"
+    })
+
+    # When
+    pages = [
+        client.get(f"/homework/{role}/{user_id}", params={"offset": offset, "limit": 2}).json()
+        for role, user_id in [("teacher", teacher_id), ("student", student_id)]
+        for offset in (0, 2, 4)
+    ]
+
+    # Then
+    teacher_pages, student_pages = pages[:3], pages[3:]
+    assert [hw["id"] for page in teacher_pages for hw in page] == homework_ids
+    assert [hw["id"] for page in student_pages for hw in page] == homework_ids
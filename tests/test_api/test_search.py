@@ -0,0 +1,102 @@
+"""
+1. Ranked full-text matches across homework, submissions and feedback
+2. Teacher and student scoping
+3. Kind and date filters
+4. Error cases
+"""
+
+import pytest
+
+@pytest.fixture
+def coursework(client):
+    """Two teachers, a student and some homework, a submission and feedback"""
+    teacher_id = client.post("/users/", json={
+        "tg_handle": "search_teacher1", "telegram_id": "555666701", "role": "teacher"
+    }).json()["id"]
+    other_teacher_id = client.post("/users/", json={
+        "tg_handle": "search_teacher2", "telegram_id": "555666702", "role": "teacher"
+    }).json()["id"]
+    student_id = client.post("/users/", json={
+        "tg_handle": "search_student1", "telegram_id": "555666703", "role": "student"
+    }).json()["id"]
+
+    def assign(teacher, title, description):
+        return client.post("/homework/assign/", json={
+            "teacher_id": teacher,
+            "student_ids": [student_id],
+            "content": {"title": title, "description": description}
+        }).json()["id"]
+
+    turns_id = assign(teacher_id, "Salsa turns", "Right turn and cross body lead")
+    basics_id = assign(teacher_id, "Bachata basics", "Side steps, then add a salsa-style turn")
+    assign(other_teacher_id, "Salsa shines", "Footwork drills")
+
+    submission_id = client.post("/submissions/", json={
+        "homework_task_id": turns_id,
+        "student_id": student_id,
+        "teacher_id": teacher_id,
+        "content": {"text": "Recorded my turning practice"}
+    }).json()["id"]
+    feedback_id = client.post("/feedback/", json={
+        "submission_id": submission_id,
+        "student_id": student_id,
+        "teacher_id": teacher_id,
+        "content": {"text": "Spot your head on every turn"}
+    }).json()["id"]
+
+    return {
+        "teacher_id": teacher_id,
+        "student_id": student_id,
+        "turns_id": turns_id,
+        "basics_id": basics_id,
+        "submission_id": submission_id,
+        "feedback_id": feedback_id,
+    }
+
+def test_search_ranks_title_matches_first(client, coursework):
+    # When
+    response = client.get("/search/", params={"q": "salsa turn", "teacher_id": coursework["teacher_id"]})
+
+    # Then - both homework mention salsa turns, but only one has them in the title
+    assert response.status_code == 200
+    results = response.json()
+    assert [r["id"] for r in results] == [coursework["turns_id"], coursework["basics_id"]]
+    assert results[0]["kind"] == "homework"
+    assert "**Salsa**" in results[0]["headline"]
+    assert results[0]["rank"] > results[1]["rank"]
+
+def test_search_is_scoped_and_stems_words(client, coursework):
+    # When - "turns" matches "turn" and "turning" in every kind of content
+    response = client.get("/search/", params={"q": "turns", "student_id": coursework["student_id"]})
+
+    # Then - the other teacher's homework never matches
+    assert response.status_code == 200
+    found = {(r["kind"], r["id"]) for r in response.json()}
+    assert found == {
+        ("homework", coursework["turns_id"]),
+        ("homework", coursework["basics_id"]),
+        ("submission", coursework["submission_id"]),
+        ("feedback", coursework["feedback_id"]),
+    }
+
+def test_search_kind_and_date_filters(client, coursework):
+    # When
+    feedback_only = client.get("/search/", params={
+        "q": "turn", "teacher_id": coursework["teacher_id"], "kinds": ["feedback"]
+    })
+    future_only = client.get("/search/", params={
+        "q": "turn", "teacher_id": coursework["teacher_id"], "created_after": "2100-01-01T00:00:00"
+    })
+
+    # Then
+    assert [r["id"] for r in feedback_only.json()] == [coursework["feedback_id"]]
+    assert future_only.json() == []
+
+def test_search_requires_exactly_one_scope(client, coursework):
+    # When
+    unscoped = client.get("/search/", params={"q": "salsa"})
+    wrong_role = client.get("/search/", params={"q": "salsa", "teacher_id": coursework["student_id"]})
+
+    # Then
+    assert unscoped.status_code == 400
+    assert wrong_role.status_code == 404
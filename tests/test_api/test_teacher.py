@@ -0,0 +1,154 @@
+"""
+1. Teacher statistics: review queue, homework progress, review latency
+2. Overdue students
+3. Progress matrix, its statistics and encodings
+4. Error cases
+"""
+
+import base64
+
+import pytest
+
+def test_teacher_stats(client):
+    # Given - two students on one homework, one submitted and reviewed,
+    # and one submission waiting for review on a second homework
+    teacher_id = client.post("/users/", json={
+        "tg_handle": "stats_teacher", "telegram_id": "555666921", "role": "teacher"
+    }).json()["id"]
+    student_ids = [
+        client.post("/users/", json={
+            "tg_handle": f"stats_student{i}", "telegram_id": str(555666922 + i), "role": "student"
+        }).json()["id"]
+        for i in range(2)
+    ]
+
+    def assign(title):
+        return client.post("/homework/assign/", json={
+            "teacher_id": teacher_id,
+            "student_ids": student_ids,
+            "content": {"title": title}
+        }).json()["id"]
+
+    def submit(homework_id, student_id):
+        return client.post("/submissions/", json={
+            "homework_task_id": homework_id,
+            "student_id": student_id,
+            "teacher_id": teacher_id,
+            "content": {"text": "Done"}
+        }).json()["id"]
+
+    waltz_id = assign("Waltz box step")
+    submission_id = submit(waltz_id, student_ids[0])
+    assert client.post("/feedback/", json={
+        "submission_id": submission_id,
+        "teacher_id": teacher_id,
+        "student_id": student_ids[0],
+        "content": {"text": "Lovely frame"}
+    }).status_code == 200
+    tango_id = assign("Tango walk")
+    submit(tango_id, student_ids[1])
+
+    # When
+    response = client.get(f"/teachers/{teacher_id}/stats", params={"overdue_after_days": 0})
+
+    # Then
+    assert response.status_code == 200
+    stats = response.json()
+    assert stats["pending_review"] == 1
+    assert stats["homework_count"] == 2
+    assert stats["submission_rate"] == 0.5
+    assert stats["completion_rate"] == 0.25
+    assert stats["reviewed"] == 1
+    assert stats["median_review_seconds"] >= 0
+
+    assert [hw["id"] for hw in stats["homework"]] == [tango_id, waltz_id]
+    waltz = stats["homework"][1]
+    assert (waltz["title"], waltz["submitted_count"], waltz["completed_count"]) == ("Waltz box step", 1, 1)
+    assert waltz["completion_rate"] == 0.5
+
+    # Each student still owes the homework the other one submitted
+    assert stats["overdue_students_total"] == 2
+    assert {s["tg_handle"]: s["overdue_count"] for s in stats["overdue_students"]} == {
+        "stats_student0": 1, "stats_student1": 1
+    }
+
+    # Nothing is overdue before the deadline
+    stats = client.get(f"/teachers/{teacher_id}/stats").json()
+    assert stats["overdue_students_total"] == 0
+    assert stats["overdue_students"] == []
+
+def test_teacher_stats_requires_teacher(client):
+    # Given
+    student_id = client.post("/users/", json={
+        "tg_handle": "stats_not_teacher", "telegram_id": "555666925", "role": "student"
+    }).json()["id"]
+
+    # When / Then
+    assert client.get(f"/teachers/{student_id}/stats").status_code == 404
+    assert client.get("/teachers/usr_missing/stats").status_code == 404
+    assert client.get(f"/teachers/{student_id}/progress-matrix").status_code == 404
+
+def test_progress_matrix(client):
+    # Given - three homework, oldest first, for two students
+    teacher_id = client.post("/users/", json={
+        "tg_handle": "matrix_teacher", "telegram_id": "555666931", "role": "teacher"
+    }).json()["id"]
+    first, second = [
+        client.post("/users/", json={
+            "tg_handle": f"matrix_{name}", "telegram_id": str(555666932 + n), "role": "student"
+        }).json()["id"]
+        for n, name in enumerate(["a", "b"])
+    ]
+
+    def assign(title, student_ids):
+        return client.post("/homework/assign/", json={
+            "teacher_id": teacher_id, "student_ids": student_ids, "content": {"title": title}
+        }).json()["id"]
+
+    def submit(homework_id, student_id):
+        return client.post("/submissions/", json={
+            "homework_task_id": homework_id, "student_id": student_id,
+            "teacher_id": teacher_id, "content": {"text": "Done"}
+        }).json()["id"]
+
+    rumba_id = assign("Rumba", [first, second])
+    client.post("/feedback/", json={
+        "submission_id": submit(rumba_id, first), "teacher_id": teacher_id,
+        "student_id": first, "content": {"text": "Nice"}
+    })
+    jive_id = assign("Jive", [first])
+    submit(jive_id, first)
+    samba_id = assign("Samba", [first, second])
+    submit(samba_id, second)
+
+    # When
+    response = client.get(f"/teachers/{teacher_id}/progress-matrix")
+
+    # Then - 0 not assigned, 1 assigned, 2 submitted, 3 completed
+    assert response.status_code == 200
+    matrix = response.json()
+    assert [hw["id"] for hw in matrix["homework"]] == [rumba_id, jive_id, samba_id]
+    assert [hw["completion_rate"] for hw in matrix["homework"]] == [0.5, 0.0, 0.0]
+    assert [student["id"] for student in matrix["students"]] == [first, second]
+    assert matrix["rows"] == ["321", "102"]
+    assert matrix["packed"] is None
+
+    a, b = matrix["students"]
+    assert (a["tg_handle"], a["assigned"], a["submission_rate"], a["completion_rate"]) == ("matrix_a", 3, 0.6667, 0.3333)
+    assert (a["current_streak"], a["longest_streak"], a["percentile"]) == (0, 2, 75.0)
+    assert (b["assigned"], b["submission_rate"], b["completion_rate"]) == (2, 0.5, 0.0)
+    assert (b["current_streak"], b["longest_streak"], b["percentile"]) == (1, 1, 25.0)
+    assert matrix["completion_percentiles"]["p50"] == pytest.approx(1 / 6, abs=1e-4)
+
+    # The packed encoding holds the same cells at 2 bits each
+    packed = client.get(
+        f"/teachers/{teacher_id}/progress-matrix", params={"encoding": "packed"}
+    ).json()
+    assert packed["rows"] is None
+    assert base64.b64decode(packed["packed"]) == bytes([0b11_10_01_01, 0b00_10_00_00])
+
+    # Only the most recent homework
+    recent = client.get(
+        f"/teachers/{teacher_id}/progress-matrix", params={"homework_limit": 1}
+    ).json()
+    assert recent["rows"] == ["1", "2"]
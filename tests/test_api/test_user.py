@@ -28,7 +28,7 @@ def test_create_user(client):
     assert response.status_code == 200
     data = response.json()
     assert data["tg_handle"] == user_data["tg_handle"]
-    assert data["telegram_id"] == user_data["telegram_id"]
+    assert data["telegram_id"] == int(user_data["telegram_id"])
     assert data["role"] == user_data["role"]
 
 def test_get_user_by_telegram_id(client):
@@ -69,7 +69,7 @@ def test_create_user_student(client):
     assert response.status_code == 200
     data = response.json()
     assert data["tg_handle"] == user_data["tg_handle"]
-    assert data["telegram_id"] == user_data["telegram_id"]
+    assert data["telegram_id"] == int(user_data["telegram_id"])
     assert data["role"] == user_data["role"]
     assert data["meta"] == user_data["meta"]
 
@@ -133,6 +133,24 @@ def test_get_all_teachers(client):
     assert len(data) > 0
     assert all(user["role"] == "teacher" for user in data)
 
+def test_student_pages_are_ordered_by_handle(client):
+    # Given
+    for n, handle in enumerate(["paged_c", "paged_a", "paged_b"]):
+        client.post("/users/", json={
+            "tg_handle": handle, "telegram_id": 555666951 + n, "role": "student", "meta": {}
+        })
+
+    # When
+    pages = [
+        client.get("/users/students/", params={"offset": offset, "limit": 1}).json()
+        for offset in range(100)
+    ]
+
+    # Then - every student exactly once, in handle order
+    handles = [page[0]["tg_handle"] for page in pages if page]
+    assert len(set(handles)) == len(handles)
+    assert [handle for handle in handles if handle.startswith("paged_")] == ["paged_a", "paged_b", "paged_c"]
+
 def test_invalid_role(client):
     # Given
     user_data = {
@@ -221,3 +239,28 @@ def test_valid_meta_json(client):
     assert response.status_code == 200
     data = response.json()
     assert data["meta"]["preferences"]["style"] == "contemporary"
+
+def test_search_users_by_handle(client):
+    # Given
+    for handle, telegram_id, role in [
+        ("salsa_queen", "555666801", "student"),
+        ("salsa_king_99", "555666802", "student"),
+        ("bachata_salsa", "555666803", "student"),
+        ("salsaxqueen", "555666804", "student"),
+        ("salsa_teacher", "555666805", "teacher"),
+    ]:
+        client.post("/users/", json={"tg_handle": handle, "telegram_id": telegram_id, "role": role})
+
+    # When
+    contains = client.get("/users/search", params={"q": "@salsa", "role": "student"})
+    underscore = client.get("/users/search", params={"q": "a_q", "role": "student"})
+    typo = client.get("/users/search", params={"q": "salsa_quen", "role": "student"})
+    limited = client.get("/users/search", params={"q": "salsa", "limit": 2})
+
+    # Then - prefix matches rank first, `_` is matched literally, typos still match
+    assert [u["tg_handle"] for u in contains.json()] == [
+        "salsa_king_99", "salsa_queen", "salsaxqueen", "bachata_salsa"
+    ]
+    assert [u["tg_handle"] for u in underscore.json()] == ["salsa_queen"]
+    assert typo.json()[0]["tg_handle"] == "salsa_queen"
+    assert len(limited.json()) == 2
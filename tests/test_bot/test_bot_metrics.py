@@ -0,0 +1,45 @@
+import pytest
+from prometheus_client import REGISTRY
+from app.bot.client import APIClient
+from app.bot.instrumentation import track_handler
+
+def sample(name, **labels):
+    return REGISTRY.get_sample_value(name, labels) or 0
+
+@pytest.mark.asyncio
+async def test_track_handler_counts_api_calls(httpx_mock):
+    # Given
+    client = APIClient(base_url="http://test")
+    httpx_mock.add_response(url="http://test/users/usr_1", json={"id": "usr_1"})
+    httpx_mock.add_response(url="http://test/users/usr_2", json={"id": "usr_2"})
+
+    async def handler(update, context):
+        await client.get_user_by_id("usr_1")
+        await client.get_user_by_id("usr_2")
+        return "done"
+
+    calls_before = sample("bot_api_calls_total", handler="test_handler")
+    handled_before = sample("bot_api_calls_per_handler_count", handler="test_handler")
+
+    # When
+    result = await track_handler("test_handler", handler)(None, None)
+
+    # Then
+    assert result == "done"
+    assert sample("bot_api_calls_total", handler="test_handler") == calls_before + 2
+    assert sample("bot_api_calls_per_handler_count", handler="test_handler") == handled_before + 1
+    assert sample("bot_handler_duration_seconds_count", handler="test_handler", status="ok") >= 1
+
+@pytest.mark.asyncio
+async def test_track_handler_records_errors():
+    async def failing_handler(update, context):
+        raise ValueError("boom")
+
+    before = sample("bot_handler_duration_seconds_count", handler="failing_handler", status="error")
+
+    with pytest.raises(ValueError):
+        await track_handler("failing_handler", failing_handler)(None, None)
+
+    assert sample(
+        "bot_handler_duration_seconds_count", handler="failing_handler", status="error"
+    ) == before + 1
@@ -354,3 +354,95 @@ async def test_timeout_error(httpx_mock):
 
     with pytest.raises(httpx.TimeoutException):
         await client.get_all_teachers()
+
+@pytest.mark.asyncio
+async def test_get_student_roster_pages_through_students(httpx_mock):
+    client = APIClient(base_url="http://test")
+
+    httpx_mock.add_response(
+        url="http://test/users/students/?offset=0&limit=2",
+        json=[
+            {"id": "usr_1", "tg_handle": "zoe", "telegram_id": "1"},
+            {"id": "usr_2", "tg_handle": "Bob", "telegram_id": "2"}
+        ]
+    )
+    httpx_mock.add_response(
+        url="http://test/users/students/?offset=2&limit=2",
+        json=[{"id": "usr_3", "tg_handle": "alice", "telegram_id": "3"}]
+    )
+
+    roster = await client.get_student_roster(page_size=2)
+
+    assert [s["tg_handle"] for s in roster] == ["alice", "Bob", "zoe"]
+    assert roster[0] == {"id": "usr_3", "tg_handle": "alice"}
+
+@pytest.mark.asyncio
+async def test_iter_items_fetches_pages_lazily(httpx_mock):
+    client = APIClient(base_url="http://test")
+
+    httpx_mock.add_response(
+        url="http://test/homework/teacher/teacher_1?offset=0&limit=2",
+        json=[{"id": "hw_1"}, {"id": "hw_2"}]
+    )
+
+    items = client.iter_items("/homework/teacher/teacher_1", page_size=2)
+    first = [await items.__anext__(), await items.__anext__()]
+    await items.aclose()
+
+    # Only the first page was requested
+    assert first == [(0, {"id": "hw_1"}), (1, {"id": "hw_2"})]
+    assert len(httpx_mock.get_requests()) == 1
+
+@pytest.mark.asyncio
+async def test_iter_feedback_history_pages_from_the_last_feedback(httpx_mock):
+    client = APIClient(base_url="http://test")
+
+    httpx_mock.add_response(
+        url="http://test/feedback/teacher/teacher_1?limit=2",
+        json=[{"id": "fb_1"}, {"id": "fb_2"}]
+    )
+    httpx_mock.add_response(
+        url="http://test/feedback/teacher/teacher_1?limit=2&after=fb_2",
+        json=[{"id": "fb_3"}]
+    )
+
+    items = [
+        item async for item in client.iter_feedback_history(
+            {"id": "teacher_1", "role": "teacher"}, page_size=2
+        )
+    ]
+
+    # Each cursor is the feedback shown before the item
+    assert items == [(None, {"id": "fb_1"}), ("fb_1", {"id": "fb_2"}), ("fb_2", {"id": "fb_3"})]
+
+@pytest.mark.asyncio
+async def test_reads_after_own_write_ask_for_the_primary(httpx_mock):
+    from app.bot.instrumentation import current_user
+
+    client = APIClient(base_url="http://test")
+    httpx_mock.add_response(
+        url="http://test/submissions/",
+        method="POST",
+        json={"id": "sub_1"},
+        headers={"X-Read-Primary-For": "5"}
+    )
+    httpx_mock.add_response(url="http://test/submissions/sub_1", json={"id": "sub_1"}, is_reusable=True)
+
+    # A user submits, then reads their submission back
+    token = current_user.set(111)
+    try:
+        await client.submit_homework({"homework_task_id": "hw_1"})
+        await client.get_submission_by_id("sub_1")
+    finally:
+        current_user.reset(token)
+
+    # Another user's reads aren't affected
+    token = current_user.set(222)
+    try:
+        await client.get_submission_by_id("sub_1")
+    finally:
+        current_user.reset(token)
+
+    first_read, other_read = httpx_mock.get_requests()[1:]
+    assert first_read.headers.get("X-Read-Primary") == "1"
+    assert "X-Read-Primary" not in other_read.headers
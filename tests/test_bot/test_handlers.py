@@ -3,9 +3,17 @@ from unittest.mock import AsyncMock, Mock, patch
 from telegram import Update, User as TelegramUser, Chat
 from telegram.ext import ContextTypes, ConversationHandler
 from app.bot.handlers.basic import BasicHandler
-from app.bot.handlers.homework import HomeworkHandler
+import re
+from app.bot.handlers.homework import HomeworkHandler, AWAITING_STUDENTS, PICK_STUDENT_PATTERN
 from app.bot.handlers.submission import SubmissionHandler, AWAITING_HOMEWORK_SELECTION
 from app.bot.handlers.feedback import FeedbackHandler, AWAITING_SUBMISSION_SELECTION
+from app.bot.handlers.search import SearchHandler
+from app.bot.handlers.stats import StatsHandler
+
+async def iterate(items):
+    """Stand-in for APIClient.iter_items"""
+    for offset, item in enumerate(items):
+        yield offset, item
 
 @pytest.mark.asyncio
 async def test_start_command(mock_update, mock_context, mock_api_client):
@@ -52,20 +60,20 @@ async def test_homework_list_student(mock_update, mock_context, mock_api_client)
         "id": "student_1",
         "role": "student"
     }
-    mock_api_client.get_homework_for_student.return_value = [
+    mock_api_client.iter_items = Mock(return_value=iterate([
         {
             "id": "hw_1",
             "content": {"title": "Test Homework"},
             "status": "pending",
-            "teacher_handle": "test_teacher"
+            "teacher_id": "teacher_1"
         }
-    ]
+    ]))
 
     # When
     await handler.list_homework(mock_update, mock_context)
 
     # Then
-    mock_api_client.get_homework_for_student.assert_called_once()
+    mock_api_client.iter_items.assert_called_once_with("/homework/student/student_1", offset=0)
     mock_update.message.reply_text.assert_called_once()
     text = mock_update.message.reply_text.call_args[0][0]
     assert "Test Homework" in text
@@ -78,21 +86,115 @@ async def test_homework_list_teacher(mock_update, mock_context, mock_api_client)
         "id": "teacher_1",
         "role": "teacher"
     }
-    mock_api_client.get_homework_for_teacher.return_value = [
+    mock_api_client.iter_items = Mock(return_value=iterate([
         {
             "id": "hw_1",
             "content": {"title": "Test Homework"},
             "student_ids": ["student_1"]
         }
-    ]
+    ]))
 
     # When
     await handler.list_homework(mock_update, mock_context)
 
     # Then
-    mock_api_client.get_homework_for_teacher.assert_called_once()
+    mock_api_client.iter_items.assert_called_once_with("/homework/teacher/teacher_1", offset=0)
     mock_update.message.reply_text.assert_called_once()
 
+@pytest.mark.asyncio
+async def test_homework_list_long_history_is_chunked(mock_update, mock_context, mock_api_client):
+    # Given
+    handler = HomeworkHandler(mock_api_client)
+    mock_api_client.get_user_by_telegram_id.return_value = {
+        "id": "teacher_1",
+        "role": "teacher"
+    }
+    mock_api_client.iter_items = Mock(return_value=iterate([
+        {"id": f"hw_{i}", "content": {"title": "Salsa " * 10}, "student_ids": []}
+        for i in range(10000)
+    ]))
+
+    # When
+    await handler.list_homework(mock_update, mock_context)
+
+    # Then
+    calls = mock_update.message.reply_text.call_args_list
+    assert len(calls) == 3
+    assert all(len(call.args[0]) <= 4096 for call in calls)
+    more_button = calls[-1].kwargs['reply_markup'].inline_keyboard[0][0]
+    assert more_button.callback_data.startswith("more_homework_")
+
+@pytest.mark.asyncio
+async def test_feedback_list_student(mock_update, mock_context, mock_api_client):
+    # Given
+    handler = FeedbackHandler(mock_api_client)
+    mock_api_client.get_user_by_telegram_id.return_value = {
+        "id": "student_1",
+        "role": "student"
+    }
+    mock_api_client.iter_feedback_history = Mock(return_value=iterate([{
+        "id": "fb_1",
+        "content": {"text": "Great spins"},
+        "homework_title": "Salsa turns",
+        "student_handle": "student_one",
+        "created_at": "2025-03-01"
+    }]))
+
+    # When
+    await handler.list_feedback(mock_update, mock_context)
+
+    # Then
+    mock_api_client.iter_feedback_history.assert_called_once_with(
+        {"id": "student_1", "role": "student"}, after=None
+    )
+    text = mock_update.message.reply_text.call_args[0][0]
+    assert "Salsa turns" in text
+    assert "Great spins" in text
+    assert "student_one" not in text
+
+@pytest.mark.asyncio
+async def test_feedback_list_more_resumes_after_last_shown(mock_update, mock_context, mock_api_client):
+    # Given
+    handler = FeedbackHandler(mock_api_client)
+    mock_api_client.get_user_by_telegram_id.return_value = {
+        "id": "teacher_1",
+        "role": "teacher"
+    }
+
+    async def history(user, after=None):
+        previous = after
+        for i in range(10000):
+            feedback = {
+                "id": f"fb_{i:05d}",
+                "content": {"text": "Lovely timing " * 10},
+                "homework_title": "Salsa turns",
+                "student_handle": "student_one"
+            }
+            yield previous, feedback
+            previous = feedback["id"]
+
+    mock_api_client.iter_feedback_history = Mock(side_effect=history)
+
+    # When
+    await handler.list_feedback(mock_update, mock_context)
+
+    # Then
+    calls = mock_update.message.reply_text.call_args_list
+    more_button = calls[-1].kwargs['reply_markup'].inline_keyboard[0][0]
+    cursor = more_button.callback_data[len("more_feedback_"):]
+    assert cursor.startswith("fb_")
+    assert len(more_button.callback_data.encode()) <= 64
+    assert "@student_one" in calls[0].args[0]
+
+    # When
+    mock_update.callback_query = AsyncMock()
+    mock_update.callback_query.data = more_button.callback_data
+    mock_update.callback_query.from_user = mock_update.effective_user
+    await handler.handle_more_feedback(mock_update, mock_context)
+
+    # Then
+    assert mock_api_client.iter_feedback_history.call_args.kwargs == {"after": cursor}
+
 @pytest.mark.asyncio
 async def test_start_submit_homework(mock_update, mock_context, mock_api_client):
     # Given
@@ -142,6 +244,35 @@ async def test_list_pending_feedback(mock_update, mock_context, mock_api_client)
     # Then
     assert result == AWAITING_SUBMISSION_SELECTION  # Updated constant name
     mock_update.message.reply_text.assert_called_once()
+    # Only the ids are kept in the persisted user data
+    assert mock_context.user_data['pending_submission_ids'] == ["sub_1"]
+    assert 'submissions' not in mock_context.user_data
+
+@pytest.mark.asyncio
+async def test_pending_feedback_selection_fetches_the_submission(mock_update, mock_context, mock_api_client):
+    # Given
+    handler = FeedbackHandler(mock_api_client)
+    mock_context.user_data['pending_submission_ids'] = ["sub_1"]
+    mock_api_client.get_submission_by_id.return_value = {
+        "id": "sub_1",
+        "student_id": "student_1",
+        "homework_task_id": "hw_1",
+        "content": {"text": "My attempt"}
+    }
+    mock_api_client.get_user_by_id.return_value = {"id": "student_1", "tg_handle": "test_student"}
+    mock_api_client.get_homework_by_id.return_value = {"id": "hw_1", "content": {"title": "Salsa turns"}}
+    mock_update.callback_query = AsyncMock()
+    mock_update.callback_query.data = "sub_1"
+
+    # When
+    await handler.handle_submission_selection(mock_update, mock_context)
+
+    # Then
+    text = mock_update.callback_query.edit_message_text.call_args.args[0]
+    assert "@test_student" in text
+    assert "Salsa turns" in text
+    assert "My attempt" in text
+    assert mock_context.user_data['selected_submission'] == {"id": "sub_1", "student_id": "student_1"}
 
 @pytest.mark.asyncio
 async def test_cancel_command(mock_update, mock_context, mock_api_client):
@@ -156,3 +287,197 @@ async def test_cancel_command(mock_update, mock_context, mock_api_client):
     mock_update.message.reply_text.assert_called_once_with(
         "Operation cancelled."
     )
+
+@pytest.mark.asyncio
+async def test_student_picker_toggles_without_api_calls(mock_update, mock_context, mock_api_client):
+    # Given
+    handler = HomeworkHandler(mock_api_client)
+    mock_api_client.get_student_roster.return_value = [
+        {"id": f"usr_{i}", "tg_handle": f"student{i:04d}"} for i in range(1000)
+    ]
+    mock_update.message.text = "Title: Salsa turns\nDescription: Practice"
+    await handler.handle_homework_content(mock_update, mock_context)
+    mock_api_client.reset_mock()
+
+    # When
+    for data in ["usr_1", "usr_2", "page_1", "usr_15", "usr_2"]:
+        mock_update.callback_query.data = data
+        result = await handler.handle_student_selection(mock_update, mock_context)
+
+    # Then
+    assert result == AWAITING_STUDENTS
+    assert mock_api_client.mock_calls == []
+    assert mock_context.user_data['selected_students'] == ["usr_1", "usr_15"]
+    # The roster is cached by the handler, not persisted with the user's data
+    assert 'student_roster' not in mock_context.user_data
+    markup = mock_update.callback_query.edit_message_text.call_args.kwargs['reply_markup']
+    assert markup.inline_keyboard[0][0].callback_data == "usr_10"
+
+@pytest.mark.asyncio
+async def test_student_picker_search(mock_update, mock_context, mock_api_client):
+    # Given
+    handler = HomeworkHandler(mock_api_client)
+    mock_api_client.get_student_roster.return_value = [
+        {"id": "usr_1", "tg_handle": "alice"},
+        {"id": "usr_2", "tg_handle": "bob"}
+    ]
+    mock_context.user_data.update({
+        "homework_content": {"title": "Salsa turns", "description": "Practice"},
+        "selected_students": [],
+        "student_page": 0
+    })
+    mock_update.message.text = "bo"
+
+    # When
+    result = await handler.handle_student_search(mock_update, mock_context)
+
+    # Then
+    assert result == AWAITING_STUDENTS
+    markup = mock_update.message.reply_text.call_args.kwargs['reply_markup']
+    assert [row[0].callback_data for row in markup.inline_keyboard] == ["usr_2", "clear_search", "done"]
+
+@pytest.mark.asyncio
+async def test_student_inline_query_searches_students(mock_update, mock_context, mock_api_client):
+    # Given
+    handler = HomeworkHandler(mock_api_client)
+    mock_api_client.get_user_by_telegram_id.return_value = {"id": "teacher_1", "role": "teacher"}
+    mock_api_client.search_users.return_value = [{"id": "usr_2", "tg_handle": "bob"}]
+    mock_update.inline_query = AsyncMock()
+    mock_update.inline_query.query = "bo"
+
+    # When
+    await handler.student_inline_query(mock_update, mock_context)
+    await handler.student_inline_query(mock_update, mock_context)
+
+    # Then - the role is checked once, results send a pick message
+    mock_api_client.get_user_by_telegram_id.assert_called_once()
+    mock_api_client.search_users.assert_called_with("bo", role="student", limit=20)
+    results = mock_update.inline_query.answer.call_args.args[0]
+    assert [r.title for r in results] == ["@bob"]
+    assert re.match(PICK_STUDENT_PATTERN, results[0].input_message_content.message_text).group(1) == "usr_2"
+
+@pytest.mark.asyncio
+async def test_student_inline_query_rechecks_role_after_start(mock_update, mock_context, mock_api_client):
+    # Given - a student who cached the role check, then became a teacher
+    handler = HomeworkHandler(mock_api_client)
+    basic = BasicHandler(mock_api_client)
+    mock_api_client.get_user_by_telegram_id.return_value = {"id": "user_1", "role": "student"}
+    mock_api_client.search_users.return_value = [{"id": "usr_2", "tg_handle": "bob"}]
+    mock_update.inline_query = AsyncMock()
+    mock_update.inline_query.query = "bo"
+    await handler.student_inline_query(mock_update, mock_context)
+    assert mock_update.inline_query.answer.call_args.args[0] == []
+
+    # When
+    mock_api_client.get_user_by_telegram_id.return_value = {"id": "user_1", "role": "teacher"}
+    await basic.start(mock_update, mock_context)
+    await handler.student_inline_query(mock_update, mock_context)
+
+    # Then
+    assert [r.title for r in mock_update.inline_query.answer.call_args.args[0]] == ["@bob"]
+
+@pytest.mark.asyncio
+async def test_student_pick_selects_student(mock_update, mock_context, mock_api_client):
+    # Given
+    handler = HomeworkHandler(mock_api_client)
+    mock_api_client.get_student_roster.return_value = [
+        {"id": "usr_1", "tg_handle": "alice"}, {"id": "usr_2", "tg_handle": "bob"}
+    ]
+    mock_context.user_data.update({
+        "homework_content": {"title": "Salsa turns", "description": "Practice"},
+        "selected_students": ["usr_1"],
+        "student_page": 0
+    })
+    mock_context.matches = [re.match(PICK_STUDENT_PATTERN, "➕ usr_2 @bob")]
+
+    # When
+    result = await handler.handle_student_pick(mock_update, mock_context)
+
+    # Then
+    assert result == AWAITING_STUDENTS
+    assert mock_context.user_data["selected_students"] == ["usr_1", "usr_2"]
+    assert "Selected students: 2" in mock_update.message.reply_text.call_args.args[0]
+
+@pytest.mark.asyncio
+async def test_search_scoped_to_user(mock_update, mock_context, mock_api_client):
+    # Given
+    handler = SearchHandler(mock_api_client)
+    user = {"id": "teacher_1", "role": "teacher"}
+    mock_api_client.get_user_by_telegram_id.return_value = user
+    mock_api_client.search.return_value = [{
+        "kind": "homework",
+        "id": "hw_1",
+        "created_at": "2025-03-14T10:00:00",
+        "rank": 1.0,
+        "headline": "**Salsa** **turns**: Right turn and cross body lead"
+    }]
+    mock_context.args = ["salsa", "turns"]
+
+    # When
+    await handler.search(mock_update, mock_context)
+
+    # Then
+    mock_api_client.search.assert_called_once_with("salsa turns", user)
+    text = mock_update.message.reply_text.call_args[0][0]
+    assert "**Salsa** **turns**" in text
+    assert "2025-03-14" in text
+
+@pytest.mark.asyncio
+async def test_search_without_words_shows_usage(mock_update, mock_context, mock_api_client):
+    # Given
+    handler = SearchHandler(mock_api_client)
+    mock_context.args = []
+
+    # When
+    await handler.search(mock_update, mock_context)
+
+    # Then
+    assert "Usage: /search" in mock_update.message.reply_text.call_args[0][0]
+    mock_api_client.search.assert_not_called()
+
+@pytest.mark.asyncio
+async def test_stats_for_teacher(mock_update, mock_context, mock_api_client):
+    # Given
+    handler = StatsHandler(mock_api_client)
+    mock_api_client.get_user_by_telegram_id.return_value = {"id": "teacher_1", "role": "teacher"}
+    mock_api_client.get_teacher_stats.return_value = {
+        "pending_review": 3,
+        "oldest_pending_at": "2025-03-10T09:00:00",
+        "homework_count": 4,
+        "submission_rate": 0.75,
+        "completion_rate": 0.5,
+        "reviewed": 6,
+        "median_review_seconds": 5.5 * 3600,
+        "homework": [{
+            "title": "Salsa turns", "assigned_count": 4, "submitted_count": 3, "completed_count": 2
+        }],
+        "overdue_students_total": 1,
+        "overdue_students": [{
+            "tg_handle": "late_dancer", "overdue_count": 2, "oldest_assigned_at": "2025-03-01T12:00:00"
+        }]
+    }
+
+    # When
+    await handler.stats(mock_update, mock_context)
+
+    # Then
+    mock_api_client.get_teacher_stats.assert_called_once_with("teacher_1")
+    text = mock_update.message.reply_text.call_args[0][0]
+    assert "Waiting for review: 3 (oldest since 2025-03-10)" in text
+    assert "5.5 h" in text
+    assert "75% submitted · 50% completed" in text
+    assert "Salsa turns: 3/4 submitted, 2/4 completed" in text
+    assert "@late_dancer: 2 homework, since 2025-03-01" in text
+
+@pytest.mark.asyncio
+async def test_stats_only_for_teachers(mock_update, mock_context, mock_api_client):
+    # Given
+    handler = StatsHandler(mock_api_client)
+    mock_api_client.get_user_by_telegram_id.return_value = {"id": "student_1", "role": "student"}
+
+    # When
+    await handler.stats(mock_update, mock_context)
+
+    # Then
+    mock_api_client.get_teacher_stats.assert_not_called()
+    assert "Only teachers" in mock_update.message.reply_text.call_args[0][0]
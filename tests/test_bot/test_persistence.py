@@ -0,0 +1,105 @@
+import pytest
+from sqlalchemy import delete, select, func
+from app.bot.persistence import PostgresPersistence, bot_state, dumps, loads
+
+@pytest.fixture
+def persistence(db_engine):
+    """Create persistence backed by the test database"""
+    persistence = PostgresPersistence(engine=db_engine, write_delay=60)
+    yield persistence
+    if persistence._flush_task:
+        persistence._flush_task.cancel()
+    with db_engine.begin() as connection:
+        connection.execute(delete(bot_state))
+
+def count_rows(engine) -> int:
+    with engine.connect() as connection:
+        return connection.execute(select(func.count()).select_from(bot_state)).scalar()
+
+def test_serialization_roundtrip():
+    small = {"selected_students": ["usr_1"]}
+    large = {"submissions": {f"sub_{i}": {"text": "x" * 50} for i in range(50)}}
+
+    assert dumps(small).startswith(b"j")
+    assert dumps(large).startswith(b"z")
+    assert len(dumps(large)) < len(dumps(large, compress_threshold=10**9))
+    assert loads(dumps(small)) == small
+    assert loads(dumps(large)) == large
+
+@pytest.mark.asyncio
+async def test_user_data_survives_restart(persistence, db_engine):
+    # Given
+    await persistence.update_user_data(123, {"selected_students": ["usr_1", "usr_2"]})
+    await persistence.flush()
+
+    # When
+    restarted = PostgresPersistence(engine=db_engine)
+    user_data = await restarted.get_user_data()
+
+    # Then
+    assert user_data[123] == {"selected_students": ["usr_1", "usr_2"]}
+
+@pytest.mark.asyncio
+async def test_conversation_state_roundtrip(persistence, db_engine):
+    # Given
+    await persistence.update_conversation("assign_homework", (1, 2), 2)
+    await persistence.update_conversation("assign_homework", (3, 4), 1)
+    await persistence.update_conversation("assign_homework", (3, 4), None)
+    await persistence.flush()
+
+    # When
+    conversations = await PostgresPersistence(engine=db_engine).get_conversations("assign_homework")
+
+    # Then
+    assert conversations == {(1, 2): 2}
+
+@pytest.mark.asyncio
+async def test_writes_are_batched_and_deduplicated(persistence, db_engine):
+    # Given several updates before a flush
+    for i in range(10):
+        await persistence.update_user_data(1, {"step": i})
+    await persistence.update_user_data(2, {"step": 0})
+
+    # Then nothing has been written yet, and only the latest state lands
+    assert count_rows(db_engine) == 0
+    await persistence.flush()
+    assert count_rows(db_engine) == 2
+    assert (await persistence.get_user_data())[1] == {"step": 9}
+
+    # Unchanged data is not staged again
+    await persistence.update_user_data(2, {"step": 0})
+    assert persistence._pending == {}
+
+@pytest.mark.asyncio
+async def test_refresh_picks_up_other_replica_writes(persistence, db_engine):
+    # Given
+    other_replica = PostgresPersistence(engine=db_engine)
+    await other_replica.update_user_data(5, {"homework_content": {"title": "Salsa"}})
+    await other_replica.flush()
+
+    # When
+    user_data = {}
+    await persistence.refresh_user_data(5, user_data)
+
+    # Then
+    assert user_data == {"homework_content": {"title": "Salsa"}}
+
+@pytest.mark.asyncio
+async def test_refresh_reads_payload_only_after_other_writes(persistence, db_engine):
+    # Given
+    await persistence.update_user_data(7, {"step": 1})
+    await persistence.flush()
+
+    # Then - our own write is the stored version, there is nothing to read
+    assert persistence._load_changed("user_data", "7") is None
+
+    # When
+    other_replica = PostgresPersistence(engine=db_engine)
+    await other_replica.update_user_data(7, {"step": 2})
+    await other_replica.flush()
+    user_data = {"step": 1}
+    await persistence.refresh_user_data(7, user_data)
+
+    # Then
+    assert user_data == {"step": 2}
+    assert persistence._load_changed("user_data", "7") is None
@@ -1,6 +1,7 @@
 import pytest
 from telegram import InlineKeyboardButton, InlineKeyboardMarkup
-from app.bot.handlers.utils import create_selection_menu
+from unittest.mock import AsyncMock
+from app.bot.handlers.utils import create_selection_menu, filter_by_prefix, reply_in_chunks
 
 def test_create_basic_menu():
     """Test creating a basic menu with just options"""
@@ -121,3 +122,84 @@ def test_invalid_items_per_row():
     assert len(keyboard[0]) == 2  # Two items in first row
     assert keyboard[0][0].text == "Option 1"
     assert keyboard[0][1].text == "Option 2"
+
+def test_paginated_menu():
+    """Test paginating options with prev/next buttons"""
+    options = [(f"option{i}", f"Option {i}") for i in range(25)]
+
+    first = create_selection_menu(options, home_button=False, page=0, page_size=10).inline_keyboard
+    middle = create_selection_menu(options, home_button=False, page=1, page_size=10).inline_keyboard
+    last = create_selection_menu(options, home_button=False, page=5, page_size=10).inline_keyboard
+
+    assert len(first) == 11  # 10 options + navigation
+    assert [b.callback_data for b in first[-1]] == ["page_1"]
+    assert [b.callback_data for b in middle[-1]] == ["page_0", "page_2"]
+    assert middle[0][0].callback_data == "option10"
+    # Out-of-range pages are clamped to the last page
+    assert len(last) == 6
+    assert [b.callback_data for b in last[-1]] == ["page_1"]
+
+def test_single_page_has_no_navigation():
+    """Test that a menu fitting on one page gets no navigation row"""
+    options = [("option1", "Option 1")]
+
+    markup = create_selection_menu(options, home_button=False, page_size=10)
+
+    assert len(markup.inline_keyboard) == 1
+
+def test_filter_by_prefix():
+    """Test handle prefix search over a sorted roster"""
+    roster = sorted(
+        [{"id": f"usr_{h}", "tg_handle": h} for h in ["Anna", "andrew", "bob", "Boris", "carl"]],
+        key=lambda s: s["tg_handle"].lower()
+    )
+
+    assert [s["tg_handle"] for s in filter_by_prefix(roster, "an")] == ["andrew", "Anna"]
+    assert [s["tg_handle"] for s in filter_by_prefix(roster, "@BO")] == ["bob", "Boris"]
+    assert filter_by_prefix(roster, "zed") == []
+    assert filter_by_prefix(roster, "") == roster
+
+async def entries(texts):
+    for cursor, text in enumerate(texts):
+        yield cursor, text
+
+@pytest.mark.asyncio
+async def test_reply_in_chunks_respects_limit():
+    """Test that entries are split into messages under the limit"""
+    message = AsyncMock()
+
+    sent = await reply_in_chunks(message, "Header\n", entries(["x" * 30] * 10), "Empty", limit=100)
+
+    texts = [call.args[0] for call in message.reply_text.call_args_list]
+    assert sent == len(texts) == 4
+    assert all(len(text) <= 100 for text in texts)
+    assert "".join(texts) == "Header\n" + "x" * 300
+
+@pytest.mark.asyncio
+async def test_reply_in_chunks_stops_with_more_button():
+    """Test that streaming stops lazily after max_chunks with a More button"""
+    message = AsyncMock()
+    consumed = []
+
+    async def tracked():
+        for cursor in range(1000):
+            consumed.append(cursor)
+            yield cursor, "y" * 40
+
+    sent = await reply_in_chunks(
+        message, "", tracked(), "Empty", more_callback="more_", max_chunks=2, limit=100
+    )
+
+    assert sent == 2
+    assert len(consumed) == 5  # Two messages of two entries, plus the one that didn't fit
+    markup = message.reply_text.call_args.kwargs['reply_markup']
+    assert markup.inline_keyboard[0][0].callback_data == "more_4"
+
+@pytest.mark.asyncio
+async def test_reply_in_chunks_empty():
+    """Test the empty text is sent when there are no entries"""
+    message = AsyncMock()
+
+    await reply_in_chunks(message, "Header\n", entries([]), "Nothing here")
+
+    assert message.reply_text.call_args.args[0] == "Nothing here"
@@ -25,6 +25,16 @@ def test_default_settings():
     assert settings.DEAD_LETTER_EXCHANGE == "dlx"
     assert settings.MESSAGE_TTL == 86400000  # 24 hours
 
+    # Metrics exporters
+    assert settings.CONSUMER_METRICS_PORT == 9101
+    assert settings.BOT_METRICS_PORT == 9102
+
+    # Database pool
+    assert settings.DB_POOL_SIZE == 5
+    assert settings.DB_MAX_OVERFLOW == 10
+    assert settings.DB_POOL_TIMEOUT == 30
+    assert settings.DB_STATEMENT_TIMEOUT_MS == 30000
+
 def test_environment_variables():
     """Test settings with environment variables"""
     test_env = {
@@ -58,6 +68,13 @@ def test_invalid_port_number():
             settings = Settings()
         assert "port" in str(exc_info.value).lower()
 
+def test_negative_pool_setting():
+    """Test validation of pool sizes and timeouts"""
+    with patch.dict(os.environ, {"DB_POOL_TIMEOUT": "-1"}):
+        with pytest.raises(ValueError) as exc_info:
+            Settings()
+        assert "negative" in str(exc_info.value)
+
 def test_queue_names_validation():
     """Test queue name format validation"""
     settings = Settings()
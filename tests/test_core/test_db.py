@@ -9,20 +9,25 @@
 8. Foreign key relationships
 """
 
+import time
+
 import pytest
 from sqlmodel import Session, select
 from app.schemas.user import User, UserRole
 from app.schemas.homework import HomeworkTask
 from app.schemas.submission import Submission
 from app.schemas.feedback import Feedback
-from app.schemas.base import Status
+from app.schemas.base import Status, new_id, ulid
+from app.db.counters import repair_homework_counters
+from app.api.json_rows import json_rows
+import json
 from datetime import datetime, timedelta
 
 def test_create_user(session: Session):
     # Given
     user = User(
         tg_handle="test_user",
-        telegram_id="123456789",
+        telegram_id=123456789,
         role=UserRole.STUDENT
     )
 
@@ -34,14 +39,14 @@ def test_create_user(session: Session):
     # Then
     assert user.id is not None
     assert user.tg_handle == "test_user"
-    assert user.telegram_id == "123456789"
+    assert user.telegram_id == 123456789
     assert user.role == UserRole.STUDENT
 
 def test_create_homework(session: Session):
     # Given
     teacher = User(
         tg_handle="test_teacher",
-        telegram_id="987654321",
+        telegram_id=987654321,
         role=UserRole.TEACHER
     )
     session.add(teacher)
@@ -68,12 +73,12 @@ def test_create_submission(session: Session):
     # Given
     teacher = User(
         tg_handle="submission_teacher",
-        telegram_id="111222333",
+        telegram_id=111222333,
         role=UserRole.TEACHER
     )
     student = User(
         tg_handle="submission_student",
-        telegram_id="333222111",
+        telegram_id=333222111,
         role=UserRole.STUDENT
     )
     session.add(teacher)
@@ -112,12 +117,12 @@ def test_create_feedback(session: Session):
     # Given
     teacher = User(
         tg_handle="feedback_teacher",
-        telegram_id="444555666",
+        telegram_id=444555666,
         role=UserRole.TEACHER
     )
     student = User(
         tg_handle="feedback_student",
-        telegram_id="666555444",
+        telegram_id=666555444,
         role=UserRole.STUDENT
     )
     session.add(teacher)
@@ -165,26 +170,26 @@ def test_query_user_by_telegram_id(session: Session):
     # Given
     user = User(
         tg_handle="query_user",
-        telegram_id="999888777",
+        telegram_id=999888777,
         role=UserRole.STUDENT
     )
     session.add(user)
     session.commit()
 
     # When
-    query = select(User).where(User.telegram_id == "999888777")
+    query = select(User).where(User.telegram_id == 999888777)
     result = session.exec(query).first()
 
     # Then
     assert result is not None
-    assert result.telegram_id == "999888777"
+    assert result.telegram_id == 999888777
     assert result.tg_handle == "query_user"
 
 def test_query_homework_by_teacher(session: Session):
     # Given
     teacher = User(
         tg_handle="query_teacher",
-        telegram_id="777666555",
+        telegram_id=777666555,
         role=UserRole.TEACHER
     )
     session.add(teacher)
@@ -212,12 +217,12 @@ def test_query_student_submissions(session: Session):
     # Given
     student = User(
         tg_handle="submission_query_student",
-        telegram_id="123321123",
+        telegram_id=123321123,
         role=UserRole.STUDENT
     )
     teacher = User(
         tg_handle="submission_query_teacher",
-        telegram_id="321123321",
+        telegram_id=321123321,
         role=UserRole.TEACHER
     )
     session.add(student)
@@ -257,7 +262,7 @@ def test_timestamps_created(session: Session):
 
     user = User(
         tg_handle="timestamp_user",
-        telegram_id="777888999",
+        telegram_id=777888999,
         role=UserRole.STUDENT
     )
 
@@ -270,11 +275,24 @@ def test_timestamps_created(session: Session):
     assert user.created_at is not None
     assert now - timedelta(seconds=10) <= user.created_at <= now + timedelta(seconds=10)
 
+def test_ids_are_time_ordered():
+    # Given
+    earlier = new_id("usr")
+    time.sleep(0.002)
+
+    # When
+    later = new_id("usr")
+
+    # Then - prefixed 26-character ULIDs that sort by creation time
+    assert earlier.startswith("usr_") and len(earlier) == len("usr_") + 26
+    assert earlier < later
+    assert ulid(0, 0) == "0" * 26
+
 def test_unique_telegram_id_constraint(session: Session):
     # Given
     user1 = User(
         tg_handle="unique_user1",
-        telegram_id="111000111",
+        telegram_id=111000111,
         role=UserRole.STUDENT
     )
     session.add(user1)
@@ -283,10 +301,61 @@ def test_unique_telegram_id_constraint(session: Session):
     # When/Then
     user2 = User(
         tg_handle="unique_user2",
-        telegram_id="111000111",  # Same telegram_id
+        telegram_id=111000111,  # Same telegram_id
         role=UserRole.STUDENT
     )
     session.add(user2)
 
     with pytest.raises(Exception):  # Should raise an integrity error
         session.commit()
+
+def test_repair_homework_counters(session: Session):
+    # Given - counters that drifted from the submissions
+    teacher = User(tg_handle="repair_teacher", telegram_id=555666911, role=UserRole.TEACHER)
+    students = [
+        User(tg_handle=f"repair_student{i}", telegram_id=555666912 + i, role=UserRole.STUDENT)
+        for i in range(3)
+    ]
+    session.add_all([teacher, *students])
+    session.commit()
+
+    homework = HomeworkTask(
+        teacher_id=teacher.id,
+        student_ids=[student.id for student in students],
+        content={"title": "Drifted Homework"},
+        submitted_count=3,
+        completed_count=2
+    )
+    session.add(homework)
+    session.commit()
+    session.add_all([
+        Submission(student_id=students[0].id, teacher_id=teacher.id, homework_task_id=homework.id, status=Status.COMPLETED),
+        Submission(student_id=students[0].id, teacher_id=teacher.id, homework_task_id=homework.id),
+        Submission(student_id=students[1].id, teacher_id=teacher.id, homework_task_id=homework.id)
+    ])
+    session.commit()
+
+    # When
+    repaired = repair_homework_counters(session, batch_size=1)
+
+    # Then
+    session.refresh(homework)
+    assert repaired >= 1
+    assert (homework.assigned_count, homework.submitted_count, homework.completed_count) == (3, 2, 1)
+    assert repair_homework_counters(session) == 0
+
+def test_json_rows_keep_the_statement_order(session: Session):
+    # Given
+    for n in range(5):
+        session.add(User(tg_handle=f"json_rows_{n}", telegram_id=555666970 + n, role=UserRole.STUDENT))
+    session.commit()
+    mine = User.tg_handle.like("json_rows_%")
+
+    # When
+    descending = json.loads(json_rows(session, select(User).where(mine).order_by(User.tg_handle.desc())))
+    page = json.loads(json_rows(session, select(User).where(mine).order_by(User.tg_handle).offset(1).limit(3)))
+
+    # Then - in order, without the column that numbers the rows
+    assert [user["tg_handle"] for user in descending] == [f"json_rows_{n}" for n in range(4, -1, -1)]
+    assert [user["tg_handle"] for user in page] == ["json_rows_1", "json_rows_2", "json_rows_3"]
+    assert set(page[0]) == {"id", "created_at", "tg_handle", "telegram_id", "role", "meta"}
@@ -0,0 +1,78 @@
+import pytest
+from unittest.mock import patch
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.exc import InvalidRequestError
+from sqlalchemy.pool import NullPool
+from app.core.config import Settings, settings
+from app.db import base
+from app.schemas.user import User, UserRole
+
+@pytest.fixture
+def engine():
+    engine = create_engine(settings.TEST_DATABASE_URL)
+    yield engine
+    engine.dispose()
+
+def commits(engine):
+    count = []
+    event.listen(engine, "commit", lambda connection: count.append(connection))
+    return count
+
+def test_read_session_has_no_transaction(engine):
+    # Given
+    committed = commits(engine)
+
+    # When
+    for session in base._read_session(engine):
+        connection = session.connection()
+        assert session.exec(text("SELECT 1")).scalar() == 1
+
+        # Then - every statement commits on its own, nothing is committed after
+        assert connection.get_execution_options()["isolation_level"] == "AUTOCOMMIT"
+    assert committed == []
+
+def test_write_session_commits(engine):
+    committed = commits(engine)
+
+    for session in base._session(engine):
+        session.exec(text("SELECT 1"))
+
+    assert len(committed) == 1
+
+def test_read_session_refuses_to_flush(engine):
+    for session in base._read_session(engine):
+        session.add(User(tg_handle="read_only_user", telegram_id=555666941, role=UserRole.STUDENT))
+
+        with pytest.raises(InvalidRequestError):
+            session.flush()
+
+def test_engine_uses_pool_settings():
+    engine = base._create_engine(settings.TEST_DATABASE_URL)
+    try:
+        assert engine.pool.size() == settings.DB_POOL_SIZE
+        assert engine.pool._max_overflow == settings.DB_MAX_OVERFLOW
+        assert engine.pool.timeout() == settings.DB_POOL_TIMEOUT
+        with engine.connect() as connection:
+            timeout = connection.exec_driver_sql("SHOW statement_timeout").scalar()
+        assert timeout == f"{settings.DB_STATEMENT_TIMEOUT_MS // 1000}s"
+    finally:
+        engine.dispose()
+
+@pytest.mark.parametrize("pool_size", [0, 2])
+def test_pgbouncer_mode_sets_no_session_state(pool_size):
+    # Given
+    with patch.object(base, "settings", Settings(DB_POOLER="pgbouncer", DB_POOL_SIZE=pool_size)):
+        engine = base._create_engine(settings.TEST_DATABASE_URL)
+
+    try:
+        # Then - no local pool without a size, and no startup options either way
+        assert isinstance(engine.pool, NullPool) == (pool_size == 0)
+        for session in base._read_session(engine):
+            timeout = session.connection().exec_driver_sql("SHOW statement_timeout").scalar()
+        assert timeout == "0"
+    finally:
+        engine.dispose()
+
+def test_unknown_pooler():
+    with pytest.raises(ValueError):
+        Settings(DB_POOLER="pgpool")
@@ -0,0 +1,104 @@
+import pytest
+from unittest.mock import patch
+from sqlalchemy import create_engine, text
+from prometheus_client import REGISTRY
+from app.core.config import settings
+from app.db.instrumentation import (
+    instrument_engine,
+    normalize_statement,
+    fingerprint,
+    slow_queries,
+    TimedQueuePool
+)
+
+@pytest.fixture
+def instrumented_engine():
+    engine = instrument_engine(
+        create_engine(settings.TEST_DATABASE_URL, poolclass=TimedQueuePool, pool_size=2),
+        slow_query_threshold_ms=0
+    )
+    slow_queries.clear()
+    yield engine
+    slow_queries.clear()
+    engine.dispose()
+
+def test_normalize_statement():
+    assert normalize_statement(
+        "SELECT * FROM \"user\"\n WHERE id IN (%(id_1_1)s, %(id_1_2)s, %(id_1_3)s) AND role = 'STUDENT' LIMIT 100"
+    ) == "SELECT * FROM \"user\" WHERE id IN (?) AND role = ? LIMIT ?"
+
+def test_fingerprint_ignores_parameter_values():
+    first = fingerprint("SELECT id FROM homeworktask WHERE teacher_id = 'usr_1' LIMIT 10")
+    second = fingerprint("SELECT id FROM homeworktask WHERE teacher_id = 'usr_2' LIMIT 100")
+
+    assert first[:3] == second[:3]
+    assert first[0] == "SELECT"
+    assert first[1] == "homeworktask"
+
+def test_statement_latency_and_slow_query_log(instrumented_engine):
+    # When
+    with instrumented_engine.connect() as connection:
+        connection.execute(text("SELECT 1 AS one WHERE 1 = :value"), {"value": 1})
+
+    # Then
+    operation, table, digest, _ = fingerprint("SELECT 1 AS one WHERE 1 = %(value)s")
+    assert REGISTRY.get_sample_value(
+        "db_query_duration_seconds_count",
+        {"operation": operation, "table": table, "fingerprint": digest}
+    ) >= 1
+
+    captured = [query for query in slow_queries if query["fingerprint"] == digest]
+    assert captured
+    assert "Result" in captured[0]["plan"]
+
+def test_slow_query_plan_in_autocommit(instrumented_engine):
+    # When - read sessions run without a transaction
+    autocommit = instrumented_engine.execution_options(isolation_level="AUTOCOMMIT")
+    with autocommit.connect() as connection:
+        connection.execute(text("SELECT 2 AS two WHERE 2 = :value"), {"value": 2})
+
+    # Then
+    digest = fingerprint("SELECT 2 AS two WHERE 2 = %(value)s")[2]
+    captured = [query for query in slow_queries if query["fingerprint"] == digest]
+    assert "Result" in captured[0]["plan"]
+
+def test_pool_gauges(instrumented_engine):
+    with instrumented_engine.connect():
+        assert REGISTRY.get_sample_value("db_connections_active") == 1
+    assert REGISTRY.get_sample_value("db_connections_active") == 0
+    assert REGISTRY.get_sample_value("db_pool_checkout_wait_seconds_count") >= 1
+
+def test_pool_overflow_gauge_falls_after_a_burst():
+    engine = instrument_engine(
+        create_engine(settings.TEST_DATABASE_URL, poolclass=TimedQueuePool, pool_size=1, max_overflow=2),
+        name="burst"
+    )
+    overflow = lambda name: REGISTRY.get_sample_value("db_pool_overflow", {"engine": name})
+    try:
+        # When
+        connections = [engine.connect() for _ in range(3)]
+        assert overflow("burst") == 2
+        for connection in connections:
+            connection.close()
+
+        # Then
+        assert overflow("burst") == 0
+        assert engine.pool.overflow() == 0
+    finally:
+        engine.dispose()
+
+def test_slow_query_endpoint(client):
+    slow_queries.clear()
+    slow_queries.append({"fingerprint": "abc", "statement": "SELECT ?", "duration_ms": 500.0,
+                         "plan": "Result", "captured_at": "2025-01-01T00:00:00"})
+
+    # Disabled by default
+    assert client.get("/debug/slow-queries").status_code == 404
+
+    with patch("app.api.endpoints.debug.settings") as mock_settings:
+        mock_settings.DEBUG_ENDPOINTS_ENABLED = True
+        response = client.get("/debug/slow-queries")
+
+    assert response.status_code == 200
+    assert response.json()[0]["fingerprint"] == "abc"
+    slow_queries.clear()
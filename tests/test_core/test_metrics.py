@@ -0,0 +1,62 @@
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from prometheus_client import REGISTRY
+from app.core.metrics import setup_metrics, UNMATCHED_ROUTE
+
+@pytest.fixture
+def metrics_client():
+    app = FastAPI()
+
+    @app.get("/items/{item_id}")
+    def get_item(item_id: str):
+        return {"id": item_id}
+
+    setup_metrics(app)
+    with TestClient(app) as client:
+        yield client
+
+def sample(name, **labels):
+    return REGISTRY.get_sample_value(name, labels) or 0
+
+def test_requests_labelled_by_route_template(metrics_client):
+    # Given
+    before = sample(
+        "http_requests_total", method="GET", endpoint="/items/{item_id}", status_code="200"
+    )
+
+    # When
+    for i in range(5):
+        metrics_client.get(f"/items/itm_{i}")
+
+    # Then
+    assert sample(
+        "http_requests_total", method="GET", endpoint="/items/{item_id}", status_code="200"
+    ) == before + 5
+    assert sample("http_requests_total", method="GET", endpoint="/items/itm_0", status_code="200") == 0
+
+def test_unmatched_requests_share_one_label(metrics_client):
+    before = sample("http_requests_total", method="GET", endpoint=UNMATCHED_ROUTE, status_code="404")
+
+    metrics_client.get("/nope/1")
+    metrics_client.get("/nope/2")
+
+    assert sample(
+        "http_requests_total", method="GET", endpoint=UNMATCHED_ROUTE, status_code="404"
+    ) == before + 2
+
+def test_response_size_and_in_progress(metrics_client):
+    before = sample("http_response_size_bytes_sum", method="GET", endpoint="/items/{item_id}")
+
+    response = metrics_client.get("/items/abc")
+
+    assert sample(
+        "http_response_size_bytes_sum", method="GET", endpoint="/items/{item_id}"
+    ) == before + len(response.content)
+    assert sample("http_requests_in_progress", method="GET") == 0
+
+def test_metrics_endpoint(metrics_client):
+    response = metrics_client.get("/metrics")
+
+    assert response.status_code == 200
+    assert "http_requests_in_progress" in response.text
@@ -0,0 +1,48 @@
+import pytest
+from unittest.mock import patch
+from sqlalchemy import create_engine, text
+from app import main
+from app.core.config import Settings, settings
+from app.db.migrations import check_schema_revision, head_revisions
+
+@pytest.fixture
+def engine():
+    engine = create_engine(settings.TEST_DATABASE_URL)
+    yield engine
+    with engine.begin() as connection:
+        connection.execute(text("DROP TABLE IF EXISTS alembic_version"))
+    engine.dispose()
+
+def stamp(engine, *revisions):
+    with engine.begin() as connection:
+        connection.execute(text("CREATE TABLE IF NOT EXISTS alembic_version (version_num varchar(32) PRIMARY KEY)"))
+        connection.execute(text("DELETE FROM alembic_version"))
+        for revision in revisions:
+            connection.execute(text("INSERT INTO alembic_version VALUES (:revision)"), {"revision": revision})
+
+def test_schema_at_head(engine):
+    # Given
+    stamp(engine, *head_revisions())
+
+    # When / Then
+    assert check_schema_revision(engine) is None
+
+def test_schema_behind_head(engine):
+    # Not under Alembic at all
+    assert "revision none" in check_schema_revision(engine)
+
+    # An older revision
+    stamp(engine, "df194054ed21")
+    problem = check_schema_revision(engine)
+    assert "df194054ed21" in problem
+    assert "alembic upgrade head" in problem
+
+def test_startup_fails_on_an_old_schema():
+    with patch.object(main, "settings", Settings(SCHEMA_CHECK="fail")), \
+            patch.object(main, "check_schema_revision", return_value="Database is at revision none"):
+        with pytest.raises(RuntimeError):
+            main.check_schema()
+
+    with patch.object(main, "settings", Settings(SCHEMA_CHECK="warn")), \
+            patch.object(main, "check_schema_revision", return_value="Database is at revision none"):
+        main.check_schema()
@@ -10,6 +10,7 @@ from app.queue.notifications import (
     notify_feedback_provided
 )
 import asyncio
+import threading
 
 def test_message_type_enum():
     assert MessageType.HOMEWORK_ASSIGNED.value == "homework_assigned"
@@ -62,7 +63,7 @@ def test_consumer_initialization(consumer, mock_channel):
 
 @pytest.mark.asyncio
 async def test_consumer_send_telegram_message(consumer):
-    result = await consumer.send_telegram_message("123456789", "Test message")
+    result = await consumer.send_telegram_message(123456789, "Test message")
     assert result is True
     consumer.bot.send_message.assert_called_once_with(
         chat_id=123456789,
@@ -73,7 +74,7 @@ async def test_consumer_send_telegram_message(consumer):
 async def test_consumer_process_message(consumer, mock_channel):
     message_data = {
         "type": "homework_assigned",
-        "recipient_id": "123456789",
+        "recipient_id": 123456789,
         "data": {
             "title": "Test Homework",
             "description": "Test Description"
@@ -238,6 +239,61 @@ def test_producer_connection_error():
         result = producer.send_message(message)
         assert result is False
 
+def test_producer_connects_lazily_and_backs_off():
+    message = Message(
+        type=MessageType.HOMEWORK_ASSIGNED,
+        recipient_id="123456789",
+        data={"test": "data"}
+    )
+    with patch('app.queue.producer.NotificationProducer._initialize_connection') as mock_init:
+        mock_init.side_effect = Exception("Connection failed")
+
+        # Creating the producer doesn't touch the broker
+        producer = NotificationProducer(reconnect_interval=60)
+        mock_init.assert_not_called()
+
+        # The first message tries to connect, later ones fail fast until the interval is over
+        assert producer.send_message(message) is False
+        assert producer.send_message(message) is False
+        assert mock_init.call_count == 1
+
+def test_producer_channel_confirms_deliveries(mock_channel):
+    with patch('app.queue.producer.get_rabbitmq_connection') as mock_connection:
+        mock_connection.return_value.channel.return_value = mock_channel
+        producer = NotificationProducer()
+
+        producer._ensure_channel()
+
+    mock_channel.confirm_delivery.assert_called_once()
+    mock_channel.queue_declare.assert_called_with(queue='notifications', durable=True)
+
+def test_producer_publishes_only_once_connected(mock_channel):
+    # Given - a connection that is still being set up in another thread
+    producer = NotificationProducer()
+    connecting, release = threading.Event(), threading.Event()
+
+    def connect():
+        producer.connection, producer.channel = Mock(), mock_channel
+        connecting.set()
+        release.wait(5)
+
+    with patch.object(NotificationProducer, '_initialize_connection', side_effect=connect):
+        setup = threading.Thread(target=producer._ensure_channel)
+        setup.start()
+        connecting.wait(5)
+
+        # When
+        publisher = threading.Thread(target=producer._publish, args=("{}", {}))
+        publisher.start()
+        publisher.join(0.1)
+
+        # Then - the channel isn't used until its setup is done
+        mock_channel.basic_publish.assert_not_called()
+        release.set()
+        setup.join(5)
+        publisher.join(5)
+    mock_channel.basic_publish.assert_called_once()
+
 def test_consumer_message_processing_error(consumer, mock_channel):
     invalid_message = "invalid json"
     method = Mock()
@@ -367,3 +423,30 @@ def test_producer_close_with_closed_connection(producer, mock_connection):
     # Verify only channel was closed
     mock_chan.close.assert_called_once()
     mock_conn.close.assert_not_called()
+
+def test_consumer_process_message_records_metrics(consumer, mock_channel):
+    from prometheus_client import REGISTRY
+    from app.queue.message_types import Message
+
+    def count(status):
+        return REGISTRY.get_sample_value(
+            "notifications_total", {"type": "homework_assigned", "status": status}
+        ) or 0
+
+    processed_before, failed_before = count("processed"), count("failed")
+    message = Message(
+        type=MessageType.HOMEWORK_ASSIGNED,
+        recipient_id="123456789",
+        data={"title": "Test Homework"}
+    )
+    method = Mock()
+    method.delivery_tag = "test_tag"
+
+    consumer.process_message(mock_channel, method, None, json.dumps(message.to_dict()).encode())
+
+    mock_channel.basic_ack.assert_called_once_with(delivery_tag="test_tag")
+    assert count("processed") == processed_before + 1
+    assert count("failed") == failed_before
+    assert REGISTRY.get_sample_value(
+        "notification_delivery_seconds_count", {"type": "homework_assigned"}
+    ) >= 1
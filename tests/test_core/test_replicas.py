@@ -0,0 +1,108 @@
+import threading
+import time
+import pytest
+from unittest.mock import Mock, patch
+from fastapi import Response
+from sqlalchemy import create_engine
+from app.core.config import settings
+from app.db import base
+from app.db.replicas import READ_PRIMARY_FOR_HEADER, ReplicaSet, route_read
+
+@pytest.fixture
+def engines():
+    primary = create_engine(settings.TEST_DATABASE_URL)
+    replica = create_engine(settings.TEST_DATABASE_URL)
+    unreachable = create_engine("postgresql://nobody@127.0.0.1:1/none", connect_args={"connect_timeout": 1})
+    yield primary, replica, unreachable
+    for engine in (primary, replica, unreachable):
+        engine.dispose()
+
+def test_reads_go_to_a_caught_up_replica(engines):
+    # Given - the test database isn't in recovery, so its lag is zero
+    primary, replica, unreachable = engines
+    replicas = ReplicaSet([unreachable, replica], max_lag=1, check_interval=60)
+
+    # When / Then - the unreachable one is skipped, whichever turn it is
+    assert route_read(replicas, primary, read_primary=False) is replica
+    assert route_read(replicas, primary, read_primary=False) is replica
+    assert replicas.lag(0) is None
+    assert replicas.lag(1) == 0
+
+def test_reads_fall_back_to_the_primary(engines):
+    primary, replica, _ = engines
+    replicas = ReplicaSet([replica], max_lag=1, check_interval=60)
+
+    # Without replicas, and after the client's own write
+    assert route_read(None, primary, read_primary=False) is primary
+    assert route_read(replicas, primary, read_primary=True) is primary
+
+    # When the only replica lags too far behind
+    with patch.object(ReplicaSet, "_measure", return_value=5.0):
+        lagging = ReplicaSet([replica], max_lag=1, check_interval=60)
+        assert route_read(lagging, primary, read_primary=False) is primary
+
+def test_lag_is_cached_for_the_check_interval(engines):
+    _, replica, _ = engines
+    replicas = ReplicaSet([replica], max_lag=1, check_interval=60)
+
+    with patch.object(ReplicaSet, "_measure", return_value=0.5) as measure:
+        replicas.choose()
+        replicas.choose()
+
+    measure.assert_called_once()
+
+def test_lag_check_does_not_block_other_requests(engines):
+    # Given - a replica whose lag check hangs
+    _, replica, _ = engines
+    replicas = ReplicaSet([replica], max_lag=1, check_interval=0)
+    replicas._lag[0] = 0.5
+    measuring, release = threading.Event(), threading.Event()
+
+    def measure(engine):
+        measuring.set()
+        release.wait(5)
+        return 0.25
+
+    with patch.object(ReplicaSet, "_measure", side_effect=measure):
+        checker = threading.Thread(target=replicas.lag, args=(0,))
+        checker.start()
+        measuring.wait(5)
+
+        # When
+        start = time.monotonic()
+        lag = replicas.lag(0)
+
+        # Then - other requests get the last value without waiting
+        assert lag == 0.5
+        assert time.monotonic() - start < 1
+        release.set()
+        checker.join(5)
+    assert replicas._lag[0] == 0.25
+
+def test_replica_engines_have_a_connect_timeout():
+    urls = "postgresql://replica1/db,postgresql://replica2/db"
+    with patch.object(base, "settings", settings.model_copy(update={
+        "DATABASE_REPLICA_URLS": urls, "REPLICA_CONNECT_TIMEOUT": 3
+    })), patch.object(base, "create_engine") as create_engine_mock, \
+         patch.object(base, "instrument_engine", side_effect=lambda engine, name: engine) as instrument:
+        base.get_replicas.cache_clear()
+        try:
+            base.get_replicas()
+        finally:
+            base.get_replicas.cache_clear()
+
+    assert create_engine_mock.call_count == 2
+    for call in create_engine_mock.call_args_list:
+        assert call.kwargs["connect_args"]["connect_timeout"] == 3
+    # Each replica's pool gauges are labelled with its host
+    assert [call.kwargs["name"] for call in instrument.call_args_list] == ["replica1", "replica2"]
+
+def test_writes_ask_for_primary_reads_only_with_replicas():
+    replicas = ReplicaSet([Mock()], max_lag=1, check_interval=60)
+
+    for configured, expected in ((None, None), (replicas, f"{settings.READ_YOUR_WRITES_SECONDS:g}")):
+        response = Response()
+        with patch.object(base, "get_replicas", return_value=configured), \
+             patch.object(base, "_session", return_value=iter([Mock()])):
+            next(base.get_db(response))
+        assert response.headers.get(READ_PRIMARY_FOR_HEADER) == expected
@@ -16,6 +16,7 @@ async def test_consumer_normal_operation():
 
     with patch('asyncio.new_event_loop', return_value=mock_loop), \
          patch('asyncio.set_event_loop'), \
+         patch('app.run_consumer.start_http_server'), \
          patch('app.run_consumer.TelegramConsumer', return_value=mock_consumer), \
          patch('app.run_consumer.settings') as mock_settings:
 
@@ -47,6 +48,7 @@ async def test_consumer_unexpected_error():
 
     with patch('asyncio.new_event_loop', return_value=mock_loop), \
          patch('asyncio.set_event_loop'), \
+         patch('app.run_consumer.start_http_server'), \
          patch('app.run_consumer.TelegramConsumer', return_value=mock_consumer), \
          patch('app.run_consumer.settings') as mock_settings:
 
@@ -81,6 +83,7 @@ async def test_consumer_cleanup_error():
 
     with patch('asyncio.new_event_loop', return_value=mock_loop), \
          patch('asyncio.set_event_loop'), \
+         patch('app.run_consumer.start_http_server'), \
          patch('app.run_consumer.TelegramConsumer', return_value=mock_consumer), \
          patch('app.run_consumer.settings') as mock_settings:
 
@@ -99,6 +102,7 @@ async def test_consumer_initialization_error():
 
     with patch('asyncio.new_event_loop'), \
          patch('asyncio.set_event_loop'), \
+         patch('app.run_consumer.start_http_server'), \
          patch('app.run_consumer.TelegramConsumer') as mock_consumer_class, \
          patch('app.run_consumer.settings') as mock_settings:
 
@@ -118,6 +122,7 @@ async def test_consumer_missing_token():
 
     with patch('asyncio.new_event_loop'), \
          patch('asyncio.set_event_loop'), \
+         patch('app.run_consumer.start_http_server'), \
          patch('app.run_consumer.settings') as mock_settings:
 
         # Configure missing token
@@ -126,3 +131,22 @@ async def test_consumer_missing_token():
         # Run main and expect exception
         with pytest.raises(Exception):
             main()
+
+@pytest.mark.asyncio
+async def test_consumer_starts_metrics_server():
+    """Test that the consumer exposes a metrics endpoint"""
+
+    mock_consumer = Mock()
+    mock_consumer.start_consuming.side_effect = KeyboardInterrupt()
+
+    with patch('asyncio.new_event_loop'), \
+         patch('asyncio.set_event_loop'), \
+         patch('app.run_consumer.start_http_server') as mock_start_http_server, \
+         patch('app.run_consumer.TelegramConsumer', return_value=mock_consumer), \
+         patch('app.run_consumer.settings') as mock_settings:
+
+        mock_settings.CONSUMER_METRICS_PORT = 9101
+
+        main()
+
+        mock_start_http_server.assert_called_once_with(9101)
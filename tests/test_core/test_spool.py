@@ -0,0 +1,175 @@
+import json
+import threading
+import time
+from unittest.mock import Mock, patch
+from pika.exceptions import NackError
+from app.queue.message_types import Message, MessageType
+from app.queue.producer import NotificationProducer
+from app.queue.spool import NotificationSpool
+
+def message(n: int) -> Message:
+    return Message(type=MessageType.HOMEWORK_ASSIGNED, recipient_id=str(n), data={"title": f"Homework {n}"})
+
+def published(channel: Mock) -> list:
+    return [json.loads(call.kwargs["body"])["recipient_id"] for call in channel.basic_publish.call_args_list]
+
+def wait_for(condition, timeout: float = 5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.01)
+
+def test_spool_replays_in_order_across_restarts(tmp_path):
+    # Given
+    path = str(tmp_path / "notifications.jsonl")
+    spool = NotificationSpool(path)
+    for n in range(5):
+        spool.append({"n": n})
+
+    # When - two are replayed before a restart, and a record is torn by a crash
+    records = spool.read(2)
+    spool.commit(records[-1][0])
+    spool.close()
+    with open(path, "ab") as f:
+        f.write(b'{"n": 5')
+    spool = NotificationSpool(path)
+
+    # Then
+    assert [record["n"] for _, record in spool.read(10)] == [2, 3, 4]
+    spool.commit(spool.read(10)[-1][0])
+    assert not spool.pending()
+    assert (tmp_path / "notifications.jsonl").stat().st_size == 0
+    spool.close()
+
+def test_spool_file_per_process(tmp_path):
+    path = str(tmp_path / "notifications.jsonl")
+    first = NotificationSpool(path)
+    second = NotificationSpool(path)
+
+    assert first.path == path
+    assert second.path == f"{path}.1"
+    first.close()
+    second.close()
+
+def test_spool_adopts_files_without_an_owner(tmp_path):
+    # Given - a second process spooled a record, and a third is still running
+    path = str(tmp_path / "notifications.jsonl")
+    first, second, third = NotificationSpool(path), NotificationSpool(path), NotificationSpool(path)
+    second.append({"n": 1})
+    third.append({"n": 2})
+    second.close()
+
+    # When
+    orphan = first.adopt_sibling()
+
+    # Then - only the file nobody holds is adopted, and only while it has records
+    assert orphan.path == f"{path}.1"
+    assert [record["n"] for _, record in orphan.read(10)] == [1]
+    orphan.commit(orphan.read(10)[-1][0])
+    orphan.close()
+    assert first.adopt_sibling() is None
+    first.close()
+    third.close()
+
+def test_concurrent_appends_share_fsyncs(tmp_path):
+    spool = NotificationSpool(str(tmp_path / "notifications.jsonl"))
+    with patch("app.queue.spool.os.fsync", side_effect=lambda fd: time.sleep(0.01)) as fsync:
+        threads = [threading.Thread(target=spool.append, args=({"n": n},)) for n in range(32)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    assert len(spool.read(100)) == 32
+    assert fsync.call_count < 32
+    spool.close()
+
+def test_producer_spools_while_broker_is_down(tmp_path):
+    channel = Mock()
+    producer = NotificationProducer(reconnect_interval=0.05, spool_path=str(tmp_path / "notifications.jsonl"))
+    try:
+        with patch.object(NotificationProducer, "_initialize_connection", side_effect=ConnectionError("down")):
+            # When - the broker is down, messages are kept rather than lost
+            assert producer.send_message(message(1)) is True
+            assert producer.send_message(message(2)) is True
+            assert producer.spool.pending()
+
+        # Then - once it's back, they're replayed in order, ahead of newer ones
+        def connect():
+            producer.connection, producer.channel = Mock(), channel
+        with patch.object(NotificationProducer, "_initialize_connection", side_effect=connect):
+            assert producer.send_message(message(3)) is True
+            wait_for(lambda: not producer.spool.pending())
+        assert published(channel) == ["1", "2", "3"]
+
+        # And later messages go straight to the broker
+        assert producer.send_message(message(4)) is True
+        assert published(channel)[-1] == "4"
+    finally:
+        producer.close()
+
+def test_producer_spools_messages_the_broker_nacks(tmp_path):
+    # Given - the broker nacks the first publish
+    channel = Mock()
+    channel.basic_publish.side_effect = [NackError([]), None, None]
+    producer = NotificationProducer(reconnect_interval=0.05, spool_path=str(tmp_path / "notifications.jsonl"))
+    producer.connection, producer.channel = Mock(), channel
+    try:
+        # When
+        assert producer.send_message(message(1)) is True
+
+        # Then - the nacked message is replayed rather than counted as sent
+        wait_for(lambda: not producer.spool.pending())
+        assert published(channel) == ["1", "1"]
+        assert producer.send_message(message(2)) is True
+        assert published(channel)[-1] == "2"
+    finally:
+        producer.close()
+
+def test_replay_commits_only_confirmed_messages(tmp_path):
+    # Given - two spooled messages, the broker nacks the second
+    path = str(tmp_path / "notifications.jsonl")
+    spool = NotificationSpool(path)
+    for n in (1, 2):
+        spool.append({"body": json.dumps({"recipient_id": str(n)}), "headers": {}})
+    spool.close()
+    channel = Mock()
+    channel.basic_publish.side_effect = [None, NackError([]), None]
+    producer = NotificationProducer(reconnect_interval=0.05, spool_path=path)
+    producer.connection, producer.channel = Mock(), channel
+    try:
+        # When
+        producer.start()
+
+        # Then - the first isn't sent again, the second is retried
+        wait_for(lambda: not producer.spool.pending())
+        assert published(channel) == ["1", "2", "2"]
+    finally:
+        producer.close()
+
+def test_producer_replays_spools_left_by_other_processes(tmp_path):
+    # Given - there were two workers, both stopped with records spooled
+    path = str(tmp_path / "notifications.jsonl")
+    spools = [NotificationSpool(path), NotificationSpool(path)]
+    for n, spool in enumerate(spools):
+        spool.append({"body": json.dumps({"recipient_id": str(n)}), "headers": {}})
+    for spool in spools:
+        spool.close()
+    channel = Mock()
+    producer = NotificationProducer(reconnect_interval=0.05, spool_path=path)
+    producer.connection, producer.channel = Mock(), channel
+    try:
+        # When - only one worker comes back
+        producer.start()
+
+        # Then - it replays its own file and the one left behind
+        wait_for(lambda: sorted(published(channel)) == ["0", "1"])
+        wait_for(lambda: (tmp_path / "notifications.jsonl.1").stat().st_size == 0)
+    finally:
+        producer.close()
+
+def test_producer_without_spool_drops_messages(tmp_path):
+    producer = NotificationProducer(spool_path="")
+    with patch.object(NotificationProducer, "_initialize_connection", side_effect=ConnectionError("down")):
+        assert producer.send_message(message(1)) is False
+    assert producer.spool is None
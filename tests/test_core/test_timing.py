@@ -0,0 +1,54 @@
+import logging
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+from app.core.config import settings
+from app.core.timing import ServerTimingMiddleware, TimedJSONResponse, timed
+from app.db.instrumentation import instrument_engine
+
+@pytest.fixture
+def timing_client():
+    engine = instrument_engine(create_engine(settings.TEST_DATABASE_URL))
+    app = FastAPI(default_response_class=TimedJSONResponse)
+
+    @app.get("/queries/{count}")
+    def run_queries(count: int):
+        with engine.connect() as connection:
+            for i in range(count):
+                connection.execute(text("SELECT :i"), {"i": i})
+        with timed("publish"):
+            pass
+        return {"items": list(range(count))}
+
+    app.add_middleware(ServerTimingMiddleware, query_budget=3)
+    with TestClient(app) as client:
+        yield client
+    engine.dispose()
+
+def parse_server_timing(header: str) -> dict:
+    metrics = {}
+    for entry in header.split(", "):
+        name, *params = entry.split(";")
+        metrics[name] = dict(param.split("=", 1) for param in params)
+    return metrics
+
+def test_server_timing_header(timing_client):
+    # When
+    response = timing_client.get("/queries/2")
+
+    # Then
+    metrics = parse_server_timing(response.headers["Server-Timing"])
+    assert set(metrics) == {"db", "publish", "serialize", "total"}
+    assert metrics["db"]["desc"] == '"2 queries"'
+    assert float(metrics["total"]["dur"]) >= float(metrics["db"]["dur"])
+
+def test_requests_over_query_budget_are_logged(timing_client, caplog):
+    with caplog.at_level(logging.WARNING, logger="app.core.timing"):
+        timing_client.get("/queries/3")
+        assert not caplog.records
+
+        timing_client.get("/queries/5")
+
+    assert len(caplog.records) == 1
+    assert "GET /queries/{count} ran 5 queries (budget 3)" in caplog.records[0].getMessage()
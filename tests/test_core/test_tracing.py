@@ -0,0 +1,127 @@
+import json
+import pika
+import pytest
+from unittest.mock import Mock, AsyncMock
+from opentelemetry import trace
+from opentelemetry.sdk.trace.export import SimpleSpanProcessor
+from opentelemetry.sdk.trace.export.in_memory_span_exporter import InMemorySpanExporter
+from sqlalchemy import create_engine, text
+from app.bot.client import APIClient
+from app.bot.instrumentation import track_handler
+from app.core.config import settings
+from app.core.tracing import setup_tracing, TRACE_ID_HEADER
+from app.db.instrumentation import instrument_engine
+from app.queue.message_types import Message, MessageType
+
+TRACE_ID = "4bf92f3577b34da6a3ce929d0e0e4736"
+TRACEPARENT = f"00-{TRACE_ID}-00f067aa0ba902b7-01"
+
+_exporter = InMemorySpanExporter()
+setup_tracing("test").add_span_processor(SimpleSpanProcessor(_exporter))
+
+@pytest.fixture
+def spans():
+    _exporter.clear()
+    yield _exporter
+    _exporter.clear()
+
+def trace_id_of(span) -> str:
+    return trace.format_trace_id(span.context.trace_id)
+
+def by_name(exporter):
+    return {span.name: span for span in exporter.get_finished_spans()}
+
+def server_span(exporter):
+    # Newer FastAPI versions record their own server span as a child of ours
+    return next(
+        span for span in exporter.get_finished_spans()
+        if span.instrumentation_scope.name == "app.core.tracing"
+    )
+
+def test_api_continues_incoming_trace(client, spans):
+    # When
+    response = client.get("/users/students/", headers={"traceparent": TRACEPARENT})
+
+    # Then
+    assert response.status_code == 200
+    assert response.headers[TRACE_ID_HEADER] == TRACE_ID
+    span = server_span(spans)
+    assert span.name == "GET /users/students/"
+    assert trace_id_of(span) == TRACE_ID
+
+def test_api_starts_trace_without_header(client, spans):
+    response = client.get("/users/students/")
+
+    assert response.headers[TRACE_ID_HEADER] == trace_id_of(server_span(spans))
+
+def test_statements_become_child_spans(spans):
+    engine = instrument_engine(create_engine(settings.TEST_DATABASE_URL))
+    tracer = trace.get_tracer(__name__)
+
+    # Statements outside a trace are not recorded
+    with engine.connect() as connection:
+        connection.execute(text("SELECT 1"))
+    assert spans.get_finished_spans() == ()
+
+    with tracer.start_as_current_span("request") as parent:
+        with engine.connect() as connection:
+            connection.execute(text("SELECT 1"))
+    engine.dispose()
+
+    query_span = by_name(spans)["SELECT"]
+    assert query_span.parent.span_id == parent.get_span_context().span_id
+    assert query_span.attributes["db.statement"] == "SELECT ?"
+
+def test_producer_injects_trace_context(producer, mock_channel, spans):
+    tracer = trace.get_tracer(__name__)
+    message = Message(type=MessageType.HOMEWORK_ASSIGNED, recipient_id="123", data={"title": "Test"})
+
+    with tracer.start_as_current_span("request") as parent:
+        producer.send_message(message)
+
+    headers = mock_channel.basic_publish.call_args.kwargs["properties"].headers
+    parent_trace_id = trace.format_trace_id(parent.get_span_context().trace_id)
+    assert headers["traceparent"].split("-")[1] == parent_trace_id
+    assert trace_id_of(by_name(spans)["notifications publish"]) == parent_trace_id
+
+def test_consumer_continues_trace(consumer, mock_channel, spans):
+    # Given
+    consumer.send_telegram_message = AsyncMock(return_value=True)
+    method = Mock()
+    method.delivery_tag = "test_tag"
+    body = json.dumps({
+        "type": "homework_assigned",
+        "recipient_id": "123456789",
+        "data": {"title": "Test Homework"}
+    }).encode()
+
+    # When
+    consumer.process_message(
+        mock_channel, method, pika.BasicProperties(headers={"traceparent": TRACEPARENT}), body
+    )
+
+    # Then
+    recorded = by_name(spans)
+    process_span = recorded["notifications process"]
+    send_span = recorded["telegram send_message"]
+    assert trace_id_of(process_span) == TRACE_ID
+    assert send_span.parent.span_id == process_span.context.span_id
+    assert process_span.attributes["notification.type"] == "homework_assigned"
+
+@pytest.mark.asyncio
+async def test_bot_requests_carry_handler_trace(httpx_mock, spans):
+    # Given
+    api_client = APIClient(base_url="http://test")
+    httpx_mock.add_response(url="http://test/users/usr_1", json={"id": "usr_1"})
+
+    async def show_user(update, context):
+        return await api_client.get_user_by_id("usr_1")
+
+    # When
+    await track_handler("show_user", show_user)(Mock(), Mock())
+    await api_client.close()
+
+    # Then
+    handler_span = by_name(spans)["bot show_user"]
+    traceparent = httpx_mock.get_request().headers["traceparent"]
+    assert traceparent.split("-")[1] == trace_id_of(handler_span)